@@ -2,21 +2,87 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 from course_manager import CourseManager
-from FileItemWidget import FileItemWidget
+from FileItemWidget import FileItemWidget, open_path
 from DirectoryItemWidget import DirectoryItemWidget
+from scan_service import ScanService
+from entry_records import sort_records
+from content_model import ContentListModel, ContentItemDelegate
+from thumbnail_pipeline import ThumbnailPipeline
+from thumbnail_renderers import thumbnail_kind
+from fs_watcher import DirectoryWatcher
+from stats_panel import StatsPanel
+from icon_cache import icon_path
+from media_index import format_duration, is_media_file
+import instrumentation
 import os
-from natsort import natsorted
+import mimetypes
 
 class CourseTrackerApp(QMainWindow):
-    def __init__(self):
+    # Listings with more rows than this are painted by a delegate instead of
+    # building a widget per row; 0 always uses the painted view
+    VIRTUAL_ROW_THRESHOLD = 150
+    # Listings with more rows than this drop drop-shadow effects (low-cost mode)
+    LOW_COST_ROW_THRESHOLD = 40
+    
+    # Emitted from a worker thread once media durations below a directory were probed
+    mediaIndexed = pyqtSignal(str)
+    # Emitted from a worker thread once the search index is in memory, and again once refreshed
+    searchIndexReady = pyqtSignal()
+    # Emitted from a worker thread with (directory, request number, time figures)
+    timeProgressReady = pyqtSignal(str, int, object)
+
+    def __init__(self, manager=None):
         super().__init__()
         self.setWindowTitle("Course Tracker")
         self.setMinimumSize(800, 600)
         
         # Initialize course manager
-        self.manager = CourseManager()
+        self.manager = manager if manager is not None else CourseManager()
         self.current_directory = None
         
+        # Listing and progress scans run on a worker pool and stream rows back
+        self.scan_service = ScanService(self.manager, self)
+        self.scan_service.rowsReady.connect(self.on_scan_rows)
+        self.scan_service.refreshed.connect(self.sync_listing)
+        self.scan_service.failed.connect(self.on_scan_failed)
+        self.scan_service.finished.connect(self.on_scan_finished)
+        
+        # Roots and the open directory are watched so rows update live
+        self.fs_watcher = DirectoryWatcher(self.manager, self)
+        self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+        
+        # Thumbnails are rendered in worker processes, visible rows first
+        self.thumbnails = ThumbnailPipeline(parent=self)
+        self.thumbnails.thumbnailReady.connect(self.on_thumbnail_ready)
+        self.file_widgets = {}
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(50)
+        self.thumbnail_timer.timeout.connect(self.update_visible_thumbnails)
+        
+        # Search results replace the listing while the search box has text;
+        # keystrokes are coalesced and the index is refreshed in the background
+        self.searching = False
+        self.search_waiting = False  # the last query ran before the index was loaded
+        self.searchIndexReady.connect(self.on_search_index_ready)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(60)
+        self.search_timer.timeout.connect(self.run_search)
+        
+        # Time-weighted progress of the open directory, from probed durations;
+        # summed on the worker pool, then adjusted per toggle
+        self.time_figures = None
+        self.time_requests = 0
+        self.timeProgressReady.connect(self.on_time_progress_ready)
+        self.mediaIndexed.connect(self.on_media_indexed)
+        
+        # Performance stats panel, only offered when instrumentation is on
+        self.stats_panel = None
+        if instrumentation.is_enabled():
+            stats_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+            stats_shortcut.activated.connect(self.show_stats_panel)
+        
         # Setup UI
         self.setup_ui()
         self.load_directory_list()
@@ -107,6 +173,35 @@ class CourseTrackerApp(QMainWindow):
         spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         toolbar.addWidget(spacer)
         
+        # Remaining time of the open directory, once durations are known
+        self.time_label = QLabel()
+        self.time_label.setObjectName("timeLabel")
+        self.time_label.hide()
+        toolbar.addWidget(self.time_label)
+        toolbar.addWidget(create_spacer(12))
+        
+        # Order of the open directory, re-sorted from the listed records
+        self.sort_box = QComboBox()
+        self.sort_box.setObjectName("sortBox")
+        for label, mode in (("Name", 'name'), ("Size", 'size'), ("Date Modified", 'mtime'),
+                            ("Watched First", 'watched')):
+            self.sort_box.addItem(label, mode)
+        self.sort_box.setCurrentIndex(self.sort_box.findData(self.manager.sort_mode))
+        self.sort_box.currentIndexChanged.connect(self.on_sort_changed)
+        toolbar.addWidget(self.sort_box)
+        toolbar.addWidget(create_spacer(8))
+        
+        # Search box over every registered course
+        self.search_box = QLineEdit()
+        self.search_box.setObjectName("searchBox")
+        self.search_box.setPlaceholderText("Search all courses")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedWidth(280)
+        self.search_box.textChanged.connect(self.on_search_text_changed)
+        toolbar.addWidget(self.search_box)
+        search_shortcut = QShortcut(QKeySequence(QKeySequence.StandardKey.Find), self)
+        search_shortcut.activated.connect(self.focus_search)
+        
         # Connect actions to slots
         self.back_action.triggered.connect(self.go_back)
         self.add_action.triggered.connect(self.add_directory)
@@ -120,7 +215,31 @@ class CourseTrackerApp(QMainWindow):
         self.content_list = QListWidget()
         self.content_list.setSpacing(8)
         self.content_list.itemDoubleClicked.connect(self.on_item_double_clicked)
-        layout.addWidget(self.content_list)
+        
+        # Painted list for large listings, fed by the same scan rows
+        self.content_model = ContentListModel(self)
+        self.content_model.watchedToggled.connect(self.on_file_watched_changed)
+        self.content_view = QListView()
+        self.content_view.setObjectName("contentView")
+        self.content_view.setModel(self.content_model)
+        self.content_view.setItemDelegate(ContentItemDelegate(self.content_view))
+        self.content_view.setUniformItemSizes(True)
+        self.content_view.setMouseTracking(True)
+        self.content_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.content_view.doubleClicked.connect(self.on_index_double_clicked)
+        
+        self.content_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.content_list.customContextMenuRequested.connect(self.show_context_menu)
+        self.content_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.content_view.customContextMenuRequested.connect(self.show_context_menu)
+        
+        self.content_list.verticalScrollBar().valueChanged.connect(self.thumbnail_timer.start)
+        self.content_view.verticalScrollBar().valueChanged.connect(self.thumbnail_timer.start)
+        
+        self.content_stack = QStackedWidget()
+        self.content_stack.addWidget(self.content_list)
+        self.content_stack.addWidget(self.content_view)
+        layout.addWidget(self.content_stack)
         
         # Set initial button states
         self.back_action.setEnabled(False)
@@ -137,17 +256,19 @@ class CourseTrackerApp(QMainWindow):
         try:
             style_file = os.path.join(os.path.dirname(__file__), 'styles.qss')
             with open(style_file, 'r') as f:
-                self.setStyleSheet(f.read())
+                stylesheet = f.read()
+            check_path = icon_path('check.png').replace('\\', '/')
+            self.setStyleSheet(stylesheet.replace('@CHECK_ICON@', check_path))
         except Exception as e:
             print(f"Error loading styles: {e}")
         
         # Apply drop shadow to the main window
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setXOffset(0)
-        shadow.setYOffset(0)
-        shadow.setColor(QColor(0, 0, 0, 50))
-        self.content_list.setGraphicsEffect(shadow)
+        self.list_shadow = QGraphicsDropShadowEffect(self)
+        self.list_shadow.setBlurRadius(20)
+        self.list_shadow.setXOffset(0)
+        self.list_shadow.setYOffset(0)
+        self.list_shadow.setColor(QColor(0, 0, 0, 50))
+        self.content_list.setGraphicsEffect(self.list_shadow)
 
     def add_directory(self):
         directory = QFileDialog.getExistingDirectory(self, "Select Directory")
@@ -161,6 +282,8 @@ class CourseTrackerApp(QMainWindow):
                 self.go_back()
 
     def go_back(self):
+        self.clear_search()
+        self.scan_service.cancel()
         self.current_directory = None
         self.back_action.setEnabled(False)
         self.remove_action.setEnabled(False)
@@ -171,62 +294,512 @@ class CourseTrackerApp(QMainWindow):
         if not path:
             return
             
+        self.open_entry(path)
+
+    def on_index_double_clicked(self, index):
+        path = index.data(ContentListModel.PathRole)
+        if not path:
+            return
+        
+        if index.data(ContentListModel.KindRole) == 'file':
+            try:
+                open_path(path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Could not open file: {str(e)}")
+        else:
+            self.open_entry(path)
+
+    def open_entry(self, path):
         if os.path.isdir(path):
+            self.clear_search()
             # Handle directory double-click
             self.current_directory = path
             self.back_action.setEnabled(True)
             self.remove_action.setEnabled(path in self.manager.directories)
             self.load_directory_contents(path)
+        elif path in self.manager.directories:
+            # A registered course that is no longer where it was
+            answer = QMessageBox.question(
+                self, "Folder Not Found",
+                f"{path} no longer exists. Locate the moved folder to keep its progress?"
+            )
+            if answer == QMessageBox.StandardButton.Yes:
+                self.relink_directory(path)
         else:
             # For files, the FileItemWidget will handle the double-click
             pass
 
+    def directory_at(self, pos):
+        """Return the directory shown at pos in the active list, if any"""
+        if self.is_painted_view():
+            index = self.content_view.indexAt(pos)
+            if index.isValid() and index.data(ContentListModel.KindRole) == 'directory':
+                return index.data(ContentListModel.PathRole)
+            return None
+        item = self.content_list.itemAt(pos)
+        if item and isinstance(self.content_list.itemWidget(item), DirectoryItemWidget):
+            return item.data(Qt.ItemDataRole.UserRole)
+        return None
+
+    def show_context_menu(self, pos):
+        directory = self.directory_at(pos)
+        if not directory:
+            return
+        
+        menu = QMenu(self)
+        mark_watched = menu.addAction("Mark All as Watched")
+        mark_unwatched = menu.addAction("Mark All as Unwatched")
+        relink = None
+        if self.showing_roots:
+            menu.addSeparator()
+            relink = menu.addAction("Relink Folder...")
+        view = self.content_stack.currentWidget()
+        chosen = menu.exec(view.viewport().mapToGlobal(pos))
+        if chosen is mark_watched:
+            self.set_directory_watched(directory, True)
+        elif chosen is mark_unwatched:
+            self.set_directory_watched(directory, False)
+        elif relink is not None and chosen is relink:
+            self.relink_directory(directory)
+
+    def relink_directory(self, directory):
+        """Point a registered course at the folder it was moved to, keeping its progress"""
+        new_directory = QFileDialog.getExistingDirectory(
+            self, f"Locate {os.path.basename(directory)}", os.path.dirname(directory)
+        )
+        if not new_directory or os.path.normpath(new_directory) == os.path.normpath(directory):
+            return
+        
+        counts = self.manager.check_relink(directory, new_directory)
+        watched = sum(counts.values())
+        if watched and counts['missing'] + counts['changed'] > 0:
+            answer = QMessageBox.question(
+                self, "Relink Folder",
+                f"Of {watched} watched files, {counts['matched']} were found in {new_directory}, "
+                f"{counts['changed']} have a different size and {counts['missing']} are missing.\n\n"
+                "Relink anyway?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        
+        try:
+            self.manager.relink_directory(directory, new_directory)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        self.load_directory_list()
+
+    def set_directory_watched(self, directory, watched):
+        """Mark a whole folder in one pass and refresh the rows it affects"""
+        progress = self.manager.set_subtree_watched(directory, watched)
+        self.update_directory_progress(directory, progress)
+        self.update_time_label()
+
     def load_directory_list(self):
         """Load and display naturally sorted directory list"""
-        self.content_list.clear()
+        self.clear_content(showing_roots=True)
         
-        # Sort directories naturally before displaying
-        sorted_directories = natsorted(self.manager.directories)
+        # Courses show at once with their last known counts, then the scan
+        # below recomputes them in the background and patches the rows
+        cached = list(self.manager.iter_cached_roots())
+        if cached:
+            self.on_scan_rows(cached)
+            self.revalidating_roots = True
+        self.revalidated_roots = []
         
-        for directory in sorted_directories:
-            progress = self.manager.calculate_directory_progress(directory)
-            item = QListWidgetItem(self.content_list)
-            item.setSizeHint(QSize(0, 120))
-            item.setData(Qt.ItemDataRole.UserRole, directory)
-            
-            widget = DirectoryItemWidget(directory, progress)
-            self.content_list.setItemWidget(item, widget)
+        # Progress for every root is computed in the background, rows stream in
+        self.scan_service.scan_roots(list(self.manager.directories))
+        self.fs_watcher.watch_roots(self.manager.directories)
+        self.fs_watcher.watch_directory(None)
+        self.refresh_search_index()
+
+    def refresh_search_index(self):
+        """Load the search index and bring it up to date on the worker pool"""
+        def run():
+            self.manager.search_index.load()
+            self.searchIndexReady.emit()
+            # Only directories changed since the last pass are listed again
+            if self.manager.refresh_search_index():
+                self.searchIndexReady.emit()
+        QThreadPool.globalInstance().start(run)
+
+    def on_search_index_ready(self):
+        # Queries typed before the index was loaded, or that found nothing yet, run again
+        if self.searching and (self.search_waiting or not self.content_model.rowCount()):
+            self.run_search()
+
+    def focus_search(self):
+        self.search_box.setFocus()
+        self.search_box.selectAll()
+
+    def on_search_text_changed(self, text):
+        if text.strip():
+            self.search_timer.start()
+        else:
+            self.end_search()
+
+    def run_search(self):
+        """Show the index matches for the search box text in place of the listing"""
+        query = self.search_box.text()
+        if not query.strip():
+            return
+        self.searching = True
+        self.scan_service.cancel()
+        self.clear_content(showing_roots=False)
+        # Results can be many and come from anywhere, so always paint them
+        self.content_stack.setCurrentWidget(self.content_view)
+        # Until the worker has loaded the index nothing is found; the query runs again then
+        self.search_waiting = not self.manager.search_index.is_loaded
+        self.content_model.append_rows(self.manager.search(query))
+        self.thumbnail_timer.start()
+
+    def end_search(self):
+        """Go back to the listing that was open before searching"""
+        self.search_timer.stop()
+        if not self.searching:
+            return
+        self.searching = False
+        if self.current_directory:
+            self.load_directory_contents(self.current_directory)
+        else:
+            self.load_directory_list()
+
+    def clear_search(self):
+        """Empty the search box without reloading, before navigating elsewhere"""
+        self.search_timer.stop()
+        self.searching = False
+        if self.search_box.text():
+            self.search_box.blockSignals(True)
+            self.search_box.clear()
+            self.search_box.blockSignals(False)
 
     def load_directory_contents(self, directory):
+        self.clear_content(showing_roots=False)
+        self.scan_service.scan_directory(directory)
+        self.fs_watcher.watch_directory(directory)
+
+    def clear_content(self, showing_roots):
+        self.showing_roots = showing_roots
+        self.revalidating_roots = False
+        self.listing_records = []
+        self.time_figures = None
+        self.time_label.hide()
+        self.thumbnails.cancel_all()
+        self.file_widgets = {}
         self.content_list.clear()
-        try:
-            subdirs, files = self.manager.get_directory_contents(directory)
-            
-            # Add subdirectories with custom widget
-            for dir_path, progress in subdirs:
-                item = QListWidgetItem(self.content_list)
-                item.setSizeHint(QSize(0, 100))  # Adjusted height for subdirectories
-                item.setData(Qt.ItemDataRole.UserRole, dir_path)
-                
-                widget = DirectoryItemWidget(dir_path, progress, is_subdirectory=True)
-                self.content_list.setItemWidget(item, widget)
-                
-            # Add files
-            for file_path, watched in files:
-                item = QListWidgetItem(self.content_list)
-                item.setSizeHint(QSize(0, 100))
-                item.setData(Qt.ItemDataRole.UserRole, file_path)
-                
-                widget = FileItemWidget(
-                    file_path, 
-                    watched, 
-                    manager=self.manager  # Pass manager reference
-                )
-                widget.watchedChanged.connect(self.on_file_watched_changed)
-                self.content_list.setItemWidget(item, widget)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.set_low_cost_mode(False)
+        self.content_model.clear(showing_roots)
+        if self.VIRTUAL_ROW_THRESHOLD > 0:
+            self.content_stack.setCurrentWidget(self.content_list)
+        else:
+            self.content_stack.setCurrentWidget(self.content_view)
+
+    def is_painted_view(self):
+        return self.content_stack.currentWidget() is self.content_view
+
+    def set_low_cost_mode(self, enabled):
+        """Drop (or restore) the list and per-row drop shadows"""
+        self.low_cost = enabled
+        self.list_shadow.setEnabled(not enabled)
+        for index in range(self.content_list.count()):
+            widget = self.content_list.itemWidget(self.content_list.item(index))
+            if isinstance(widget, DirectoryItemWidget):
+                widget.set_shadow_enabled(not enabled)
+
+    def on_scan_rows(self, rows):
+        """Append a batch of rows streamed by the scan service"""
+        if self.revalidating_roots:
+            # The rows are already drawn from cached summaries; patch them instead
+            self.revalidated_roots.extend(rows)
+            for record in rows:
+                self.update_directory_progress(record.path, record.progress, record)
+            return
+        self.listing_records.extend(rows)
+        self.content_model.append_rows(rows)
+        if self.is_painted_view():
+            return
+        if not self.low_cost and self.content_model.rowCount() > self.LOW_COST_ROW_THRESHOLD:
+            self.set_low_cost_mode(True)
+        
+        if self.content_model.rowCount() > self.VIRTUAL_ROW_THRESHOLD:
+            # Too many rows for per-row widgets: drop them and paint instead
+            self.file_widgets = {}
+            self.content_list.clear()
+            self.content_stack.setCurrentWidget(self.content_view)
+            self.thumbnail_timer.start()
+            return
+        
+        for record in rows:
+            if record.is_directory:
+                self.add_directory_row(record)
+            else:
+                self.add_file_row(record)
+
+    def on_sort_changed(self):
+        self.manager.set_sort_mode(self.sort_box.currentData())
+        if self.showing_roots or self.searching or not self.current_directory:
+            return
+        if self.scan_service.is_running():
+            # Rows are still streaming in; list again in the new order
+            self.load_directory_contents(self.current_directory)
+            return
+        
+        # Re-sort the records already listed by their cached keys, no rescan
+        records = self.listing_records
+        for record in records:
+            if record.is_directory:
+                record.progress = self.manager.calculate_directory_progress(record.path, revalidate=False)
+            else:
+                record.watched = self.manager.is_file_watched(record.path)
+        records = sort_records(records, self.manager.sort_mode)
+        self.clear_content(showing_roots=False)
+        self.on_scan_rows(records)
+        self.thumbnail_timer.start()
+
+    def on_scan_finished(self):
+        if self.revalidating_roots:
+            # Add courses that had no summary yet and drop the ones gone since
+            self.revalidating_roots = False
+            self.sync_listing(self.revalidated_roots)
+        if not self.showing_roots and self.current_directory:
+            # Also watch the listed subdirectories so their progress stays current
+            subdirs = [row.path for row in self.content_model.rows if row.kind == 'directory']
+            self.fs_watcher.watch_directory(self.current_directory, subdirs)
+            self.update_time_label()
+            self.start_media_index(self.current_directory)
+
+    def start_media_index(self, directory):
+        """Probe new or changed media below directory on the worker pool"""
+        def run():
+            if self.manager.index_media(directory):
+                self.mediaIndexed.emit(directory)
+        QThreadPool.globalInstance().start(run)
+
+    def on_media_indexed(self, directory):
+        if directory == self.current_directory:
+            self.update_time_label()
+
+    def update_time_label(self):
+        """Sum the open directory's time figures on the worker pool"""
+        self.time_requests += 1
+        self.time_figures = None
+        if self.showing_roots or self.searching or not self.current_directory:
+            self.time_label.hide()
+            return
+        directory, number = self.current_directory, self.time_requests
+        def run():
+            self.timeProgressReady.emit(directory, number, self.manager.time_progress(directory))
+        QThreadPool.globalInstance().start(run)
+
+    def on_time_progress_ready(self, directory, number, time):
+        if number != self.time_requests or directory != self.current_directory:
+            return  # superseded by a later request or another directory
+        self.time_figures = time
+        self.show_time_figures()
+
+    def adjust_time_figures(self, file_path, was_watched, watched):
+        """Move one file's duration between watched and remaining after a toggle"""
+        if bool(was_watched) == bool(watched) or not is_media_file(file_path):
+            return
+        time = self.time_figures
+        if time is None:
+            if not self.showing_roots and not self.searching and self.current_directory:
+                self.update_time_label()  # still being summed: sum again with the toggle
+            return
+        seconds = self.manager.media_index.duration(file_path)
+        if not seconds:
+            return
+        time['watched'] += seconds if watched else -seconds
+        time['remaining'] = time['total'] - time['watched']
+        time['progress'] = (time['watched'] / time['total'] * 100) if time['total'] > 0 else 0
+        self.show_time_figures()
+
+    def show_time_figures(self):
+        """Show watched share and remaining time of the open directory by duration"""
+        time = self.time_figures
+        if time is None or time['total'] <= 0:
+            self.time_label.hide()
+            return
+        # With durations still being probed (or unreadable) the figures are lower bounds
+        more = "+" if time['unknown'] else ""
+        self.time_label.setText(
+            f"{format_duration(time['remaining'])}{more} left of {format_duration(time['total'])}{more}"
+        )
+        self.time_label.setToolTip(
+            f"{time['progress']:.0f}% watched by duration"
+            + (f", {time['unknown']} files without a known duration" if time['unknown'] else "")
+        )
+        self.time_label.show()
+
+    def on_directory_changed(self, path):
+        """Patch the visible rows after a watched directory changed on disk"""
+        QThreadPool.globalInstance().start(lambda: self.manager.search_index.refresh_directory(path))
+        if self.searching:
+            return
+        
+        if self.scan_service.is_running() and not self.scan_service.is_refreshing():
+            # The running scan has not listed everything yet; start it over
+            if self.showing_roots:
+                self.load_directory_list()
+            elif self.current_directory:
+                self.load_directory_contents(self.current_directory)
+            return
+        
+        if (not self.showing_roots and self.current_directory
+                and os.path.normpath(self.current_directory) == path):
+            self.refresh_listing()
+        else:
+            self.refresh_visible_progress()
+
+    def refresh_visible_progress(self):
+        """Re-read progress of the listed directories from the manager's cache"""
+        for row in list(self.content_model.rows):
+            if row.kind != 'directory':
+                continue
+            progress = self.manager.calculate_directory_progress(row.path, revalidate=False)
+            if progress != row.progress:
+                self.update_directory_progress(row.path, progress)
+
+    def refresh_listing(self):
+        """Bring the open directory's rows in line with the disk without a full reload.
+
+        The directory is listed on the scan service's pool; its records patch
+        the rows through sync_listing() and on_scan_finished() follows up.
+        """
+        self.scan_service.refresh_directory(self.current_directory)
+
+    def sync_listing(self, records):
+        """Patch the shown rows to match records, keeping unchanged rows in place"""
+        self.listing_records = records
+        self.content_model.sync_rows(records)
+        if self.is_painted_view():
+            return
+        if len(records) > self.VIRTUAL_ROW_THRESHOLD:
+            self.file_widgets = {}
+            self.content_list.clear()
+            self.content_stack.setCurrentWidget(self.content_view)
+            return
+        if self.low_cost != (len(records) > self.LOW_COST_ROW_THRESHOLD):
+            self.set_low_cost_mode(not self.low_cost)
+        
+        wanted = {record.path for record in records}
+        for row in reversed(range(self.content_list.count())):
+            path = self.content_list.item(row).data(Qt.ItemDataRole.UserRole)
+            if path not in wanted:
+                self.file_widgets.pop(path, None)
+                self.content_list.takeItem(row)
+        for row, record in enumerate(records):
+            item = self.content_list.item(row)
+            if item is not None and item.data(Qt.ItemDataRole.UserRole) == record.path:
+                widget = self.content_list.itemWidget(item)
+                if isinstance(widget, DirectoryItemWidget):
+                    if widget.progress != record.progress:
+                        widget.update_progress(record.progress)
+                    if record.file_count is not None:
+                        widget.update_counts(record.file_count, record.folder_count, record.size)
+            elif record.is_directory:
+                self.add_directory_row(record, row)
+            else:
+                self.add_file_row(record, row)
+
+    def on_scan_failed(self, message):
+        if self.revalidating_roots:
+            # Stop patching; courses not reached yet keep their cached rows
+            self.revalidating_roots = False
+            revalidated = {record.path: record for record in self.revalidated_roots}
+            records = [revalidated.pop(record.path, record) for record in self.listing_records]
+            self.sync_listing(records + list(revalidated.values()))
+        if not self.showing_roots and self.current_directory and not os.path.isdir(self.current_directory):
+            # The open directory itself went away
+            self.go_back()
+            return
+        QMessageBox.critical(self, "Error", f"Error reading directory: {message}")
+
+    def insert_list_item(self, row=None):
+        """Create a list item at row, or at the end"""
+        item = QListWidgetItem()
+        self.content_list.insertItem(self.content_list.count() if row is None else row, item)
+        return item
+
+    def add_directory_row(self, record, row=None):
+        item = self.insert_list_item(row)
+        item.setData(Qt.ItemDataRole.UserRole, record.path)
+        
+        if self.showing_roots:
+            item.setSizeHint(QSize(0, 120))
+            widget = DirectoryItemWidget(record.path, record.progress, record=record, shadow=not self.low_cost)
+        else:
+            item.setSizeHint(QSize(0, 100))  # Adjusted height for subdirectories
+            widget = DirectoryItemWidget(
+                record.path, record.progress, is_subdirectory=True, record=record, shadow=not self.low_cost
+            )
+        self.content_list.setItemWidget(item, widget)
+
+    def add_file_row(self, record, row=None):
+        file_path = record.path
+        item = self.insert_list_item(row)
+        item.setSizeHint(QSize(0, 100))
+        item.setData(Qt.ItemDataRole.UserRole, file_path)
+        
+        widget = FileItemWidget(
+            file_path, 
+            record.watched, 
+            manager=self.manager,  # Pass manager reference
+            thumbnails=self.thumbnails,
+            size=record.size
+        )
+        widget.watchedChanged.connect(self.on_file_watched_changed)
+        self.content_list.setItemWidget(item, widget)
+        self.file_widgets[file_path] = widget
+        self.thumbnail_timer.start()
+
+    def visible_thumbnail_requests(self):
+        """(path, kind) of visible file rows that still show a type icon"""
+        requests = []
+        if self.is_painted_view():
+            viewport = self.content_view.viewport().rect()
+            first = self.content_view.indexAt(viewport.topLeft()).row()
+            last = self.content_view.indexAt(viewport.bottomLeft()).row()
+            if first < 0:
+                return requests
+            if last < 0:
+                last = self.content_model.rowCount() - 1
+            for row in range(first, last + 1):
+                index = self.content_model.index(row)
+                if index.data(ContentListModel.KindRole) != 'file':
+                    continue
+                kind = thumbnail_kind(index.data(ContentListModel.MimeTypeRole))
+                if kind and index.data(Qt.ItemDataRole.DecorationRole) is None:
+                    requests.append((index.data(ContentListModel.PathRole), kind))
+        else:
+            viewport = self.content_list.viewport().rect()
+            for file_path, widget in self.file_widgets.items():
+                if widget.has_thumbnail:
+                    continue
+                item_rect = widget.geometry()
+                if not item_rect.intersects(viewport):
+                    continue
+                kind = thumbnail_kind(mimetypes.guess_type(file_path)[0])
+                if kind:
+                    requests.append((file_path, kind))
+        return requests
+
+    def update_visible_thumbnails(self):
+        """Prioritize thumbnails of visible rows and cancel the ones scrolled away"""
+        requests = []
+        for file_path, kind in self.visible_thumbnail_requests():
+            pixmap = self.thumbnails.cached_pixmap(file_path, kind)
+            if pixmap is not None:
+                self.on_thumbnail_ready(file_path, pixmap)
+            else:
+                requests.append((file_path, kind))
+        self.thumbnails.request_visible(requests)
+
+    def on_thumbnail_ready(self, file_path, pixmap):
+        widget = self.file_widgets.get(file_path)
+        if widget is not None:
+            widget.set_thumbnail(pixmap)
+        self.content_model.set_thumbnail(file_path, pixmap)
 
     def on_watch_changed(self, file_path, watched):
         """Handle watch status changes"""
@@ -239,22 +812,29 @@ class CourseTrackerApp(QMainWindow):
     def on_file_watched_changed(self, file_path, watched):
         """Handle file watched state changes"""
         directory = os.path.dirname(file_path)
+        was_watched = self.manager.is_file_watched(file_path)
         
         # Update watched state and get new progress
         progress = self.manager.update_file_watched_state(file_path, watched)
         
         # Update UI
+        self.content_model.set_watched(file_path, watched)
         self.update_directory_progress(directory, progress)
         
         # If we're in a subdirectory, update parent directory progress too
         if self.current_directory:
-            parent_progress = self.manager.calculate_directory_progress(self.current_directory)
+            parent_progress = self.manager.calculate_directory_progress(
+                self.current_directory, revalidate=False
+            )
             self.update_directory_progress(self.current_directory, parent_progress)
+            self.adjust_time_figures(file_path, was_watched, watched)
 
-    def update_directory_progress(self, directory, progress=None):
-        """Update the progress display for a directory item"""
+    def update_directory_progress(self, directory, progress=None, record=None):
+        """Update the progress display for a directory item, and its counts from record"""
         if progress is None:
             progress = self.manager.calculate_directory_progress(directory)
+        
+        self.content_model.set_progress(directory, progress)
             
         # Find and update directory widget
         for index in range(self.content_list.count()):
@@ -263,4 +843,23 @@ class CourseTrackerApp(QMainWindow):
                 widget = self.content_list.itemWidget(item)
                 if isinstance(widget, DirectoryItemWidget):
                     widget.update_progress(progress)
-                break
\ No newline at end of file
+                    if record is not None and record.file_count is not None:
+                        widget.update_counts(record.file_count, record.folder_count, record.size)
+                break
+
+    def show_stats_panel(self):
+        if self.stats_panel is None:
+            self.stats_panel = StatsPanel(self)
+        self.stats_panel.show()
+        self.stats_panel.raise_()
+
+    def closeEvent(self, event):
+        """Stop background scans before the window goes away"""
+        self.scan_service.cancel()
+        self.scan_service.wait()
+        self.thumbnails.shutdown()
+        # Index refreshes and probes on the pool still use the stores closed below
+        QThreadPool.globalInstance().waitForDone()
+        # Stores the summaries of the roots scanned this session and flushes
+        self.manager.close()
+        super().closeEvent(event)
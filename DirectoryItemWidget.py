@@ -2,14 +2,43 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 import os
+from icon_cache import icon_pixmap
+from FileItemWidget import format_size
+
+def progress_color(progress):
+    """Return color based on progress percentage"""
+    if progress >= 80:
+        return "#2ecc71"  # Green
+    elif progress >= 50:
+        return "#3498db"  # Blue
+    elif progress >= 20:
+        return "#f1c40f"  # Yellow
+    else:
+        return "#e74c3c"  # Red
+
+
+def progress_level(progress):
+    """Return the progressLevel property value styles.qss colors by"""
+    if progress >= 80:
+        return "complete"
+    elif progress >= 50:
+        return "good"
+    elif progress >= 20:
+        return "fair"
+    else:
+        return "low"
+
 
 class DirectoryItemWidget(QWidget):
-    def __init__(self, directory_path, progress, parent=None, is_subdirectory=False):
+    def __init__(self, directory_path, progress, parent=None, is_subdirectory=False, record=None, shadow=True):
         super().__init__(parent)
         self.directory_path = directory_path
         self.progress = progress
         self.is_subdirectory = is_subdirectory
         
+        # Styling lives in styles.qss, keyed on these properties and object names
+        self.setProperty("subdirectory", is_subdirectory)
+        
         # Create layout with gradient background
         layout = QHBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
@@ -22,13 +51,7 @@ class DirectoryItemWidget(QWidget):
         if is_subdirectory:
             # Add arrow icon for subdirectory
             arrow_label = QLabel("→")
-            arrow_label.setStyleSheet("""
-                QLabel {
-                    color: #6c757d;
-                    font-size: 16px;
-                    font-weight: bold;
-                }
-            """)
+            arrow_label.setObjectName("arrowLabel")
             left_container.addWidget(arrow_label)
         
         # Add folder icon with shadow effect
@@ -36,13 +59,8 @@ class DirectoryItemWidget(QWidget):
         self.icon_label.setFixedSize(48 if is_subdirectory else 64, 48 if is_subdirectory else 64)
         self.set_folder_icon()
         
-        # Add shadow to icon
-        icon_shadow = QGraphicsDropShadowEffect()
-        icon_shadow.setBlurRadius(10)
-        icon_shadow.setXOffset(0)
-        icon_shadow.setYOffset(2)
-        icon_shadow.setColor(QColor(0, 0, 0, 30))
-        self.icon_label.setGraphicsEffect(icon_shadow)
+        # Add shadow to icon, skipped in low-cost mode
+        self.set_shadow_enabled(shadow)
         
         left_container.addWidget(self.icon_label)
         layout.addLayout(left_container)
@@ -56,28 +74,14 @@ class DirectoryItemWidget(QWidget):
         name_container.setSpacing(8)
         
         self.name_label = QLabel(os.path.basename(directory_path))
-        self.name_label.setStyleSheet(f"""
-            QLabel {{
-                font-size: {12 if is_subdirectory else 14}px;
-                font-weight: bold;
-                color: #2c3e50;
-            }}
-        """)
+        self.name_label.setObjectName("directoryName")
         name_container.addWidget(self.name_label)
         
         # Add folder type badge
         folder_type = self.get_folder_type()
         if folder_type:
             type_label = QLabel(folder_type)
-            type_label.setStyleSheet("""
-                QLabel {
-                    background-color: #e9ecef;
-                    color: #495057;
-                    border-radius: 4px;
-                    padding: 2px 6px;
-                    font-size: 11px;
-                }
-            """)
+            type_label.setObjectName("folderType")
             name_container.addWidget(type_label)
         
         name_container.addStretch()
@@ -88,132 +92,102 @@ class DirectoryItemWidget(QWidget):
         progress_layout.setSpacing(10)
         
         self.progress_bar = QProgressBar()
+        self.progress_bar.setObjectName("directoryProgress")
         self.progress_bar.setFixedWidth(180 if is_subdirectory else 200)
         self.progress_bar.setMinimumHeight(4 if is_subdirectory else 6)
         self.progress_bar.setMaximumHeight(4 if is_subdirectory else 6)
         self.progress_bar.setValue(int(progress))
         self.progress_bar.setTextVisible(False)
         
-        # Set progress bar color based on progress
-        progress_color = self.get_progress_color(progress)
-        self.progress_bar.setStyleSheet(f"""
-            QProgressBar {{
-                background-color: #f0f0f0;
-                border: none;
-                border-radius: 2px;
-            }}
-            QProgressBar::chunk {{
-                background-color: {progress_color};
-                border-radius: 2px;
-            }}
-        """)
         progress_layout.addWidget(self.progress_bar)
         
         # Progress percentage
         self.progress_label = QLabel(f"{progress:.1f}%")
-        self.progress_label.setStyleSheet(f"color: {progress_color};")
+        self.progress_label.setObjectName("progressLabel")
         progress_layout.addWidget(self.progress_label)
         
+        # Color both by progress through the progressLevel property
+        self.level = progress_level(progress)
+        self.progress_bar.setProperty("progressLevel", self.level)
+        self.progress_label.setProperty("progressLevel", self.level)
+        
         progress_layout.addStretch()
         info_layout.addLayout(progress_layout)
         
-        # Add count of items with icons
-        try:
-            items = os.listdir(directory_path)
-            file_count = len([x for x in items if os.path.isfile(os.path.join(directory_path, x))])
-            dir_count = len([x for x in items if os.path.isdir(os.path.join(directory_path, x))])
-            
-            count_layout = QHBoxLayout()
-            count_layout.setSpacing(12)
-            
-            if dir_count > 0:
-                folder_count = QLabel(f"📁 {dir_count} folders")
-                folder_count.setStyleSheet("color: #6c757d; font-size: 11px;")
-                count_layout.addWidget(folder_count)
-            
-            if file_count > 0:
-                file_count_label = QLabel(f"📄 {file_count} files")
-                file_count_label.setStyleSheet("color: #6c757d; font-size: 11px;")
-                count_layout.addWidget(file_count_label)
-            
-            count_layout.addStretch()
-            info_layout.addLayout(count_layout)
-        except Exception:
-            pass
+        # Add count of items with icons, taken from the scan record when there is one
+        count_layout = QHBoxLayout()
+        count_layout.setSpacing(12)
+        self.folder_count_label = QLabel()
+        self.file_count_label = QLabel()
+        self.size_label = QLabel()
+        for label in (self.folder_count_label, self.file_count_label, self.size_label):
+            label.setObjectName("countLabel")
+            count_layout.addWidget(label)
+        count_layout.addStretch()
+        info_layout.addLayout(count_layout)
+        
+        if record is not None and record.file_count is not None:
+            self.update_counts(record.file_count, record.folder_count, record.size)
+        else:
+            try:
+                items = os.listdir(directory_path)
+                file_count = len([x for x in items if os.path.isfile(os.path.join(directory_path, x))])
+                dir_count = len([x for x in items if os.path.isdir(os.path.join(directory_path, x))])
+            except Exception:
+                file_count = dir_count = 0
+            self.update_counts(file_count, dir_count)
         
         layout.addLayout(info_layout)
         layout.addStretch()
-        
-        # Apply widget style with subtle gradient
-        self.setStyleSheet(f"""
-            DirectoryItemWidget {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {'#ffffff' if is_subdirectory else '#f8f9fa'}, 
-                    stop:1 {'#f8f9fa' if is_subdirectory else '#ffffff'});
-                border-radius: 8px;
-                border: 1px solid {'#e9ecef' if is_subdirectory else 'transparent'};
-            }}
-            DirectoryItemWidget:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #f8f9fa, stop:1 #f0f2f5);
-                border: 1px solid #dee2e6;
-            }}
-        """)
 
     def set_folder_icon(self):
-        """Set the folder icon with proper sizing"""
-        icon_size = self.icon_label.size()
-        icon_path = os.path.join(os.path.dirname(__file__), 'icons', 'folder.png')
-        
-        if os.path.exists(icon_path):
-            pixmap = QPixmap(icon_path)
-            # Scale based on whether it's a subdirectory or not
-            target_size = 40 if self.is_subdirectory else 64
-            scaled_pixmap = pixmap.scaled(
-                target_size, target_size,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            
-            # Center the pixmap in the label
-            x_offset = (self.icon_label.width() - scaled_pixmap.width()) // 2
-            y_offset = (self.icon_label.height() - scaled_pixmap.height()) // 2
-            
-            # Create a new transparent pixmap for padding
-            final_pixmap = QPixmap(self.icon_label.size())
-            final_pixmap.fill(Qt.GlobalColor.transparent)
-            
-            # Paint the scaled icon centered
-            painter = QPainter(final_pixmap)
-            painter.drawPixmap(x_offset, y_offset, scaled_pixmap)
-            painter.end()
-            
-            self.icon_label.setPixmap(final_pixmap)
-        else:
-            # Fallback to system icon with proper sizing
-            icon = QIcon.fromTheme('folder')
-            pixmap = icon.pixmap(
-                40 if self.is_subdirectory else 64,
-                40 if self.is_subdirectory else 64
-            )
-            self.icon_label.setPixmap(pixmap)
+        """Set the shared folder icon, centered in the label"""
+        # Scale based on whether it's a subdirectory or not
+        target_size = 40 if self.is_subdirectory else 64
+        self.icon_label.setPixmap(icon_pixmap(
+            'folder.png', target_size, canvas=self.icon_label.width(), fallback='folder',
+            device_pixel_ratio=self.devicePixelRatioF()
+        ))
+
+    def set_shadow_enabled(self, enabled):
+        """Add or drop the icon's drop shadow"""
+        if not enabled:
+            self.icon_label.setGraphicsEffect(None)
+        elif self.icon_label.graphicsEffect() is None:
+            icon_shadow = QGraphicsDropShadowEffect()
+            icon_shadow.setBlurRadius(10)
+            icon_shadow.setXOffset(0)
+            icon_shadow.setYOffset(2)
+            icon_shadow.setColor(QColor(0, 0, 0, 30))
+            self.icon_label.setGraphicsEffect(icon_shadow)
 
     def update_progress(self, progress):
         """Update the progress display"""
         self.progress = progress
         self.progress_bar.setValue(int(progress))
         self.progress_label.setText(f"{progress:.1f}%")
+        
+        level = progress_level(progress)
+        if level != self.level:
+            # Re-polish so the stylesheet picks up the new progressLevel
+            self.level = level
+            for widget in (self.progress_bar, self.progress_label):
+                widget.setProperty("progressLevel", level)
+                widget.style().unpolish(widget)
+                widget.style().polish(widget)
+
+    def update_counts(self, file_count, folder_count, size=None):
+        """Show the direct folder and file counts and the total size, hiding empty ones"""
+        self.folder_count_label.setText(f"📁 {folder_count} folders")
+        self.folder_count_label.setVisible(bool(folder_count))
+        self.file_count_label.setText(f"📄 {file_count} files")
+        self.file_count_label.setVisible(bool(file_count))
+        self.size_label.setText(f"💾 {format_size(size)}" if size else "")
+        self.size_label.setVisible(bool(size))
 
     def get_progress_color(self, progress):
         """Return color based on progress percentage"""
-        if progress >= 80:
-            return "#2ecc71"  # Green
-        elif progress >= 50:
-            return "#3498db"  # Blue
-        elif progress >= 20:
-            return "#f1c40f"  # Yellow
-        else:
-            return "#e74c3c"  # Red
+        return progress_color(progress)
 
     def get_folder_type(self):
         """Determine folder type based on contents"""
@@ -5,19 +5,88 @@ import os
 import mimetypes
 import subprocess
 import sys
-from PIL import Image
-import cv2
-import io
-from pdf2image import convert_from_path
 from pathlib import Path
+from icon_cache import icon_pixmap
+from thumbnail_cache import get_thumbnail_cache
+from thumbnail_renderers import render_thumbnail, thumbnail_kind, thumbnail_variant, THUMBNAIL_SIZES
+
+def icon_name_for(file_path, mime_type):
+    """Return the icons/ file name used for a file of the given mime type"""
+    # Define icon mapping with more specific types
+    icon_mapping = {
+        'video/': 'video.png',
+        'audio/': 'audio.png',
+        'image/': 'image.png',
+        'application/pdf': 'pdf.png',
+        'text/html': 'html.png',
+        'text/plain': 'file.png',  # Added specific text/plain mapping
+        'text/': 'text.png',
+        'application/': 'file.png'
+    }
+    
+    # Additional mime type mappings for specific extensions
+    extension_mapping = {
+        # Web files
+        '.html': 'html.png',
+        '.htm': 'html.png',
+        '.xhtml': 'html.png',
+        '.php': 'html.png',
+        '.asp': 'html.png',
+        '.jsx': 'html.png',
+        # Text files
+        '.txt': 'text.png',
+        '.log': 'text.png',
+        '.md': 'text.png',
+        '.json': 'text.png',
+        '.xml': 'text.png',
+        '.csv': 'text.png',
+        '.ini': 'text.png',
+        '.conf': 'text.png'
+    }
+    
+    # First check file extension
+    file_ext = os.path.splitext(file_path)[1].lower()
+    icon_file = extension_mapping.get(file_ext)
+    
+    # If no match in extensions, check mime type
+    if not icon_file and mime_type:
+        for mime_prefix, icon_name in icon_mapping.items():
+            if mime_type.startswith(mime_prefix):
+                icon_file = icon_name
+                break
+    
+    # Default icon if no matches found
+    return icon_file or 'file.png'
+
+
+def format_size(size):
+    """Format file size in human readable format"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def open_path(file_path):
+    """Open file with system default application"""
+    if sys.platform == 'darwin':  # macOS
+        subprocess.run(['open', file_path])
+    elif sys.platform == 'win32':  # Windows
+        os.startfile(file_path)
+    else:  # Linux
+        subprocess.run(['xdg-open', file_path])
+
 
 class FileItemWidget(QWidget):
     watchedChanged = pyqtSignal(str, bool)  # Signal for watch state changes
     
-    def __init__(self, file_path, watched=False, parent=None, manager=None):
+    def __init__(self, file_path, watched=False, parent=None, manager=None, thumbnails=None, size=None):
         super().__init__(parent)
         self.file_path = file_path
         self.manager = manager  # Store manager reference
+        self.thumbnails = thumbnails  # Optional ThumbnailPipeline for background rendering
+        self.has_thumbnail = False
         self.thumbnail_size = QSize(32, 32)  # Reduced from 40 to 32 for clarity
         
         # Main layout
@@ -66,9 +135,10 @@ class FileItemWidget(QWidget):
         type_label.setObjectName("typeLabel")
         details_layout.addWidget(type_label)
         
-        # File size
+        # File size, stat'ed here only when the caller did not pass it along
         try:
-            size = os.path.getsize(file_path)
+            if size is None:
+                size = os.path.getsize(file_path)
             size_str = self.format_size(size)
             size_label = QLabel(size_str)
             size_label.setObjectName("sizeLabel")
@@ -99,106 +169,63 @@ class FileItemWidget(QWidget):
         right_container.addWidget(self.checkbox)
         layout.addLayout(right_container)
         
-        # Remove inline styles since they're now in QSS
-        self.setStyleSheet("")
-        
         self.set_thumbnail_or_icon()
-        
-        # Get check icon path for both development and production
-        if hasattr(sys, '_MEIPASS'):
-            # Running as bundled app
-            check_path = os.path.join(sys._MEIPASS, 'icons', 'check.png')
-        else:
-            # Running in development
-            check_path = os.path.join(os.path.dirname(__file__), 'icons', 'check.png')
-        
-        check_path = check_path.replace('\\', '/')
-        
-        # Custom style for checkbox
-        checkbox_style = f"""
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border: 2px solid #adb5bd;
-                border-radius: 4px;
-            }}
-            QCheckBox::indicator:hover {{
-                border-color: #0d6efd;
-            }}
-            QCheckBox::indicator:checked {{
-                background-color: #0d6efd;
-                border-color: #0d6efd;
-                image: url({check_path});
-            }}
-            QCheckBox::indicator:checked:hover {{
-                background-color: #0b5ed7;
-                border-color: #0b5ed7;
-            }}
-        """
-        
-        self.checkbox.setStyleSheet(checkbox_style)
     
     def format_size(self, size):
         """Format file size in human readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
+        return format_size(size)
     
     def on_watch_changed(self, state):
-        """Handle checkbox state changes"""
+        """Handle checkbox state changes; the app's handler stores the new state"""
         is_watched = state == 2  # 2 means checked
-        if self.manager:
-            self.manager.update_file_watched_state(self.file_path, is_watched)
         self.watchedChanged.emit(self.file_path, is_watched)
         
     def set_thumbnail_or_icon(self):
         """Set appropriate thumbnail or icon for the file type"""
         mime_type, _ = mimetypes.guess_type(self.file_path)
+        kind = thumbnail_kind(mime_type)
         
-        if mime_type:
-            if mime_type.startswith('image/'):
-                self.set_image_thumbnail()
-            elif mime_type.startswith('video/'):
-                self.set_video_thumbnail()
-            elif mime_type == 'application/pdf':
-                self.set_pdf_thumbnail()
+        if kind and self.thumbnails is not None:
+            # Show the type icon now; the pipeline renders the real thumbnail
+            # in the background and the app hands it over via set_thumbnail
+            pixmap = self.thumbnails.cached_pixmap(self.file_path, kind)
+            if pixmap is not None:
+                self.set_thumbnail(pixmap)
             else:
                 self.set_file_icon(mime_type)
+        elif kind == 'image':
+            self.set_image_thumbnail()
+        elif kind == 'video':
+            self.set_video_thumbnail()
+        elif kind == 'pdf':
+            self.set_pdf_thumbnail()
         else:
-            self.set_file_icon(None)
+            self.set_file_icon(mime_type)
+
+    def set_thumbnail(self, pixmap):
+        """Show a rendered thumbnail"""
+        self.has_thumbnail = True
+        self.icon_label.setPixmap(pixmap)
+
+    def set_rendered_thumbnail(self, kind):
+        """Render a thumbnail inline, going through the on-disk cache"""
+        target_size = THUMBNAIL_SIZES[kind]
+        cache = get_thumbnail_cache()
+        variant = thumbnail_variant(kind)
+        data = cache.get(self.file_path, target_size, variant)
+        if data is None:
+            data = render_thumbnail(self.file_path, kind, target_size)
+            if data:
+                cache.put(self.file_path, target_size, data, variant)
+        pixmap = QPixmap()
+        if not data or not pixmap.loadFromData(data, 'PNG'):
+            raise ValueError("nothing to render")
+        self.set_thumbnail(pixmap)
 
     def set_image_thumbnail(self):
         """Create thumbnail for image files"""
         try:
-            # Open image and create thumbnail
-            image = Image.open(self.file_path)
-            # Convert to RGBA if necessary
-            if image.mode != 'RGBA':
-                image = image.convert('RGBA')
-            
-            # Calculate size maintaining aspect ratio
-            target_size = 32
-            ratio = min(target_size/float(image.size[0]), target_size/float(image.size[1]))
-            new_size = tuple([int(dim * ratio) for dim in image.size])
-            
-            # Resize with high quality
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
-            
-            # Create new image with padding
-            final_image = Image.new('RGBA', (target_size, target_size), (0, 0, 0, 0))
-            paste_x = (target_size - new_size[0]) // 2
-            paste_y = (target_size - new_size[1]) // 2
-            final_image.paste(image, (paste_x, paste_y))
-            
-            # Convert to QPixmap
-            bytes_io = io.BytesIO()
-            final_image.save(bytes_io, format='PNG')
-            pixmap = QPixmap()
-            pixmap.loadFromData(bytes_io.getvalue())
-            
-            self.icon_label.setPixmap(pixmap)
+            self.set_rendered_thumbnail('image')
         except Exception as e:
             print(f"Image thumbnail error: {e}")
             self.set_file_icon('image/')
@@ -206,175 +233,24 @@ class FileItemWidget(QWidget):
     def set_video_thumbnail(self):
         """Create thumbnail from video first frame"""
         try:
-            # Open video file
-            cap = cv2.VideoCapture(self.file_path)
-            
-            # Read first frame
-            ret, frame = cap.read()
-            if ret:
-                # Convert frame to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize frame
-                height, width = frame_rgb.shape[:2]
-                aspect_ratio = width / height
-                
-                if aspect_ratio > 1:
-                    new_width = 48
-                    new_height = int(48 / aspect_ratio)
-                else:
-                    new_height = 48
-                    new_width = int(48 * aspect_ratio)
-                    
-                frame_resized = cv2.resize(frame_rgb, (new_width, new_height))
-                
-                # Convert to QPixmap
-                height, width = frame_resized.shape[:2]
-                bytes_per_line = 3 * width
-                qimage = QImage(frame_resized.data, width, height, 
-                              bytes_per_line, QImage.Format.Format_RGB888)
-                pixmap = QPixmap.fromImage(qimage)
-                
-                # Center the thumbnail
-                final_pixmap = QPixmap(48, 48)
-                final_pixmap.fill(Qt.GlobalColor.transparent)
-                painter = QPainter(final_pixmap)
-                x = (48 - new_width) // 2
-                y = (48 - new_height) // 2
-                painter.drawPixmap(x, y, pixmap)
-                painter.end()
-                
-                self.icon_label.setPixmap(final_pixmap)
-            cap.release()
-            
+            self.set_rendered_thumbnail('video')
         except Exception:
             self.set_file_icon('video/')
 
     def set_pdf_thumbnail(self):
         """Create thumbnail for PDF files"""
         try:
-            # Convert first page of PDF to image
-            pages = convert_from_path(
-                self.file_path, 
-                first_page=1, 
-                last_page=1,
-                size=(96, 96)  # Larger size for better quality
-            )
-            
-            if pages:
-                # Get first page
-                page = pages[0]
-                
-                # Convert PIL image to QPixmap
-                bytes_io = io.BytesIO()
-                page.save(bytes_io, format='PNG')
-                pixmap = QPixmap()
-                pixmap.loadFromData(bytes_io.getvalue())
-                
-                # Scale to thumbnail size maintaining aspect ratio
-                scaled_pixmap = pixmap.scaled(
-                    self.thumbnail_size,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                
-                # Create final pixmap with padding
-                final_pixmap = QPixmap(48, 48)
-                final_pixmap.fill(Qt.GlobalColor.transparent)
-                
-                # Center the thumbnail
-                painter = QPainter(final_pixmap)
-                x = (48 - scaled_pixmap.width()) // 2
-                y = (48 - scaled_pixmap.height()) // 2
-                painter.drawPixmap(x, y, scaled_pixmap)
-                painter.end()
-                
-                self.icon_label.setPixmap(final_pixmap)
-            else:
-                self.set_file_icon('application/pdf')
-                
+            self.set_rendered_thumbnail('pdf')
         except Exception as e:
             print(f"PDF thumbnail error: {e}")
             self.set_file_icon('application/pdf')
 
     def set_file_icon(self, mime_type):
-        """Set appropriate icon based on mime type"""
-        # Define icon mapping with more specific types
-        icon_mapping = {
-            'video/': 'video.png',
-            'audio/': 'audio.png',
-            'image/': 'image.png',
-            'application/pdf': 'pdf.png',
-            'text/html': 'html.png',
-            'text/plain': 'file.png',  # Added specific text/plain mapping
-            'text/': 'text.png',
-            'application/': 'file.png'
-        }
-        
-        # Additional mime type mappings for specific extensions
-        extension_mapping = {
-            # Web files
-            '.html': 'html.png',
-            '.htm': 'html.png',
-            '.xhtml': 'html.png',
-            '.php': 'html.png',
-            '.asp': 'html.png',
-            '.jsx': 'html.png',
-            # Text files
-            '.txt': 'text.png',
-            '.log': 'text.png',
-            '.md': 'text.png',
-            '.json': 'text.png',
-            '.xml': 'text.png',
-            '.csv': 'text.png',
-            '.ini': 'text.png',
-            '.conf': 'text.png'
-        }
-        
-        # First check file extension
-        file_ext = os.path.splitext(self.file_path)[1].lower()
-        icon_file = extension_mapping.get(file_ext)
-        
-        # If no match in extensions, check mime type
-        if not icon_file and mime_type:
-            for mime_prefix, icon_name in icon_mapping.items():
-                if mime_type.startswith(mime_prefix):
-                    icon_file = icon_name
-                    break
-        
-        # Default icon if no matches found
-        if not icon_file:
-            icon_file = 'file.png'
-        
-        # Construct icon path
-        icon_path = os.path.join(os.path.dirname(__file__), 'icons', icon_file)
-        
-        # Load and set icon with high quality scaling
-        if os.path.exists(icon_path):
-            pixmap = QPixmap(icon_path)
-            scaled_pixmap = pixmap.scaled(
-                32, 32,  # Fixed size for icons
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            
-            # Center the icon if needed
-            if scaled_pixmap.width() < 32 or scaled_pixmap.height() < 32:
-                final_pixmap = QPixmap(32, 32)
-                final_pixmap.fill(Qt.GlobalColor.transparent)
-                painter = QPainter(final_pixmap)
-                x = (32 - scaled_pixmap.width()) // 2
-                y = (32 - scaled_pixmap.height()) // 2
-                painter.drawPixmap(x, y, scaled_pixmap)
-                painter.end()
-                self.icon_label.setPixmap(final_pixmap)
-            else:
-                self.icon_label.setPixmap(scaled_pixmap)
-        else:
-            # Fallback to system icons if custom icon not found
-            icon = QIcon.fromTheme('text-x-generic')
-            pixmap = icon.pixmap(self.thumbnail_size)
-            self.icon_label.setPixmap(pixmap)
+        """Set the shared type icon for the mime type"""
+        self.icon_label.setPixmap(icon_pixmap(
+            icon_name_for(self.file_path, mime_type), 32, canvas=32,
+            device_pixel_ratio=self.devicePixelRatioF()
+        ))
 
     def mouseDoubleClickEvent(self, event):
         """Handle double click to open file"""
@@ -384,11 +260,6 @@ class FileItemWidget(QWidget):
     def open_file(self):
         """Open file with system default application"""
         try:
-            if sys.platform == 'darwin':  # macOS
-                subprocess.run(['open', self.file_path])
-            elif sys.platform == 'win32':  # Windows
-                os.startfile(self.file_path)
-            else:  # Linux
-                subprocess.run(['xdg-open', self.file_path])
+            open_path(self.file_path)
         except Exception as e:
             QMessageBox.critical(None, "Error", f"Could not open file: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""Offscreen benchmarks for list population, row widgets and scrolling.
+
+Runs the real CourseTrackerApp on Qt's offscreen platform against a generated
+course, so no display is needed:
+
+    python -m benchmarks.bench_gui --files 120 --view both --output report.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QSize, QTimer
+from PyQt6.QtWidgets import QApplication, QListWidget, QListWidgetItem
+
+from benchmarks.bench_manager import summarize, new_manager
+from benchmarks.fixtures import generate_course_tree
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+VIEWS = ('widgets', 'painted')
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def wait_for(signal, timeout_ms):
+    """Spin an event loop until signal fires, returning False on timeout"""
+    loop = QEventLoop()
+    fired = []
+
+    def on_signal(*args):
+        fired.append(True)
+        loop.quit()
+
+    signal.connect(on_signal)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    signal.disconnect(on_signal)
+    return bool(fired)
+
+
+def measure_population(app, window, directory, view, timeout_ms):
+    """Open directory in the given view mode and time the listing filling in"""
+    window.VIRTUAL_ROW_THRESHOLD = 0 if view == 'painted' else 10 ** 9
+    first_row = []
+
+    def on_rows(rows):
+        # Connected after the window's own slot, so the batch is already shown
+        if not first_row:
+            first_row.append(time.perf_counter())
+
+    window.scan_service.rowsReady.connect(on_rows)
+    start = time.perf_counter()
+    window.open_entry(directory)
+    completed = wait_for(window.scan_service.finished, timeout_ms)
+    app.processEvents()
+    active = window.content_stack.currentWidget()
+    active.viewport().repaint()
+    populated = time.perf_counter()
+    window.scan_service.rowsReady.disconnect(on_rows)
+
+    return {
+        'completed': completed,
+        'rows': window.content_model.rowCount(),
+        'active_view': 'painted' if window.is_painted_view() else 'widgets',
+        'first_row_ms': round((first_row[0] - start) * 1000, 4) if first_row else None,
+        'populated_ms': round((populated - start) * 1000, 4),
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+
+def measure_scrolling(app, window, frames):
+    """Scroll the active list a step at a time, timing each repaint"""
+    active = window.content_stack.currentWidget()
+    bar = active.verticalScrollBar()
+    if bar.maximum() <= 0:
+        return {'frames': summarize([0.0]), 'scrollable': False}
+
+    step = max(1, bar.maximum() // max(1, frames // 2))
+    positions = list(range(0, bar.maximum() + 1, step))
+    positions += positions[::-1]
+    samples = []
+    for value in positions[:frames]:
+        start = time.perf_counter()
+        bar.setValue(value)
+        app.processEvents()
+        active.viewport().repaint()
+        samples.append(time.perf_counter() - start)
+    return {'frames': summarize(samples), 'scrollable': True}
+
+
+def measure_row_construction(window, records, rows):
+    """Time building row widgets, and attaching them to a list, one at a time"""
+    from DirectoryItemWidget import DirectoryItemWidget
+    from FileItemWidget import FileItemWidget
+
+    scratch = QListWidget(window)
+    scratch.hide()
+    files = [record for record in records if not record.is_directory] or [None]
+    directories = [record for record in records if record.is_directory] or [None]
+    results = {}
+
+    def build_file(record):
+        return FileItemWidget(
+            record.path, record.watched, manager=window.manager,
+            thumbnails=window.thumbnails, size=record.size
+        )
+
+    def build_directory(record):
+        return DirectoryItemWidget(record.path, record.progress, is_subdirectory=True, record=record)
+
+    for name, pool, build in (('file_item_widget', files, build_file),
+                              ('directory_item_widget', directories, build_directory)):
+        if pool[0] is None:
+            continue
+        construct, attach = [], []
+        for index in range(rows):
+            record = pool[index % len(pool)]
+            start = time.perf_counter()
+            widget = build(record)
+            built = time.perf_counter()
+            item = QListWidgetItem()
+            item.setSizeHint(QSize(0, 100))
+            scratch.addItem(item)
+            scratch.setItemWidget(item, widget)
+            widget.ensurePolished()
+            attach.append(time.perf_counter() - built)
+            construct.append(built - start)
+        scratch.clear()
+        results[name] = {'construct': summarize(construct), 'attach': summarize(attach)}
+    scratch.deleteLater()
+    return results
+
+
+def run(args):
+    from CourseTracker import CourseTrackerApp
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='course_bench_gui_') as workdir:
+        course_root = os.path.join(workdir, 'course')
+        tree = generate_course_tree(
+            course_root, depth=2, fanout=args.folders, files_per_dir=args.files,
+            subtitle_ratio=args.subtitle_ratio, seed=args.seed
+        )
+        results['fixture'] = {
+            'directories': tree['directories'],
+            'files': tree['files'],
+            'subtitles': tree['subtitles'],
+        }
+        results['baseline_rss_bytes'] = peak_rss_bytes()
+
+        manager = new_manager(os.path.join(workdir, 'config'), args.flush_delay)
+        manager.add_directory(course_root)
+
+        start = time.perf_counter()
+        window = CourseTrackerApp(manager=manager)
+        window.resize(args.width, args.height)
+        window.show()
+        wait_for(window.scan_service.finished, args.timeout_ms)
+        app.processEvents()
+        results['startup'] = {
+            'window_with_roots_ms': round((time.perf_counter() - start) * 1000, 4),
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+
+        views = VIEWS if args.view == 'both' else (args.view,)
+        for view in views:
+            population = [measure_population(app, window, course_root, view, args.timeout_ms)
+                          for _ in range(args.repeat)]
+            results[view] = {
+                'population': population,
+                'scrolling': measure_scrolling(app, window, args.frames),
+            }
+            window.go_back()
+            wait_for(window.scan_service.finished, args.timeout_ms)
+
+        records = list(manager.iter_directory_contents(course_root))
+        results['row_construction'] = measure_row_construction(window, records, args.rows)
+        results['peak_rss_bytes'] = peak_rss_bytes()
+
+        window.close()
+        app.processEvents()
+        manager.close()
+
+    return {
+        'meta': {
+            'benchmark': 'gui',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'qt_platform': QApplication.platformName(),
+            'params': vars(args),
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=120, help='lecture files in the opened directory')
+    parser.add_argument('--folders', type=int, default=8, help='subdirectories in the opened directory')
+    parser.add_argument('--subtitle-ratio', type=float, default=0.5, help='share of lectures with a subtitle file')
+    parser.add_argument('--view', choices=VIEWS + ('both',), default='both',
+                        help='per-row widgets, the painted model view, or both')
+    parser.add_argument('--repeat', type=int, default=3, help='times each listing is loaded')
+    parser.add_argument('--frames', type=int, default=60, help='scroll steps to time')
+    parser.add_argument('--rows', type=int, default=100, help='row widgets built per widget type')
+    parser.add_argument('--width', type=int, default=1000)
+    parser.add_argument('--height', type=int, default=700)
+    parser.add_argument('--timeout-ms', type=int, default=60000, help='give up waiting for a scan after this long')
+    parser.add_argument('--flush-delay', type=float, default=0.5, help='write-behind window in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Headless benchmarks for CourseManager listing, progress and persistence.
+
+Run from the repository root, no display needed:
+
+    python -m benchmarks.bench_manager --depth 3 --fanout 5 --files 30 --output report.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fixtures import generate_course_tree
+from course_manager import CourseManager
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def summarize(samples):
+    """Summary statistics of a list of durations, in milliseconds"""
+    ordered = sorted(samples)
+    ms = lambda seconds: round(seconds * 1000, 4)
+    return {
+        'count': len(ordered),
+        'mean_ms': ms(statistics.fmean(ordered)),
+        'p50_ms': ms(ordered[len(ordered) // 2]),
+        'p95_ms': ms(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]),
+        'max_ms': ms(ordered[-1]),
+    }
+
+
+def new_manager(config_dir, flush_delay):
+    return CourseManager(flush_delay=flush_delay, config_dir=config_dir, legacy_config_dir=None)
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='course_bench_') as workdir:
+        course_root = os.path.join(workdir, 'course')
+        config_dir = os.path.join(workdir, 'config')
+        gen_time, tree = timed(
+            generate_course_tree, course_root,
+            depth=args.depth, fanout=args.fanout, files_per_dir=args.files,
+            subtitle_ratio=args.subtitle_ratio, seed=args.seed
+        )
+        results['fixture'] = {
+            'directories': tree['directories'],
+            'files': tree['files'],
+            'subtitles': tree['subtitles'],
+            'generate_s': round(gen_time, 4),
+        }
+
+        manager = new_manager(config_dir, args.flush_delay)
+        manager.add_directory(course_root)
+
+        # Listing: the first call scans the whole tree, later calls revalidate it
+        cold, _ = timed(manager.get_directory_contents, course_root)
+        warm = [timed(manager.get_directory_contents, course_root)[0] for _ in range(args.repeat)]
+        results['listing'] = {'cold_ms': round(cold * 1000, 4), 'warm': summarize(warm)}
+
+        # Progress rollup from scratch and from the cached tree
+        rollup_cold = []
+        for _ in range(args.repeat):
+            manager.progress_tree.clear()
+            rollup_cold.append(timed(manager.calculate_directory_progress, course_root)[0])
+        rollup_warm = [timed(manager.calculate_directory_progress, course_root)[0] for _ in range(args.repeat)]
+        results['progress_rollup'] = {'cold': summarize(rollup_cold), 'warm': summarize(rollup_warm)}
+
+        # Toggle latency, including the read-back a view does after each click
+        rng = random.Random(args.seed)
+        sample = rng.sample(tree['file_paths'], min(args.toggles, len(tree['file_paths'])))
+        toggles = []
+        for path in sample:
+            elapsed, _ = timed(manager.update_file_watched_state, path, True)
+            toggles.append(elapsed + timed(manager.calculate_directory_progress, course_root, False)[0])
+        results['toggle'] = summarize(toggles)
+
+        # Bulk mark of one top-level section
+        section = os.path.join(course_root, sorted(
+            name for name in os.listdir(course_root) if os.path.isdir(os.path.join(course_root, name))
+        )[0]) if args.depth > 1 else course_root
+        bulk, _ = timed(manager.set_subtree_watched, section, True)
+        results['bulk_mark'] = {'ms': round(bulk * 1000, 4)}
+
+        # Persistence: flushing everything queued above, and a full state rewrite
+        flush, _ = timed(manager.flush)
+        manager.save_watched_files()
+        manager.save_progress()
+        full_save, _ = timed(manager.flush)
+        results['persistence'] = {
+            'flush_pending_ms': round(flush * 1000, 4),
+            'full_rewrite_ms': round(full_save * 1000, 4),
+            'state_db_bytes': sum(
+                os.path.getsize(path) for path in (
+                    os.path.join(config_dir, 'state.db'), os.path.join(config_dir, 'state.db-wal')
+                ) if os.path.exists(path)
+            ),
+        }
+
+        # Start-up of a second manager reading the persisted state
+        list(manager.iter_directory_progress(manager.directories))
+        manager.flush()
+        load, reloaded = timed(new_manager, config_dir, args.flush_delay)
+        results['load'] = {
+            'ms': round(load * 1000, 4),
+            'watched_entries': len(reloaded.watched_files),
+        }
+
+        # Course list after start-up: stored summaries, then the background revalidation
+        cached, _ = timed(list, reloaded.iter_cached_roots())
+        revalidate, _ = timed(list, reloaded.iter_directory_progress(reloaded.directories))
+        results['course_list'] = {
+            'cached_ms': round(cached * 1000, 4),
+            'revalidate_ms': round(revalidate * 1000, 4),
+        }
+        reloaded.close()
+        manager.close()
+
+    return {
+        'meta': {
+            'benchmark': 'manager',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args),
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=3, help='directory levels including the root')
+    parser.add_argument('--fanout', type=int, default=4, help='subdirectories per directory')
+    parser.add_argument('--files', type=int, default=20, help='lecture files per directory')
+    parser.add_argument('--subtitle-ratio', type=float, default=0.5, help='share of lectures with a subtitle file')
+    parser.add_argument('--toggles', type=int, default=200, help='number of watched toggles to time')
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions of listing and rollup timings')
+    parser.add_argument('--flush-delay', type=float, default=0.5, help='write-behind window in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Headless benchmarks for the library search index.
+
+Run from the repository root, no display needed:
+
+    python -m benchmarks.bench_search --depth 4 --fanout 6 --files 400 --output report.json
+
+The defaults build a library of about 100k files.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.bench_manager import summarize, timed
+from benchmarks.fixtures import generate_course_tree
+from search_index import SearchIndex
+
+# Typed queries: prefixes, numbers, words from folder names and a typo
+QUERIES = ('lec', 'lecture 12', 'section 3 lecture 7', '05 sect 2', 'lectrue 40', 'mp4', 'zzz')
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='search_bench_') as workdir:
+        course_root = os.path.join(workdir, 'course')
+        db_path = os.path.join(workdir, 'config', 'search.db')
+        gen_time, tree = timed(
+            generate_course_tree, course_root,
+            depth=args.depth, fanout=args.fanout, files_per_dir=args.files,
+            subtitle_ratio=0, seed=args.seed
+        )
+        results['fixture'] = {
+            'directories': tree['directories'],
+            'files': tree['files'],
+            'generate_s': round(gen_time, 4),
+        }
+
+        index = SearchIndex(db_path)
+        build, _ = timed(index.refresh, [course_root])
+        unchanged, _ = timed(index.refresh, [course_root])
+        with open(os.path.join(course_root, 'new lecture.mp4'), 'wb'):
+            pass
+        one_change, _ = timed(index.refresh, [course_root])
+        results['refresh'] = {
+            'entries': len(index),
+            'build_ms': round(build * 1000, 4),
+            'unchanged_ms': round(unchanged * 1000, 4),
+            'one_new_file_ms': round(one_change * 1000, 4),
+            'db_bytes': sum(os.path.getsize(path) for path in (db_path, db_path + '-wal') if os.path.exists(path)),
+        }
+        index.close()
+
+        # A second index reading the persisted entries, as at the next start
+        reloaded = SearchIndex(db_path)
+        load, _ = timed(reloaded.load)
+        results['load'] = {'ms': round(load * 1000, 4)}
+
+        queries = {}
+        for query in QUERIES:
+            samples = []
+            for _ in range(args.repeat):
+                elapsed, matches = timed(reloaded.search, query)
+                samples.append(elapsed)
+            queries[query] = dict(summarize(samples), results=len(matches))
+        results['queries'] = queries
+        reloaded.close()
+
+    return {
+        'meta': {
+            'benchmark': 'search',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args),
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=4, help='directory levels including the root')
+    parser.add_argument('--fanout', type=int, default=6, help='subdirectories per directory')
+    parser.add_argument('--files', type=int, default=400, help='lecture files per directory')
+    parser.add_argument('--repeat', type=int, default=10, help='repetitions of each query')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
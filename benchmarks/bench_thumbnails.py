@@ -0,0 +1,120 @@
+"""Thumbnail renderer throughput, comparing the providers of each kind.
+
+Renders generated PDF decks with every installed PDF provider, serially and
+through a process pool like the app's thumbnail pipeline:
+
+    python -m benchmarks.bench_thumbnails --files 40 --pages 20 --workers 3
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.bench_manager import summarize
+from benchmarks.fixtures import generate_pdf_decks
+from thumbnail_renderers import THUMBNAIL_SIZES, providers_for
+
+
+def provider_named(kind, name):
+    for provider in providers_for(kind):
+        if type(provider).__name__ == name:
+            return provider
+    raise LookupError(f"no {kind} provider named {name}")
+
+
+def render_with(kind, name, file_path):
+    """Render one file with one provider, returning (seconds, error or None)"""
+    provider = provider_named(kind, name)
+    start = time.perf_counter()
+    try:
+        data = provider.render(file_path, THUMBNAIL_SIZES[kind])
+        error = None if data else 'no image'
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - start, error
+
+
+def run_serial(kind, name, paths):
+    samples, errors = [], []
+    start = time.perf_counter()
+    for path in paths:
+        elapsed, error = render_with(kind, name, path)
+        samples.append(elapsed)
+        if error:
+            errors.append(error)
+    wall = time.perf_counter() - start
+    return {
+        'per_file': summarize(samples),
+        # Only successful renders count towards throughput
+        'files_per_s': round((len(paths) - len(errors)) / wall, 2) if wall else None,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+    }
+
+
+def run_pool(kind, name, paths, workers):
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        # Warm the workers so process start-up is not counted
+        list(executor.map(provider_named, [kind] * workers, [name] * workers))
+        start = time.perf_counter()
+        results = list(executor.map(render_with, [kind] * len(paths), [name] * len(paths), paths))
+        wall = time.perf_counter() - start
+    errors = sum(1 for _, error in results if error)
+    return {
+        'workers': workers,
+        'files_per_s': round((len(paths) - errors) / wall, 2) if wall else None,
+        'errors': errors,
+    }
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='course_bench_thumbs_') as workdir:
+        paths = generate_pdf_decks(workdir, count=args.files, pages=args.pages, seed=args.seed)
+        for provider in providers_for('pdf'):
+            name = type(provider).__name__
+            results[name] = {'serial': run_serial('pdf', name, paths)}
+            if args.workers > 0:
+                results[name]['pool'] = run_pool('pdf', name, paths, args.workers)
+    return {
+        'meta': {
+            'benchmark': 'thumbnails',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args),
+        },
+        'results': {'pdf': results},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=30, help='PDF decks to render')
+    parser.add_argument('--pages', type=int, default=10, help='pages per deck')
+    parser.add_argument('--workers', type=int, default=2, help='process pool size, 0 to skip the pool run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
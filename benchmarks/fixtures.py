@@ -0,0 +1,62 @@
+"""Synthetic course trees for the benchmarks."""
+import os
+import random
+
+LECTURE_EXTENSIONS = ('.mp4', '.mp4', '.mp4', '.pdf', '.html', '.txt')
+SUBTITLE_EXTENSIONS = ('.srt', '.vtt')
+
+
+def generate_course_tree(root, depth=3, fanout=4, files_per_dir=20, subtitle_ratio=0.5,
+                         file_size=0, seed=0):
+    """Create a course-like tree under root and return what was created.
+
+    Every directory down to depth gets files_per_dir lecture files (mostly
+    videos) and, for roughly subtitle_ratio of them, a matching subtitle file.
+    Directories above the last level get fanout numbered section folders.
+    """
+    rng = random.Random(seed)
+    counts = {'directories': 0, 'files': 0, 'subtitles': 0, 'file_paths': []}
+    payload = b'\0' * file_size
+
+    def fill(directory, level):
+        os.makedirs(directory, exist_ok=True)
+        counts['directories'] += 1
+        for index in range(1, files_per_dir + 1):
+            stem = f"{index}. Lecture {index}"
+            path = os.path.join(directory, stem + rng.choice(LECTURE_EXTENSIONS))
+            with open(path, 'wb') as f:
+                f.write(payload)
+            counts['files'] += 1
+            counts['file_paths'].append(path)
+            if rng.random() < subtitle_ratio:
+                with open(os.path.join(directory, stem + rng.choice(SUBTITLE_EXTENSIONS)), 'wb'):
+                    pass
+                counts['subtitles'] += 1
+        if level < depth:
+            for index in range(1, fanout + 1):
+                fill(os.path.join(directory, f"{index:02d}. Section {index}"), level + 1)
+
+    fill(os.fspath(root), 1)
+    return counts
+
+
+def generate_pdf_decks(directory, count=20, pages=10, page_size=(612, 792), seed=0):
+    """Write count multi-page PDFs (US Letter at 72 dpi by default) and return their paths"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(1, count + 1):
+        slides = []
+        for page in range(pages):
+            slide = Image.new('RGB', page_size, 'white')
+            draw = ImageDraw.Draw(slide)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            draw.rectangle((40, 40, page_size[0] - 40, page_size[1] // 3), fill=color)
+            draw.text((60, page_size[1] // 2), f"Slide {page + 1}", fill='black')
+            slides.append(slide)
+        path = os.path.join(directory, f"{index}. Slides {index}.pdf")
+        slides[0].save(path, save_all=True, append_images=slides[1:])
+        paths.append(path)
+    return paths
@@ -0,0 +1,320 @@
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+import mimetypes
+from FileItemWidget import icon_name_for, format_size
+from DirectoryItemWidget import progress_color
+from icon_cache import icon_pixmap
+
+THUMBNAIL_PAINT_SIZE = 36
+
+
+def thumbnail_key(file_path):
+    """QPixmapCache key of the painted thumbnail for file_path"""
+    return f"thumb:{file_path}"
+
+
+class ContentRow:
+    """Plain data behind one row of the content list"""
+    __slots__ = ('kind', 'path', 'name', 'progress', 'watched', 'mime_type', 'size')
+
+    def __init__(self, record):
+        self.kind = record.kind
+        self.path = record.path
+        self.name = record.name
+        self.progress = record.progress
+        self.watched = bool(record.watched)
+        self.mime_type = mimetypes.guess_type(record.path)[0] if record.kind == 'file' else None
+        self.size = record.size
+
+
+class ContentListModel(QAbstractListModel):
+    """Rows of the current listing for the painted (virtualized) content view"""
+    PathRole = Qt.ItemDataRole.UserRole
+    KindRole = Qt.ItemDataRole.UserRole + 1
+    ProgressRole = Qt.ItemDataRole.UserRole + 2
+    SizeRole = Qt.ItemDataRole.UserRole + 3
+    MimeTypeRole = Qt.ItemDataRole.UserRole + 4
+
+    watchedToggled = pyqtSignal(str, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.showing_roots = False
+        self._index_by_path = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.name
+        if role == self.PathRole:
+            return row.path
+        if role == self.KindRole:
+            return row.kind
+        if role == self.ProgressRole:
+            return row.progress
+        if role == self.MimeTypeRole:
+            return row.mime_type
+        if role == self.SizeRole:
+            return row.size
+        if role == Qt.ItemDataRole.CheckStateRole and row.kind == 'file':
+            return Qt.CheckState.Checked if row.watched else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.DecorationRole and row.kind == 'file':
+            return QPixmapCache.find(thumbnail_key(row.path))
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row.path
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self.rows[index.row()].kind == 'file':
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        row = self.rows[index.row()]
+        if row.kind != 'file':
+            return False
+        watched = Qt.CheckState(value) == Qt.CheckState.Checked
+        if watched != row.watched:
+            row.watched = watched
+            self.dataChanged.emit(index, index, [role])
+            self.watchedToggled.emit(row.path, watched)
+        return True
+
+    def clear(self, showing_roots=False):
+        self.beginResetModel()
+        self.rows = []
+        self._index_by_path = {}
+        self.showing_roots = showing_roots
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Append EntryRecords as streamed by the scan service"""
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for offset, record in enumerate(rows):
+            self.rows.append(ContentRow(record))
+            self._index_by_path[record.path] = first + offset
+        self.endInsertRows()
+
+    def sync_rows(self, records):
+        """Patch the rows to match a fresh listing, keeping unchanged rows in place"""
+        wanted = {record.path for record in records}
+        for row in reversed(range(len(self.rows))):
+            if self.rows[row].path not in wanted:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+        
+        for row, record in enumerate(records):
+            if row < len(self.rows) and self.rows[row].path == record.path:
+                current = self.rows[row]
+                if (current.progress, current.watched, current.size) != (record.progress, record.watched, record.size):
+                    self.rows[row] = ContentRow(record)
+                    self.dataChanged.emit(self.index(row), self.index(row))
+                continue
+            stale = next((i for i in range(row, len(self.rows)) if self.rows[i].path == record.path), None)
+            if stale is not None:
+                self.beginRemoveRows(QModelIndex(), stale, stale)
+                del self.rows[stale]
+                self.endRemoveRows()
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.insert(row, ContentRow(record))
+            self.endInsertRows()
+        
+        self._index_by_path = {row.path: i for i, row in enumerate(self.rows)}
+
+    def index_for_path(self, path):
+        row = self._index_by_path.get(path)
+        return self.index(row) if row is not None else QModelIndex()
+
+    def set_progress(self, path, progress):
+        index = self.index_for_path(path)
+        if index.isValid():
+            self.rows[index.row()].progress = progress
+            self.dataChanged.emit(index, index, [self.ProgressRole])
+
+    def set_thumbnail(self, path, pixmap):
+        """Keep a rendered thumbnail in QPixmapCache and repaint its row"""
+        QPixmapCache.insert(thumbnail_key(path), pixmap.scaled(
+            THUMBNAIL_PAINT_SIZE, THUMBNAIL_PAINT_SIZE,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        ))
+        index = self.index_for_path(path)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def set_watched(self, path, watched):
+        """Reflect a watched change made elsewhere without re-emitting watchedToggled"""
+        index = self.index_for_path(path)
+        if index.isValid() and self.rows[index.row()].watched != watched:
+            self.rows[index.row()].watched = watched
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+
+
+class ContentItemDelegate(QStyledItemDelegate):
+    """Paint content rows directly instead of building a widget per row.
+
+    Only rows inside the viewport are ever painted, so a directory with
+    thousands of entries costs no more than the rows on screen.
+    """
+    ROW_HEIGHT = 64
+    ROOT_ROW_HEIGHT = 80
+    ICON_SIZE = 32
+    CHECKBOX_SIZE = 18
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._name_font = QFont('SF Pro Display', 10)
+        self._name_font.setPixelSize(13)
+        self._name_font.setWeight(QFont.Weight.DemiBold)
+        self._detail_font = QFont('SF Pro Display', 10)
+        self._detail_font.setPixelSize(11)
+
+    def sizeHint(self, option, index):
+        model = index.model()
+        height = self.ROOT_ROW_HEIGHT if getattr(model, 'showing_roots', False) else self.ROW_HEIGHT
+        return QSize(0, height)
+
+    def row_rect(self, option):
+        return option.rect.adjusted(4, 4, -12, -4)
+
+    def checkbox_rect(self, option):
+        rect = self.row_rect(option)
+        size = self.CHECKBOX_SIZE
+        return QRect(rect.right() - 16 - size, rect.center().y() - size // 2, size, size)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.row_rect(option)
+        kind = index.data(ContentListModel.KindRole)
+
+        # Card background
+        if option.state & QStyle.StateFlag.State_Selected:
+            background, border = QColor('#e7f5ff'), QColor('#74c0fc')
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            background, border = QColor('#f8f9fa'), QColor('#e9ecef')
+        else:
+            background, border = QColor('#ffffff'), QColor('#ffffff')
+        painter.setPen(QPen(border, 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(QRectF(rect), 8, 8)
+
+        # Icon container
+        container = QRect(rect.left() + 12, rect.center().y() - 22, 44, 44)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor('#f1f3f5'))
+        painter.drawRoundedRect(QRectF(container), 10, 10)
+        dpr = painter.device().devicePixelRatioF()
+        if kind == 'directory':
+            pixmap = icon_pixmap('folder.png', self.ICON_SIZE, fallback='folder', device_pixel_ratio=dpr)
+        else:
+            pixmap = index.data(Qt.ItemDataRole.DecorationRole) or icon_pixmap(icon_name_for(
+                index.data(ContentListModel.PathRole),
+                index.data(ContentListModel.MimeTypeRole)
+            ), self.ICON_SIZE, device_pixel_ratio=dpr)
+        size = pixmap.deviceIndependentSize()
+        painter.drawPixmap(
+            QPointF(container.left() + (container.width() - size.width()) / 2,
+                    container.top() + (container.height() - size.height()) / 2),
+            pixmap
+        )
+
+        text_left = container.right() + 12
+        text_right = rect.right() - (70 if kind == 'file' else 16)
+        name_rect = QRect(text_left, rect.center().y() - 20, text_right - text_left, 20)
+        painter.setFont(self._name_font)
+        painter.setPen(QColor('#2c3e50'))
+        name = painter.fontMetrics().elidedText(
+            index.data(Qt.ItemDataRole.DisplayRole), Qt.TextElideMode.ElideRight, name_rect.width()
+        )
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
+
+        details_top = rect.center().y() + 4
+        painter.setFont(self._detail_font)
+        if kind == 'directory':
+            self.paint_progress(painter, text_left, details_top, index.data(ContentListModel.ProgressRole))
+        else:
+            self.paint_file_details(painter, option, index, text_left, details_top)
+
+        painter.restore()
+
+    def paint_progress(self, painter, left, top, progress):
+        color = QColor(progress_color(progress))
+        track = QRectF(left, top + 6, 180, 6)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor('#f0f0f0'))
+        painter.drawRoundedRect(track, 3, 3)
+        if progress > 0:
+            painter.setBrush(color)
+            painter.drawRoundedRect(QRectF(left, top + 6, 180 * min(progress, 100) / 100, 6), 3, 3)
+        painter.setPen(color)
+        painter.drawText(
+            QRect(left + 190, top, 60, 18),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            f"{progress:.1f}%"
+        )
+
+    def paint_file_details(self, painter, option, index, left, top):
+        mime_type = index.data(ContentListModel.MimeTypeRole) or "unknown"
+        badge_text = mime_type.split('/')[-1].upper()
+        metrics = painter.fontMetrics()
+        badge = QRect(left, top, metrics.horizontalAdvance(badge_text) + 16, 18)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor('#e9ecef'))
+        painter.drawRoundedRect(QRectF(badge), 4, 4)
+        painter.setPen(QColor('#495057'))
+        painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, badge_text)
+
+        size = index.data(ContentListModel.SizeRole)
+        if size is not None and size >= 0:
+            painter.setPen(QColor('#6c757d'))
+            painter.drawText(
+                QRect(badge.right() + 8, top, 100, 18),
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                format_size(size)
+            )
+
+        # Watched checkbox
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        box = self.checkbox_rect(option)
+        painter.setPen(QColor('#6c757d'))
+        painter.drawText(
+            QRect(box.left() - 60, box.top(), 54, box.height()),
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+            "Watched"
+        )
+        painter.setPen(QPen(QColor('#0d6efd' if checked else '#adb5bd'), 2))
+        painter.setBrush(QColor('#0d6efd') if checked else Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(QRectF(box).adjusted(1, 1, -1, -1), 4, 4)
+        if checked:
+            painter.drawPixmap(box, icon_pixmap(
+                'check.png', self.CHECKBOX_SIZE, device_pixel_ratio=painter.device().devicePixelRatioF()
+            ))
+
+    def editorEvent(self, event, model, option, index):
+        """Toggle the watched state when the painted checkbox is clicked"""
+        if index.data(ContentListModel.KindRole) != 'file':
+            return False
+        if event.type() in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonDblClick):
+            return self.checkbox_rect(option).contains(event.position().toPoint())
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self.checkbox_rect(option).contains(event.position().toPoint())):
+            checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+            new_state = Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked
+            return model.setData(index, new_state.value, Qt.ItemDataRole.CheckStateRole)
+        return False
@@ -1,21 +1,52 @@
 import os
 from pathlib import Path
 import json
-from natsort import natsorted
+from progress_tree import ProgressTree
+from entry_records import EntryRecord, SORT_MODES, natural_key, scan_entries, sort_records
+from watched_store import WatchedStore
+from path_index import PathIndex
+from search_index import SearchIndex, DEFAULT_LIMIT as SEARCH_LIMIT
+from media_index import MediaIndex, is_media_file
+from persistence import DeferredWriter, atomic_write_json, DEFAULT_FLUSH_DELAY
+import threading
+import time
+
+# Watched flags and progress used to live as JSON next to the sources
+LEGACY_CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
+STATE_EXPORT_VERSION = 1  # format of export_state()
 
 class CourseManager:
-    def __init__(self):
-        self.config_dir = Path.home() / '.course_organizer'
+    def __init__(self, flush_delay=DEFAULT_FLUSH_DELAY, config_dir=None, legacy_config_dir=LEGACY_CONFIG_DIR,
+                 fingerprint_files=True):
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / '.course_organizer'
         self.progress_file = self.config_dir / 'progress.json'
         self.directories_file = self.config_dir / 'directories.json'
         
         # Create config directory if it doesn't exist
-        self.config_dir.mkdir(exist_ok=True)
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Mutations are coalesced for flush_delay seconds, then written in one go
+        self.writer = DeferredWriter(flush_delay)
+        self._pending_lock = threading.Lock()
+        self._pending_watched = {}   # (directory, filename) -> watched
+        self._pending_progress = {}  # path -> progress
+        # Record the size of files as they are marked watched, see check_relink()
+        self.fingerprint_files = fingerprint_files
         
-        # Load saved data
+        # Watched flags and progress are stored in SQLite, migrated from JSON once
+        self.store = WatchedStore(self.config_dir / 'state.db')
+        if legacy_config_dir and self.store.is_empty:
+            self.store.import_json(
+                os.path.join(legacy_config_dir, 'watched.json'),
+                os.path.join(legacy_config_dir, 'progress.json')
+            )
+        
+        # Load saved data; watched flags and progress are PathIndex tries keyed by path
         self.directories = self.load_directories()
         self.watched_files = self.load_watched_files()
         self.progress = self.load_progress()
+        # Last known counts per root, so the course list can show before any scan
+        self.summaries = self.store.load_summaries()
         
         # Define excluded file types
         self.excluded_extensions = {
@@ -28,28 +59,31 @@ class CourseManager:
             '.idx',  # VobSub index
             '.mks',  # Matroska subtitles
         }
+        
+        # Order of directory listings, one of SORT_MODES
+        self.sort_mode = 'name'
+        
+        # Cached per-directory progress aggregates
+        self.progress_tree = ProgressTree(self.is_excluded_file, self.is_file_watched)
+        
+        # Filename index over every root, loaded and refreshed in the background
+        self.search_index = SearchIndex(self.config_dir / 'search.db', self.is_excluded_file)
+        
+        # Media durations for time-weighted progress, probed in the background
+        self.media_index = MediaIndex(self.config_dir / 'media.db')
 
     def load_progress(self):
-        """Load progress data from file"""
+        """Load progress data from the state store"""
         try:
-            config_path = os.path.join(os.path.dirname(__file__), 'config', 'progress.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    return json.load(f)
+            return self.store.load_progress()
         except Exception as e:
             print(f"Error loading progress: {e}")
-        return {}
+        return PathIndex()
 
     def save_progress(self):
-        """Save progress data to file"""
-        try:
-            config_dir = os.path.join(os.path.dirname(__file__), 'config')
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, 'progress.json')
-            with open(config_path, 'w') as f:
-                json.dump(self.progress, f)
-        except Exception as e:
-            print(f"Error saving progress: {e}")
+        """Write the whole progress mapping to the state store"""
+        snapshot = list(self.progress.items())
+        self.writer.schedule('progress', lambda: self.store.replace_progress(snapshot))
 
     def load_directories(self):
         if self.directories_file.exists():
@@ -61,18 +95,18 @@ class CourseManager:
         return []
 
     def _save_directories(self):
-        try:
-            with open(self.directories_file, 'w') as f:
-                json.dump(self.directories, f, indent=2)
-        except Exception as e:
-            print(f"Error saving directories: {e}")
+        snapshot = list(self.directories)
+        self.writer.schedule(
+            'directories',
+            lambda: atomic_write_json(self.directories_file, snapshot, indent=2)
+        )
 
     def add_directory(self, directory):
         """Add directory with natural sorting"""
         if directory not in self.directories:
             self.directories.append(directory)
             # Sort directories naturally
-            self.directories = natsorted(self.directories)
+            self.directories.sort(key=natural_key)
             self._save_directories()
             return True
         return False
@@ -81,14 +115,82 @@ class CourseManager:
         if directory in self.directories:
             self.directories.remove(directory)
             self._save_directories()
+            if self.summaries.pop(directory, None) is not None:
+                self._save_summaries()
             return True
         return False
 
+    def check_relink(self, old_root, new_root):
+        """Compare the watched files recorded under old_root with new_root.
+
+        Returns counts of watched files found at the same relative path in
+        new_root ('matched'), found with a different size than when they were
+        marked ('changed') and not found at all ('missing').
+        """
+        old_root = os.path.normpath(old_root)
+        self.flush()
+        fingerprints = self.store.load_fingerprints(old_root)
+        counts = {'matched': 0, 'changed': 0, 'missing': 0}
+        for directory, filename, watched in self.watched_files.entries(old_root):
+            if not watched:
+                continue
+            relative = os.path.relpath(os.path.join(directory, filename), old_root)
+            try:
+                size = os.stat(os.path.join(new_root, relative)).st_size
+            except OSError:
+                counts['missing'] += 1
+                continue
+            expected = fingerprints.get((directory, filename))
+            counts['matched' if expected is None or expected == size else 'changed'] += 1
+        return counts
+
+    def relink_directory(self, old_root, new_root):
+        """Re-bind the state of a moved course (or a folder of courses) to its new path.
+
+        Watched flags, progress, fingerprints and media durations at or below
+        old_root move in one bulk pass, and registered roots at or below it are
+        renamed to match. Returns how many watched entries moved.
+        """
+        old_root, new_root = os.path.normpath(old_root), os.path.normpath(new_root)
+        if old_root == new_root:
+            return 0
+        prefix = old_root.rstrip(os.sep) + os.sep
+        if new_root.startswith(prefix):
+            raise ValueError(f"Cannot relink {old_root} into its own subfolder {new_root}")
+        # Queued rows still name the old paths; write them before moving
+        self.flush()
+        self.store.relink(old_root, new_root)
+        moved = self.watched_files.move(old_root, new_root)
+        self.progress.move(old_root, new_root)
+        # Moved files keep their size and mtime, so their durations stay valid
+        self.media_index.relink(old_root, new_root)
+        
+        relinked = []
+        for directory in self.directories:
+            normalized = os.path.normpath(directory)
+            if normalized == old_root:
+                relinked.append(new_root)
+            elif normalized.startswith(prefix):
+                relinked.append(os.path.join(new_root, normalized[len(prefix):]))
+            else:
+                relinked.append(directory)
+                continue
+            # The course keeps its last known counts until it is scanned again
+            summary = self.summaries.pop(directory, None)
+            if summary is not None:
+                self.summaries[relinked[-1]] = summary
+        self.directories = sorted(dict.fromkeys(relinked), key=natural_key)
+        self._save_directories()
+        self._save_summaries()
+        self.progress_tree.clear()
+        return moved
+
     def set_excluded_extensions(self, extensions):
         """Update the list of excluded file extensions."""
         if isinstance(extensions, (list, set)):
             self.excluded_extensions = {ext.lower() if ext.startswith('.') else f'.{ext.lower()}' 
                                      for ext in extensions}
+            self.progress_tree.clear()
     
     def add_excluded_extension(self, extension):
         """Add a single extension to excluded list."""
@@ -96,6 +198,7 @@ class CourseManager:
             ext = extension.lower()
             ext = ext if ext.startswith('.') else f'.{ext}'
             self.excluded_extensions.add(ext)
+            self.progress_tree.clear()
     
     def remove_excluded_extension(self, extension):
         """Remove a single extension from excluded list."""
@@ -103,6 +206,7 @@ class CourseManager:
             ext = extension.lower()
             ext = ext if ext.startswith('.') else f'.{ext}'
             self.excluded_extensions.discard(ext)
+            self.progress_tree.clear()
     
     def is_excluded_file(self, file_path):
         """Check if a file should be excluded."""
@@ -114,111 +218,392 @@ class CourseManager:
         files = []
         
         try:
-            # Get all items and sort them naturally
-            items = natsorted(os.listdir(directory))
-            
-            for item in items:
-                item_path = os.path.join(directory, item)
-                
-                if os.path.isdir(item_path):
-                    progress = self.calculate_directory_progress(item_path)
-                    subdirs.append((item_path, progress))
+            for record in self.iter_directory_contents(directory):
+                if record.is_directory:
+                    subdirs.append((record.path, record.progress))
                 else:
-                    # Skip excluded file types
-                    if not self.is_excluded_file(item_path):
-                        is_watched = self.is_file_watched(item_path)
-                        files.append((item_path, is_watched))
-                    
-            # Sort subdirectories and files naturally by their paths
-            subdirs = natsorted(subdirs, key=lambda x: x[0])
-            files = natsorted(files, key=lambda x: x[0])
-            
+                    files.append((record.path, record.watched))
             return subdirs, files
         except Exception as e:
             raise Exception(f"Error reading directory: {e}")
 
-    def calculate_directory_progress(self, directory):
-        """Calculate directory progress based on watched files"""
-        if not os.path.exists(directory):
+    def set_sort_mode(self, mode):
+        """Choose the order of directory listings: one of SORT_MODES"""
+        if mode not in SORT_MODES:
+            raise ValueError(f"Unknown sort mode: {mode}")
+        self.sort_mode = mode
+
+    def iter_directory_contents(self, directory, sort_mode=None):
+        """Yield EntryRecords for subdirectories, then for files, in sort_mode order.
+
+        The listing is taken up front in a single scandir pass. Each folder's
+        progress is looked up (and on a first visit, its subtree scanned) just
+        before its record is yielded, so callers such as the scan service show
+        the first rows without waiting for the whole subtree; only the
+        'watched' order needs every folder's progress before sorting. Records
+        carry their natural sort key, so they can be re-sorted later with
+        sort_records() without listing again.
+        """
+        sort_mode = sort_mode or self.sort_mode
+        
+        subdirs, files, listing = scan_entries(directory, self.is_excluded_file)
+        
+        # The progress tree takes this listing instead of listing the directory again
+        known = self.progress_tree.cached(directory) is not None
+        if known:
+            self.progress_tree.update(directory, listing)
+        
+        fill_first = sort_mode == 'watched'
+        if fill_first:
+            for record in subdirs:
+                self.fill_directory_record(record)
+        for record in sort_records(subdirs, sort_mode):
+            if not fill_first:
+                self.fill_directory_record(record)
+            yield record
+        if not known:
+            # First visit: hook the subfolders scanned above in under the directory
+            self.progress_tree.update(directory, listing)
+        for record in files:
+            record.watched = self.is_file_watched(record.path)
+        yield from sort_records(files, sort_mode)
+
+    def iter_directory_progress(self, directories):
+        """Yield directory EntryRecords for naturally sorted directories.
+
+        The summaries of registered roots among them are refreshed on the way.
+        """
+        for directory in sorted(directories, key=natural_key):
+            record = self.fill_directory_record(EntryRecord('directory', directory))
+            if directory in self.directories and os.path.isdir(directory):
+                record.size = self.update_summary(directory)['bytes']
+            yield record
+
+    def iter_cached_roots(self):
+        """Yield directory EntryRecords of the roots with a stored summary.
+
+        Nothing is read from disk; the records show the counts of the last
+        scan until iter_directory_progress() has revalidated them. Roots
+        still in the progress tree take their counts from it, so toggles made
+        since the summary was stored show up.
+        """
+        for directory in sorted(self.directories, key=natural_key):
+            summary = self.summaries.get(directory)
+            if summary is None:
+                continue
+            node = self.progress_tree.cached(directory)
+            if node is not None:
+                yield EntryRecord(
+                    'directory', directory, size=summary['bytes'],
+                    file_count=node.file_count, folder_count=node.folder_count,
+                    progress=node.progress
+                )
+                continue
+            total = summary['total']
+            yield EntryRecord(
+                'directory', directory, size=summary['bytes'],
+                file_count=summary['file_count'], folder_count=summary['folder_count'],
+                progress=(summary['watched'] / total * 100) if total > 0 else 0
+            )
+
+    def update_summary(self, root, count_bytes=True):
+        """Record the current counts of root from the progress tree and queue them
+        for the store; returns the summary. Without count_bytes the stored total
+        size is kept rather than stat'ing every file."""
+        node = self.progress_tree.get(root, revalidate=False)
+        previous = self.summaries.get(root)
+        if count_bytes or previous is None:
+            size = self.progress_tree.subtree_bytes(node)
+        else:
+            size = previous['bytes']
+        summary = self.summaries[root] = {
+            'total': node.total,
+            'watched': node.watched,
+            'file_count': node.file_count,
+            'folder_count': node.folder_count,
+            'bytes': size,
+            'scanned': time.time(),
+        }
+        self._save_summaries()
+        return summary
+
+    def _save_summaries(self):
+        snapshot = dict(self.summaries)
+        self.writer.schedule('summaries', lambda: self.store.replace_summaries(snapshot))
+
+    def fill_directory_record(self, record, revalidate=True):
+        """Fill progress, counts and mtime of a directory record from the progress tree"""
+        if not os.path.isdir(record.path):
+            return record
+        node = self.progress_tree.get(record.path, revalidate)
+        record.progress = node.progress
+        record.file_count = node.file_count
+        record.folder_count = node.folder_count
+        if node.mtime is not None:
+            record.mtime = node.mtime / 1e9
+        return record
+
+    def refresh_directory(self, directory):
+        """Patch cached listing and progress after directory changed on disk"""
+        return self.progress_tree.refresh(directory)
+
+    def calculate_directory_progress(self, directory, revalidate=True):
+        """Calculate directory progress based on watched files.
+
+        Served from the progress tree; with revalidate only directories whose
+        mtime changed since the last scan are listed again.
+        """
+        return self.progress_tree.progress(directory, revalidate)
+
+    def index_media(self, directory):
+        """Probe durations of new or changed media files below directory.
+
+        Meant for a worker thread; returns the number of files probed.
+        """
+        if not os.path.isdir(directory):
             return 0
-            
-        total_files = 0
-        watched_files = 0
-        
-        # Count files in directory
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                # Only count non-excluded files
-                if not self.is_excluded_file(file_path):
-                    total_files += 1
-                    if self.is_file_watched(file_path):
-                        watched_files += 1
-        
-        return (watched_files / total_files * 100) if total_files > 0 else 0
+        probed = 0
+        for path, names in self.progress_tree.subtree_files(self.progress_tree.get(directory)):
+            probed += self.media_index.update(path, names)
+        return probed
+
+    def time_progress(self, directory, revalidate=False):
+        """Duration-weighted progress of directory, from the media index only.
+
+        Returns a dict of total, watched and remaining seconds, the watched
+        share of the time in percent and the number of media files whose
+        duration is not known (yet). No file is opened.
+        """
+        total = watched = 0.0
+        unknown = 0
+        if os.path.isdir(directory):
+            node = self.progress_tree.get(directory, revalidate)
+            for path, names in self.progress_tree.subtree_files(node):
+                durations = self.media_index.durations_in(path)
+                flags = self.watched_files.values_in(path)
+                for name in names:
+                    if not is_media_file(name):
+                        continue
+                    seconds = durations.get(name)
+                    if seconds is None:
+                        unknown += 1
+                    else:
+                        total += seconds
+                        if flags.get(name):
+                            watched += seconds
+        return {
+            'total': total,
+            'watched': watched,
+            'remaining': total - watched,
+            'progress': (watched / total * 100) if total > 0 else 0,
+            'unknown': unknown,
+        }
+
+    def refresh_search_index(self):
+        """Re-list changed directories below the roots into the search index"""
+        return self.search_index.refresh(list(self.directories))
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Return EntryRecords of the files and folders matching query across all roots.
+
+        Records are named by their path below the root's parent folder;
+        folders carry their last stored progress rather than a fresh scan.
+        Nothing is found until the index is loaded, e.g. by
+        refresh_search_index().
+        """
+        records = []
+        for path, kind, label in self.search_index.search(query, limit):
+            record = EntryRecord(kind, path, label)
+            if kind == 'directory':
+                record.progress = self.progress.get(path, 0)
+            else:
+                record.watched = self.is_file_watched(path)
+            records.append(record)
+        return records
 
     def update_file_progress(self, file_path, watched):
-        self.progress[file_path] = watched
-        self.save_progress()
+        self.progress.set(file_path, watched)
+        self._queue_state(progress={file_path: watched})
 
     def load_watched_files(self):
-        """Load watched files from config, defaulting to False"""
+        """Load watched files from the state store, defaulting to False"""
         try:
-            config_path = os.path.join(os.path.dirname(__file__), 'config', 'watched.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    data = json.load(f)
-                    # Ensure all values are explicitly boolean
-                    return {
-                        directory: {
-                            filename: bool(watched)
-                            for filename, watched in files.items()
-                        }
-                        for directory, files in data.items()
-                    }
+            return self.store.load_watched()
         except Exception as e:
             print(f"Error loading watched files: {e}")
-        return {}
+        return PathIndex()
 
     def save_watched_files(self):
-        """Save watched files to config with explicit False values"""
+        """Write every watched flag to the state store with explicit False values"""
+        snapshot = list(self.watched_files.entries())
+        self.writer.schedule('watched', lambda: self.store.replace_watched(snapshot))
+
+    def _queue_state(self, watched=None, progress=None):
+        """Queue changed watched/progress rows for the next coalesced flush"""
+        with self._pending_lock:
+            self._pending_watched.update(watched or {})
+            self._pending_progress.update(progress or {})
+        self.writer.schedule('state', self._write_state)
+
+    def _write_state(self):
+        with self._pending_lock:
+            watched, self._pending_watched = self._pending_watched, {}
+            progress, self._pending_progress = self._pending_progress, {}
+        if watched:
+            self.store.set_many_watched(
+                (directory, filename, value) for (directory, filename), value in watched.items()
+            )
+        if progress:
+            self.store.set_many_progress(progress.items())
+        if watched and self.fingerprint_files:
+            # Stat on the writer thread rather than when the checkbox is clicked
+            fingerprints = []
+            for (directory, filename), value in watched.items():
+                if value:
+                    try:
+                        fingerprints.append((directory, filename, os.stat(os.path.join(directory, filename)).st_size))
+                    except OSError:
+                        pass
+            if fingerprints:
+                self.store.set_many_fingerprints(fingerprints)
+
+    def export_state(self):
+        """Return roots, watched flags and progress as one JSON-serializable dict"""
+        watched = {}
+        for directory, filename, value in self.watched_files.entries():
+            watched.setdefault(directory, {})[filename] = value
+        return {
+            'version': STATE_EXPORT_VERSION,
+            'directories': list(self.directories),
+            'watched': watched,
+            'progress': dict(self.progress.items()),
+        }
+
+    def import_state(self, state, replace=False):
+        """Load a dict written by export_state(), merged into the current state
+        or replacing it. Returns the number of watched entries read.
+        
+        The whole dict is checked first; a malformed one raises ValueError
+        and leaves the current state untouched."""
+        if not isinstance(state, dict):
+            raise ValueError("Expected a JSON object as written by export")
+        version = state.get('version', STATE_EXPORT_VERSION)
+        if not isinstance(version, int):
+            raise ValueError(f"Invalid state version: {version!r}")
+        if version > STATE_EXPORT_VERSION:
+            raise ValueError(f"Unsupported state version: {version}")
+        directories = state.get('directories', [])
+        if not isinstance(directories, list) or not all(isinstance(d, str) for d in directories):
+            raise ValueError("'directories' must be a list of paths")
+        watched = state.get('watched', {})
+        if not isinstance(watched, dict) or not all(isinstance(files, dict) for files in watched.values()):
+            raise ValueError("'watched' must map directories to {file name: flag}")
+        progress = state.get('progress', {})
+        if not isinstance(progress, dict):
+            raise ValueError("'progress' must map paths to numbers")
         try:
-            config_dir = os.path.join(os.path.dirname(__file__), 'config')
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, 'watched.json')
-            
-            # Ensure all values are explicitly False if not True
-            watched_data = {}
-            for directory, files in self.watched_files.items():
-                watched_data[directory] = {
-                    filename: bool(watched) 
-                    for filename, watched in files.items()
-                }
-            
-            with open(config_path, 'w') as f:
-                json.dump(watched_data, f, indent=2, default=lambda x: False)
-                
-        except Exception as e:
-            print(f"Error saving watched files: {e}")
+            progress = {path: float(value) for path, value in progress.items()}
+        except (TypeError, ValueError):
+            raise ValueError("'progress' must map paths to numbers") from None
+        
+        if replace:
+            self.directories = []
+            self.watched_files = PathIndex()
+            self.progress = PathIndex()
+            # Rows queued before the replace must not be written over it
+            with self._pending_lock:
+                self._pending_watched = {}
+                self._pending_progress = {}
+        for directory in directories:
+            if directory not in self.directories:
+                self.directories.append(directory)
+        self.directories.sort(key=natural_key)
+        
+        changed = {}
+        for directory, files in watched.items():
+            values = {filename: bool(value) for filename, value in files.items()}
+            self.watched_files.set_many(directory, values)
+            for filename, value in values.items():
+                changed[(directory, filename)] = value
+        for path, value in progress.items():
+            self.progress.set(path, value)
+        
+        self._save_directories()
+        if replace:
+            self.save_watched_files()
+            self.save_progress()
+        else:
+            self._queue_state(watched=changed, progress=progress)
+        self.progress_tree.clear()
+        return len(changed)
+
+    def flush(self):
+        """Write every pending change now, e.g. before the app exits"""
+        self.writer.flush()
+
+    def close(self):
+        """Flush pending changes and release the state store"""
+        # Roots scanned this session keep the counts they were left with
+        for directory in self.directories:
+            if self.progress_tree.cached(directory) is not None:
+                self.update_summary(directory, count_bytes=False)
+        self.writer.flush()
+        self.store.close()
+        self.search_index.close()
+        self.media_index.close()
 
     def update_file_watched_state(self, file_path, watched):
         """Update file watched state and recalculate progress"""
         directory = os.path.dirname(file_path)
-        if directory not in self.watched_files:
-            self.watched_files[directory] = {}
+        filename = os.path.basename(file_path)
+        was_watched = self.is_file_watched(file_path)
+        self.watched_files.set(file_path, bool(watched))
         
-        self.watched_files[directory][os.path.basename(file_path)] = watched
-        self.save_watched_files()
+        # Update progress by adjusting only the ancestor chain
+        self.progress_tree.set_watched(file_path, was_watched, watched)
+        progress = self.calculate_directory_progress(directory, revalidate=False)
+        self.progress.set(directory, progress)
         
-        # Update progress
-        progress = self.calculate_directory_progress(directory)
-        self.progress[directory] = progress
-        self.save_progress()
+        # Persist just the two changed rows, coalesced with other recent changes
+        self._queue_state(
+            watched={(directory, filename): bool(watched)},
+            progress={directory: progress}
+        )
         
         return progress
 
+    def set_subtree_watched(self, directory, watched):
+        """Mark every file below directory watched or unwatched in one pass.
+
+        The tree is walked once from the progress cache, the ancestor progress is
+        rolled up once and all changed rows go to the store in a single flush.
+        """
+        watched = bool(watched)
+        node = self.progress_tree.get(directory)
+        changed = {}
+        progress = {}
+        
+        for current in self.progress_tree.subtree_nodes(node):
+            if current.files:
+                self.watched_files.set_many(current.path, dict.fromkeys(current.files, watched))
+                for filename in current.files:
+                    changed[(current.path, filename)] = watched
+        
+        self.progress_tree.set_subtree_watched(node, watched)
+        
+        # Refresh the stored progress of the subtree and of its cached ancestors
+        ancestor = node.parent
+        while ancestor is not None:
+            progress[ancestor.path] = ancestor.progress
+            ancestor = ancestor.parent
+        for current in self.progress_tree.subtree_nodes(node):
+            progress[current.path] = current.progress
+        for path, value in progress.items():
+            self.progress.set(path, value)
+        
+        self._queue_state(watched=changed, progress=progress)
+        return node.progress
+
     def is_file_watched(self, file_path):
         """Check if a file is watched"""
-        directory = os.path.dirname(file_path)
-        filename = os.path.basename(file_path)
-        return self.watched_files.get(directory, {}).get(filename, False)
\ No newline at end of file
+        return self.watched_files.get(file_path, False)
\ No newline at end of file
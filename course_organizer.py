@@ -0,0 +1,269 @@
+"""Manage course roots and watched state from the command line.
+
+    python -m course_organizer add ~/Courses/Algorithms
+    python -m course_organizer mark "~/Courses/Algorithms/Week 1/*.mp4"
+    python -m course_organizer durations
+    python -m course_organizer progress --json
+    python -m course_organizer export state.json
+
+Works on the same state as the app, without Qt, so it starts in a fraction
+of a second and can run from cron or shell scripts.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+from course_manager import CourseManager
+from media_index import format_duration
+
+GLOB_CHARACTERS = '*?['
+
+
+def expand_paths(patterns):
+    """Yield (pattern, absolute path or None) for every path a pattern names"""
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if any(character in pattern for character in GLOB_CHARACTERS):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern] if os.path.exists(pattern) else []
+        if not matches:
+            yield pattern, None
+        for path in matches:
+            yield pattern, os.path.abspath(path)
+
+
+def course_rows(manager, roots):
+    """Progress of each root as a dict, missing roots included"""
+    rows = []
+    for root in roots:
+        if not os.path.isdir(root):
+            rows.append({'course': root, 'missing': True, 'files': 0, 'watched': 0, 'progress': 0.0})
+            continue
+        node = manager.progress_tree.get(root)
+        # Time-weighted figures only cover durations probed by `durations`
+        time = manager.time_progress(root)
+        rows.append({
+            'course': root,
+            'missing': False,
+            'files': node.total,
+            'watched': node.watched,
+            'progress': round(node.progress, 1),
+            'time_progress': round(time['progress'], 1),
+            'total_seconds': round(time['total'], 1),
+            'remaining_seconds': round(time['remaining'], 1),
+            'unknown_durations': time['unknown'],
+        })
+    return rows
+
+
+def print_table(rows):
+    width = max([len('Course')] + [len(row['course']) for row in rows])
+    header = f"{'Course':<{width}}  {'Watched':>7}  {'Files':>7}  {'Progress':>8}"
+    # Time columns only once some course has probed durations, see `durations`
+    if any(row.get('total_seconds') for row in rows):
+        header += f"  {'By time':>8}  {'Left':>9}"
+    print(header)
+    for row in rows:
+        if row['missing']:
+            print(f"{row['course']:<{width}}  {'':>7}  {'':>7}  {'missing':>8}")
+            continue
+        line = f"{row['course']:<{width}}  {row['watched']:>7}  {row['files']:>7}  {row['progress']:>7.1f}%"
+        if row['total_seconds']:
+            line += f"  {row['time_progress']:>7.1f}%  {format_duration(row['remaining_seconds']):>9}"
+        print(line)
+
+
+def cmd_roots(manager, args):
+    for directory in manager.directories:
+        print(directory if os.path.isdir(directory) else f"{directory} (missing)")
+    return 0
+
+
+def cmd_add(manager, args):
+    status = 0
+    for path in args.paths:
+        directory = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(directory):
+            print(f"Not a directory: {path}", file=sys.stderr)
+            status = 1
+        elif manager.add_directory(directory):
+            print(f"Added {directory}")
+    return status
+
+
+def cmd_remove(manager, args):
+    status = 0
+    for path in args.paths:
+        directory = os.path.abspath(os.path.expanduser(path))
+        if manager.remove_directory(directory):
+            print(f"Removed {directory}")
+        elif manager.remove_directory(path):
+            # Roots may be registered under a path that no longer resolves
+            print(f"Removed {path}")
+        else:
+            print(f"Not a registered course: {path}", file=sys.stderr)
+            status = 1
+    return status
+
+
+def cmd_mark(manager, args):
+    watched = not args.unwatched
+    files = folders = 0
+    status = 0
+    for pattern, path in expand_paths(args.paths):
+        if path is None:
+            print(f"No such file or directory: {pattern}", file=sys.stderr)
+            status = 1
+        elif os.path.isdir(path):
+            manager.set_subtree_watched(path, watched)
+            folders += 1
+        elif not manager.is_excluded_file(path):
+            manager.update_file_watched_state(path, watched)
+            files += 1
+    state = 'watched' if watched else 'unwatched'
+    print(f"Marked {files} files and {folders} folders {state}")
+    return status
+
+
+def cmd_progress(manager, args):
+    roots = [os.path.abspath(os.path.expanduser(path)) for path in args.courses] or manager.directories
+    rows = course_rows(manager, roots)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+    return 0
+
+
+def cmd_durations(manager, args):
+    roots = [os.path.abspath(os.path.expanduser(path)) for path in args.courses] or manager.directories
+    probed = sum(manager.index_media(root) for root in roots)
+    print(f"Probed {probed} media files")
+    return 0
+
+
+def cmd_export(manager, args):
+    text = json.dumps(manager.export_state(), indent=2)
+    if args.file == '-':
+        print(text)
+    else:
+        with open(args.file, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+def cmd_import(manager, args):
+    try:
+        if args.file == '-':
+            state = json.load(sys.stdin)
+        else:
+            with open(args.file, 'r') as f:
+                state = json.load(f)
+        count = manager.import_state(state, replace=args.replace)
+    except (OSError, ValueError) as e:
+        print(f"Could not import {args.file}: {e}", file=sys.stderr)
+        return 1
+    print(f"Imported {count} watched entries")
+    return 0
+
+
+def cmd_relink(manager, args):
+    old_root = os.path.abspath(os.path.expanduser(args.old))
+    new_root = os.path.abspath(os.path.expanduser(args.new))
+    if not os.path.isdir(new_root):
+        print(f"Not a directory: {args.new}", file=sys.stderr)
+        return 1
+    counts = manager.check_relink(old_root, new_root)
+    if counts['missing'] + counts['changed'] and not args.force:
+        print(f"{counts['matched']} watched files found, {counts['changed']} changed size and "
+              f"{counts['missing']} missing in {new_root}; use --force to relink anyway",
+              file=sys.stderr)
+        return 1
+    try:
+        moved = manager.relink_directory(old_root, new_root)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Relinked {moved} entries to {new_root}")
+    return 0
+
+
+def cmd_search(manager, args):
+    manager.refresh_search_index()
+    for record in manager.search(' '.join(args.query), args.limit):
+        print(record.path)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='course_organizer', description=__doc__.splitlines()[0]
+    )
+    parser.add_argument('--config-dir', help='state directory (default: ~/.course_organizer)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('roots', help='list registered courses').set_defaults(run=cmd_roots)
+
+    add = commands.add_parser('add', help='register course directories')
+    add.add_argument('paths', nargs='+')
+    add.set_defaults(run=cmd_add)
+
+    remove = commands.add_parser('remove', help='unregister course directories')
+    remove.add_argument('paths', nargs='+')
+    remove.set_defaults(run=cmd_remove)
+
+    mark = commands.add_parser('mark', help='mark files, folders or globs (** recurses) watched')
+    mark.add_argument('paths', nargs='+')
+    mark.add_argument('--unwatched', action='store_true', help='mark unwatched instead')
+    mark.set_defaults(run=cmd_mark)
+
+    progress = commands.add_parser('progress', help='print per-course progress')
+    progress.add_argument('courses', nargs='*', help='courses to report (default: all registered)')
+    progress.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    progress.set_defaults(run=cmd_progress)
+
+    durations = commands.add_parser('durations', help='probe new or changed media files for their duration')
+    durations.add_argument('courses', nargs='*', help='courses to probe (default: all registered)')
+    durations.set_defaults(run=cmd_durations)
+
+    export = commands.add_parser('export', help='write roots, watched flags and progress as JSON')
+    export.add_argument('file', nargs='?', default='-', help='output file (default: stdout)')
+    export.set_defaults(run=cmd_export)
+
+    import_ = commands.add_parser('import', help='read state written by export')
+    import_.add_argument('file', help="input file, '-' for stdin")
+    import_.add_argument('--replace', action='store_true',
+                         help='replace the current state instead of merging into it')
+    import_.set_defaults(run=cmd_import)
+
+    relink = commands.add_parser('relink', help='move the state of a moved course to its new path')
+    relink.add_argument('old')
+    relink.add_argument('new')
+    relink.add_argument('--force', action='store_true', help='relink even if files do not match')
+    relink.set_defaults(run=cmd_relink)
+
+    search = commands.add_parser('search', help='print paths matching a query across all courses')
+    search.add_argument('query', nargs='+')
+    search.add_argument('--limit', type=int, default=50)
+    search.set_defaults(run=cmd_search)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.config_dir:
+        # A config directory of its own starts empty rather than importing the legacy one
+        manager = CourseManager(config_dir=args.config_dir, legacy_config_dir=None)
+    else:
+        manager = CourseManager()
+    try:
+        return args.run(manager, args)
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
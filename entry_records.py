@@ -0,0 +1,122 @@
+import os
+from natsort import natsort_keygen
+
+from progress_tree import Listing
+
+SORT_MODES = ('name', 'size', 'mtime', 'watched')
+NATURAL_KEY_CACHE_SIZE = 200000  # names kept before the cache starts over
+
+_natural_keygen = natsort_keygen()
+_natural_keys = {}
+
+
+def natural_key(text):
+    """natsort key of text, parsed once per distinct name or path.
+
+    Course folders repeat the same names ("1. Introduction.mp4", "Week 1")
+    and the same directories are listed again on every navigation, so keys
+    are shared through a process-wide cache instead of re-parsed per sort.
+    """
+    key = _natural_keys.get(text)
+    if key is None:
+        if len(_natural_keys) >= NATURAL_KEY_CACHE_SIZE:
+            _natural_keys.clear()
+        key = _natural_keys[text] = _natural_keygen(text)
+    return key
+
+
+class EntryRecord:
+    """One row of a directory listing, built from a single os.scandir pass.
+
+    Files carry their size and mtime, directories their direct file/folder
+    counts and progress, so widgets never have to stat or list again.
+    """
+    __slots__ = ('kind', 'path', 'name', 'size', 'mtime', 'file_count', 'folder_count',
+                 'progress', 'watched', 'sort_key')
+
+    def __init__(self, kind, path, name=None, size=None, mtime=None,
+                 file_count=None, folder_count=None, progress=0, watched=False):
+        self.kind = kind
+        self.path = path
+        self.name = name if name is not None else os.path.basename(path)
+        self.size = size
+        self.mtime = mtime
+        self.file_count = file_count
+        self.folder_count = folder_count
+        self.progress = progress
+        self.watched = watched
+        self.sort_key = natural_key(self.name)
+
+    @property
+    def is_directory(self):
+        return self.kind == 'directory'
+
+    @property
+    def value(self):
+        """Progress for directories, watched flag for files"""
+        return self.progress if self.is_directory else self.watched
+
+    def __repr__(self):
+        return f"EntryRecord({self.kind!r}, {self.path!r})"
+
+
+def _mode_key(mode):
+    if mode == 'size':
+        # Largest first; folders have no size and stay in name order
+        return lambda record: (-(record.size or 0), record.sort_key)
+    if mode == 'mtime':
+        # Most recently modified first
+        return lambda record: (-(record.mtime or 0), record.sort_key)
+    if mode == 'watched':
+        # Watched files and the most watched folders first
+        return lambda record: (
+            -(record.progress if record.is_directory else int(bool(record.watched))), record.sort_key
+        )
+    return lambda record: record.sort_key
+
+
+def sort_records(records, mode='name'):
+    """Return records ordered by mode, directories before files.
+
+    Only the records' precomputed sort keys and scanned fields are used, so
+    switching modes never lists or parses anything again.
+    """
+    if mode not in SORT_MODES:
+        raise ValueError(f"Unknown sort mode: {mode}")
+    key = _mode_key(mode)
+    directories = sorted((record for record in records if record.is_directory), key=key)
+    files = sorted((record for record in records if not record.is_directory), key=key)
+    return directories + files
+
+
+def scan_entries(directory, is_excluded):
+    """List directory once, returning (directory records, file records, Listing).
+
+    Every record is stat'ed once for its mtime, files for their size too, so
+    the mtime order needs no progress scan. Excluded files are skipped. The
+    Listing is the same pass as the progress tree wants it, see
+    ProgressTree.update().
+    """
+    subdirs = []
+    files = []
+    listing = Listing(os.stat(directory).st_mtime_ns)
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    listing.folder_count += 1
+                    if not entry.is_symlink():
+                        listing.subdirs.add(entry.name)
+                    subdirs.append(EntryRecord('directory', entry.path, entry.name,
+                                               mtime=entry.stat().st_mtime))
+                else:
+                    listing.file_count += 1
+                    if is_excluded(entry.path):
+                        continue
+                    listing.files.add(entry.name)
+                    st = entry.stat()
+                    files.append(EntryRecord('file', entry.path, entry.name,
+                                             size=st.st_size, mtime=st.st_mtime))
+            except OSError:
+                continue
+    return subdirs, files, listing
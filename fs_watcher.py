@@ -0,0 +1,72 @@
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QThreadPool, QTimer, pyqtSignal
+import os
+
+
+class DirectoryWatcher(QObject):
+    """Watch course roots and the open directory for created, deleted or renamed entries.
+
+    Change events are collected for a short moment (downloads fire many in a
+    row), then each changed directory is relisted in the manager's progress
+    cache on the worker pool and announced through directoryChanged.
+    """
+    directoryChanged = pyqtSignal(str)
+    _refreshed = pyqtSignal(list)  # directories relisted by a worker, sorted
+
+    def __init__(self, manager, parent=None, delay_ms=300):
+        super().__init__(parent)
+        self.manager = manager
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        self._roots = set()
+        self._current = set()
+        self._pending = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._flush)
+        self._refreshed.connect(self._on_refreshed)
+
+    def watch_roots(self, directories):
+        """Watch the registered course roots"""
+        self._roots = {os.path.normpath(d) for d in directories}
+        self._update()
+
+    def watch_directory(self, directory, subdirs=()):
+        """Watch the open directory and its direct subdirectories; None stops watching them"""
+        if directory is None:
+            self._current = set()
+        else:
+            self._current = {os.path.normpath(d) for d in (directory, *subdirs)}
+        self._update()
+
+    def _update(self):
+        wanted = {d for d in self._roots | self._current if os.path.isdir(d)}
+        watched = set(self.watcher.directories())
+        if watched - wanted:
+            self.watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self.watcher.addPaths(list(wanted - watched))
+
+    def _on_directory_changed(self, path):
+        self._pending.add(os.path.normpath(path))
+        self._timer.start()
+
+    def _flush(self):
+        paths = sorted(self._pending)
+        self._pending = set()
+
+        def run():
+            for path in paths:
+                self.manager.refresh_directory(path)
+            try:
+                self._refreshed.emit(paths)
+            except RuntimeError:
+                pass  # the watcher was deleted while the worker ran
+
+        QThreadPool.globalInstance().start(run)
+
+    def _on_refreshed(self, paths):
+        for path in paths:
+            self.directoryChanged.emit(path)
+        # Removed directories drop out, recreated ones need to be added again
+        self._update()
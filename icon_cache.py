@@ -0,0 +1,72 @@
+from PyQt6.QtCore import Qt, QPointF, QSize
+from PyQt6.QtGui import QGuiApplication, QIcon, QPainter, QPixmap
+import os
+import sys
+
+if hasattr(sys, '_MEIPASS'):
+    # Running as bundled app
+    ICONS_DIR = os.path.join(sys._MEIPASS, 'icons')
+else:
+    ICONS_DIR = os.path.join(os.path.dirname(__file__), 'icons')
+
+# (icon name, size, canvas, device pixel ratio) -> QPixmap. A handful of icons
+# at a few sizes, so entries are kept for the life of the process.
+_pixmaps = {}
+
+
+def icon_path(name):
+    """Path of an icon shipped in icons/"""
+    return os.path.join(ICONS_DIR, name)
+
+
+def icon_pixmap(name, size, canvas=None, fallback='text-x-generic', device_pixel_ratio=None):
+    """Return icons/name scaled to fit size x size logical pixels.
+
+    With canvas, the icon is centered on a transparent canvas x canvas pixmap.
+    Each combination is loaded and resampled once and then shared by every row,
+    QPixmap being implicitly shared. Missing icons fall back to the theme icon.
+    """
+    if device_pixel_ratio is None:
+        app = QGuiApplication.instance()
+        device_pixel_ratio = app.devicePixelRatio() if app is not None else 1.0
+    key = (name, size, canvas, device_pixel_ratio)
+    pixmap = _pixmaps.get(key)
+    if pixmap is None:
+        pixmap = _render_icon(name, size, canvas, fallback, device_pixel_ratio)
+        _pixmaps[key] = pixmap
+    return pixmap
+
+
+def clear():
+    _pixmaps.clear()
+
+
+def _render_icon(name, size, canvas, fallback, device_pixel_ratio):
+    source = QPixmap(icon_path(name))
+    if source.isNull():
+        pixmap = QIcon.fromTheme(fallback).pixmap(QSize(size, size), device_pixel_ratio)
+    else:
+        physical = round(size * device_pixel_ratio)
+        pixmap = source.scaled(
+            physical, physical,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+
+    if canvas is None or pixmap.isNull():
+        return pixmap
+    logical = pixmap.deviceIndependentSize()
+    if logical.width() >= canvas and logical.height() >= canvas:
+        return pixmap
+
+    # Pad to the canvas so labels and painted rows can place it without math
+    padded = QPixmap(round(canvas * device_pixel_ratio), round(canvas * device_pixel_ratio))
+    padded.setDevicePixelRatio(device_pixel_ratio)
+    padded.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(padded)
+    painter.drawPixmap(
+        QPointF((canvas - logical.width()) / 2, (canvas - logical.height()) / 2), pixmap
+    )
+    painter.end()
+    return padded
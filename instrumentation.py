@@ -0,0 +1,249 @@
+import os
+import sys
+import time
+import atexit
+import cProfile
+import inspect
+import logging
+import functools
+import importlib
+import threading
+from datetime import datetime
+from pathlib import Path
+
+ENV_VAR = 'COURSE_ORGANIZER_PROFILE'
+SLOW_CALL_SECONDS = 0.1  # single calls slower than this are logged as they happen
+PROFILE_DIR = Path.home() / '.course_organizer'
+
+# (module, class, methods) wrapped by install(). Modules are imported lazily,
+# so installing from a Qt-free entry point skips the GUI classes.
+INSTRUMENTED = (
+    ('course_manager', 'CourseManager', (
+        'load_progress', 'load_watched_files', 'load_directories',
+        'save_progress', 'save_watched_files', '_save_directories', '_write_state', 'flush',
+        'get_directory_contents', 'iter_directory_contents', 'iter_directory_progress',
+        'refresh_directory', 'calculate_directory_progress',
+        'update_file_watched_state', 'set_subtree_watched', 'check_relink', 'relink_directory',
+        'index_media', 'time_progress',
+    )),
+    ('watched_store', 'WatchedStore', (
+        'load_watched', 'load_progress', 'set_many_watched', 'set_many_progress',
+        'replace_watched', 'replace_progress', 'import_json', 'relink',
+    )),
+    ('search_index', 'SearchIndex', ('load', 'refresh', 'refresh_directory', 'search')),
+    ('media_index', 'MediaIndex', ('load', 'update')),
+    ('FileItemWidget', 'FileItemWidget', (
+        'set_thumbnail_or_icon', 'set_rendered_thumbnail', 'set_image_thumbnail',
+        'set_video_thumbnail', 'set_pdf_thumbnail', 'set_file_icon',
+    )),
+    ('CourseTracker', 'CourseTrackerApp', (
+        'load_directory_list', 'load_directory_contents', 'on_scan_rows', 'refresh_listing',
+        'refresh_visible_progress', 'add_directory_row', 'add_file_row',
+        'update_visible_thumbnails', 'on_file_watched_changed', 'update_directory_progress',
+        'run_search', 'update_time_label',
+    )),
+)
+
+logger = logging.getLogger('course_organizer.profile')
+
+_enabled = os.environ.get(ENV_VAR, '').strip().lower() not in ('', '0', 'false', 'no')
+_lock = threading.Lock()
+_timers = {}      # name -> [calls, total seconds, max seconds]
+_counters = {}    # name -> count
+_profiler = None
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def record(name, seconds):
+    """Add one timed call to the stats under name"""
+    if not _enabled:
+        return
+    with _lock:
+        entry = _timers.get(name)
+        if entry is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+    if seconds >= SLOW_CALL_SECONDS:
+        logger.info("Slow call %s took %.1f ms", name, seconds * 1000)
+
+
+def increment(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def timed(name, func):
+    """Wrap func so each call is recorded under name.
+
+    Generator functions are timed for the work done inside them across the
+    whole iteration, not for the time the consumer spends between items.
+    """
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            elapsed = 0.0
+            generator = func(*args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    yield item
+            finally:
+                generator.close()
+                record(name, elapsed)
+        wrapper = generator_wrapper
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument(cls, method_names):
+    """Replace the named methods of cls with timed wrappers"""
+    for method_name in method_names:
+        func = cls.__dict__.get(method_name)
+        if func is None or getattr(func, '__instrumented__', False):
+            continue
+        setattr(cls, method_name, timed(f"{cls.__name__}.{method_name}", func))
+
+
+def install(targets=INSTRUMENTED):
+    """Wrap every instrumented method when enabled; a no-op otherwise.
+
+    Call before the instrumented objects connect their methods to signals.
+    """
+    if not _enabled:
+        return
+    for module_name, class_name, method_names in targets:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        instrument(getattr(module, class_name), method_names)
+    logger.info("Instrumentation enabled")
+
+
+def snapshot():
+    """Return (timers, counters): timers as (name, calls, total s, max s) sorted by total"""
+    with _lock:
+        timers = [(name, calls, total, peak) for name, (calls, total, peak) in _timers.items()]
+        counters = dict(_counters)
+    timers.sort(key=lambda row: row[2], reverse=True)
+    return timers, counters
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def log_summary():
+    timers, counters = snapshot()
+    if not timers and not counters:
+        return
+    logger.info("Instrumentation summary")
+    for name, calls, total, peak in timers:
+        logger.info("  %-48s calls=%-7d total=%9.1f ms  mean=%8.2f ms  max=%8.1f ms",
+                    name, calls, total * 1000, total * 1000 / calls, peak * 1000)
+    for name, value in sorted(counters.items()):
+        logger.info("  %-48s count=%d", name, value)
+
+
+def is_profiling():
+    return _profiler is not None
+
+
+def start_profiling():
+    """Start a cProfile run of the calling thread (the GUI thread in the app)"""
+    global _profiler
+    if _profiler is not None:
+        return
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def stop_profiling(path=None):
+    """Stop the cProfile run and dump it for pstats/snakeviz, returning the file path"""
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    if path is None:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof"
+    profiler.dump_stats(str(path))
+    logger.info("cProfile data written to %s", path)
+    return str(path)
+
+
+class StartupTimer:
+    """Milestones from process start to the first populated window"""
+
+    # Heavy modules that should stay unloaded until a media row needs them
+    WATCHED_MODULES = ('cv2', 'numpy', 'PIL', 'pdf2image')
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter(), self.loaded_modules()))
+
+    def loaded_modules(self):
+        return [name for name in self.WATCHED_MODULES if name in sys.modules]
+
+    def report(self):
+        lines = ["Startup profile (ms since start / since previous step):"]
+        previous = self.started
+        for name, at, modules in self.marks:
+            lines.append(f"  {name:<28} {(at - self.started) * 1000:9.1f} {(at - previous) * 1000:9.1f}"
+                         f"   heavy modules: {', '.join(modules) or 'none'}")
+            previous = at
+        rss = _peak_rss_bytes()
+        if rss is not None:
+            lines.append(f"  peak RSS {rss / (1024 * 1024):.1f} MiB")
+        return "\n".join(lines)
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@atexit.register
+def _on_exit():
+    if _enabled:
+        stop_profiling()
+        log_summary()
@@ -1,12 +1,21 @@
+import time
+STARTED = time.perf_counter()  # before any of the heavier imports below
+
 import sys
 import os
 import json
 import logging
+import multiprocessing
 from pathlib import Path
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 from CourseTracker import CourseTrackerApp
+from persistence import atomic_write_json
+import instrumentation
 
 # Configuration
+PROFILE_FLAG = '--profile'  # same as setting COURSE_ORGANIZER_PROFILE=1
+STARTUP_PROFILE_FLAG = '--startup-profile'
 APP_DIR = Path.home() / '.course_organizer'
 PROGRESS_FILE = APP_DIR / 'progress.json'
 LOG_FILE = APP_DIR / 'app.log'
@@ -36,8 +45,7 @@ def load_progress():
 def save_progress(data):
     """Save progress data to JSON file."""
     try:
-        with open(PROGRESS_FILE, "w") as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(PROGRESS_FILE, data, indent=2)
         logging.info("Progress saved successfully")
     except Exception as e:
         logging.error(f"Error saving progress: {e}")
@@ -56,19 +64,60 @@ def load_directories():
 def save_directories(directories):
     """Save directories to JSON file."""
     try:
-        with open(DIRECTORIES_FILE, 'w') as f:
-            json.dump(directories, f, indent=2)
+        atomic_write_json(DIRECTORIES_FILE, directories, indent=2)
     except Exception as e:
         print(f"Error saving directories: {e}")
 
+def watch_startup(startup, window):
+    """Mark the first paint and the first root listing, then print the report"""
+    pending = {"first paint", "directory list populated"}
+    
+    def reached(name):
+        startup.mark(name)
+        pending.discard(name)
+        if not pending:
+            report = startup.report()
+            print(report, flush=True)
+            logging.info(report)
+    
+    def on_roots_listed():
+        window.scan_service.finished.disconnect(on_roots_listed)
+        reached("directory list populated")
+    
+    # Zero-timeout timers run once the event loop has handled the initial expose/paint
+    QTimer.singleShot(0, lambda: reached("first paint"))
+    window.scan_service.finished.connect(on_roots_listed)
+
 def main():
+    # Thumbnail worker processes re-enter here when frozen by PyInstaller
+    multiprocessing.freeze_support()
+    
+    # Opt-in timers on the slow paths; Ctrl+Shift+P opens the stats panel
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+        instrumentation.enable()
+    instrumentation.install()
+    
+    # Time the way to the first painted, populated window
+    startup = None
+    if STARTUP_PROFILE_FLAG in sys.argv:
+        sys.argv.remove(STARTUP_PROFILE_FLAG)
+        startup = instrumentation.StartupTimer(STARTED)
+        startup.mark("modules imported")
+    
     # Create the Qt Application
     app = QApplication(sys.argv)
+    if startup:
+        startup.mark("QApplication created")
     
     # Create and show the main window
     window = CourseTrackerApp()
     window.show()
     
+    if startup:
+        startup.mark("main window built")
+        watch_startup(startup, window)
+    
     # Start the event loop
     sys.exit(app.exec())
 
@@ -0,0 +1,250 @@
+import os
+import struct
+import sqlite3
+import mimetypes
+import threading
+
+# Containers whose duration is read from the movie header instead of decoding
+MP4_EXTENSIONS = {'.mp4', '.m4v', '.m4a', '.mov', '.3gp'}
+
+_media_extensions = {}  # extension -> bool, mimetypes is consulted once per extension
+
+
+def is_media_file(name):
+    """True for names with a video or audio mime type"""
+    extension = os.path.splitext(name)[1].lower()
+    media = _media_extensions.get(extension)
+    if media is None:
+        mime_type = mimetypes.guess_type('file' + extension)[0] or ''
+        media = _media_extensions[extension] = mime_type.startswith(('video/', 'audio/'))
+    return media
+
+
+def format_duration(seconds):
+    """Short human duration, e.g. "7h 05m", "12m" or "40s" """
+    if seconds < 59.5:
+        return f"{int(round(seconds))}s"
+    minutes = int(round(seconds / 60))
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+
+def _find_box(f, start, end, kind):
+    """Return the (payload start, end) of the first `kind` box between start and end"""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        size, box = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return None
+        if box == kind:
+            return position + header, position + size
+        position += size
+    return None
+
+
+def mp4_duration(file_path):
+    """Duration in seconds from an MP4/MOV movie header (mvhd), or None.
+
+    Only box headers are read, so this costs a few small reads wherever the
+    moov box sits in the file.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            moov = _find_box(f, 0, os.fstat(f.fileno()).st_size, b'moov')
+            mvhd = moov and _find_box(f, moov[0], moov[1], b'mvhd')
+            if not mvhd:
+                return None
+            f.seek(mvhd[0])
+            header = f.read(32)
+    except (OSError, struct.error):
+        return None
+    if len(header) < 20:
+        return None
+    if header[0] == 1:
+        if len(header) < 32:
+            return None
+        timescale, duration = struct.unpack('>IQ', header[20:32])
+    else:
+        timescale, duration = struct.unpack('>II', header[12:20])
+    return duration / timescale if timescale else None
+
+
+def video_capture_duration(file_path):
+    """Duration in seconds from OpenCV's frame count and rate, or None"""
+    try:
+        import cv2
+    except ImportError:
+        return None
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+    finally:
+        cap.release()
+    return frames / fps if fps > 0 and frames > 0 else None
+
+
+def probe_duration(file_path):
+    """Duration of a media file in seconds, or None if it cannot be read"""
+    if os.path.splitext(file_path)[1].lower() in MP4_EXTENSIONS:
+        seconds = mp4_duration(file_path)
+        if seconds:
+            return seconds
+    return video_capture_duration(file_path)
+
+
+class MediaIndex:
+    """Persistent durations of media files, probed once per (path, size, mtime).
+
+    Entries live in SQLite as (directory, name) rows and in memory as a
+    {directory: {name: (size, mtime_ns, seconds)}} map. Lookups never touch
+    the files; update() stats a directory's media files and only probes the
+    new or changed ones, so time-weighted progress is a sum over the cache.
+    Files that could not be probed are kept with no duration and are not
+    tried again until they change.
+    """
+
+    def __init__(self, db_path, probe=probe_duration):
+        self.db_path = str(db_path)
+        self.probe = probe
+        self._lock = threading.RLock()
+        self._conn = None
+        self._entries = None  # directory -> {name: (size, mtime_ns, seconds)}
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS media (
+                    dir TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    seconds REAL,
+                    PRIMARY KEY (dir, name)
+                ) WITHOUT ROWID''')
+        return self._conn
+
+    def load(self):
+        """Read the persisted durations into memory, once"""
+        with self._lock:
+            if self._entries is not None:
+                return
+            entries = {}
+            for directory, name, size, mtime, seconds in self._connect().execute(
+                    'SELECT dir, name, size, mtime, seconds FROM media'):
+                entries.setdefault(directory, {})[name] = (size, mtime, seconds)
+            self._entries = entries
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def durations_in(self, directory):
+        """Return {name: seconds} of the known durations in directory"""
+        self.load()
+        with self._lock:
+            return {name: entry[2] for name, entry in self._entries.get(directory, {}).items()
+                    if entry[2] is not None}
+
+    def duration(self, file_path):
+        """Cached duration of file_path in seconds, or None if not known"""
+        directory, name = os.path.split(os.path.normpath(file_path))
+        self.load()
+        with self._lock:
+            entry = self._entries.get(directory, {}).get(name)
+        return entry[2] if entry is not None else None
+
+    def update(self, directory, names):
+        """Probe the new or changed media files among names in directory.
+
+        Rows of media files no longer in names are dropped. Returns the
+        number of files probed.
+        """
+        directory = os.path.normpath(directory)
+        names = [name for name in names if is_media_file(name)]
+        self.load()
+        with self._lock:
+            known = dict(self._entries.get(directory, {}))
+
+        changed = {}
+        for name in names:
+            try:
+                st = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+            entry = known.get(name)
+            if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+                continue
+            seconds = self.probe(os.path.join(directory, name))
+            changed[name] = (st.st_size, st.st_mtime_ns, seconds)
+        removed = set(known) - set(names)
+        if not changed and not removed:
+            return 0
+
+        with self._lock:
+            entries = self._entries.setdefault(directory, {})
+            entries.update(changed)
+            for name in removed:
+                entries.pop(name, None)
+            if not entries:
+                del self._entries[directory]
+            self._save(directory, changed, removed)
+        return len(changed)
+
+    def relink(self, old_path, new_path):
+        """Move the entries at or below old_path to new_path, e.g. after a course
+        moved; entries already there are replaced. Returns how many moved."""
+        old_path, new_path = os.path.normpath(old_path), os.path.normpath(new_path)
+        prefix = old_path.rstrip(os.sep) + os.sep
+        self.load()
+        with self._lock:
+            moved = 0
+            for directory in [d for d in self._entries if d == old_path or d.startswith(prefix)]:
+                entries = self._entries.pop(directory)
+                self._entries.setdefault(new_path + directory[len(old_path):], {}).update(entries)
+                moved += len(entries)
+            if not moved:
+                return 0
+            conn = self._connect()
+            conn.execute('BEGIN')
+            try:
+                # substr() rather than LIKE, so '%' and '_' in folder names need no escaping
+                conn.execute(
+                    'UPDATE OR REPLACE media SET dir = ? || substr(dir, ?) '
+                    'WHERE dir = ? OR substr(dir, 1, ?) = ?',
+                    (new_path, len(old_path) + 1, old_path, len(prefix), prefix)
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return moved
+
+    def _save(self, directory, changed, removed):
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO media (dir, name, size, mtime, seconds) VALUES (?, ?, ?, ?, ?)',
+                ((directory, name) + entry for name, entry in changed.items())
+            )
+            conn.executemany('DELETE FROM media WHERE dir = ? AND name = ?',
+                             ((directory, name) for name in removed))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
@@ -0,0 +1,238 @@
+import os
+import sys
+
+
+def split_path(path):
+    """Split a path into its components; absolute POSIX paths start with ''"""
+    parts = os.path.normpath(path).split(os.sep)
+    if len(parts) > 1 and parts[-1] == '':
+        parts.pop()  # the root itself, e.g. '/' or 'C:\\'
+    return parts
+
+
+def join_path(parts):
+    return os.sep.join(parts) if parts != [''] else os.sep
+
+
+class PathNode:
+    """One directory of a PathIndex"""
+    __slots__ = ('name', 'parent', 'children', 'values', 'count', 'true_count')
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.children = {}    # component -> PathNode
+        self.values = {}      # entry name -> value, for entries directly in this directory
+        self.count = 0        # entries in the whole subtree
+        self.true_count = 0   # entries with a truthy value in the whole subtree
+
+
+class PathIndex:
+    """Path-component trie mapping paths to values.
+
+    Each directory is one node holding its interned name, so a long course
+    prefix is stored once rather than in every key, and entries are plain
+    dict items of their directory's node. Lookups and updates are O(depth);
+    every node keeps the entry and truthy-value counts of its subtree, so
+    "how many watched under X" is O(depth) too and listing them O(subtree).
+    """
+
+    def __init__(self, items=()):
+        self.root = PathNode('')
+        for path, value in items:
+            self.set(path, value)
+
+    def __len__(self):
+        return self.root.count
+
+    def __contains__(self, path):
+        parts = split_path(path)
+        node = self._find(parts[:-1])
+        return node is not None and parts[-1] in node.values
+
+    def get(self, path, default=None):
+        parts = split_path(path)
+        node = self._find(parts[:-1])
+        if node is None:
+            return default
+        return node.values.get(parts[-1], default)
+
+    def set(self, path, value):
+        parts = split_path(path)
+        self._set(self._node(parts[:-1]), parts[-1], value)
+
+    def set_many(self, directory, values):
+        """Set {name: value} entries directly in directory, finding it only once"""
+        if not values:
+            return
+        node = self._node(split_path(directory))
+        current = node.values
+        count_delta = true_delta = 0
+        for name, value in values.items():
+            if name in current:
+                if bool(current[name]) != bool(value):
+                    true_delta += 1 if value else -1
+            else:
+                count_delta += 1
+                true_delta += 1 if value else 0
+            current[name] = value
+        # One walk up the ancestors for the whole batch
+        self._adjust(node, count_delta, true_delta)
+
+    def discard(self, path):
+        parts = split_path(path)
+        node = self._find(parts[:-1])
+        if node is None or parts[-1] not in node.values:
+            return
+        value = node.values.pop(parts[-1])
+        self._adjust(node, -1, -1 if value else 0)
+        self._prune(node)
+
+    def values_in(self, directory):
+        """Return the {name: value} entries directly in directory (do not modify)"""
+        node = self._find(split_path(directory))
+        return node.values if node is not None else {}
+
+    def count(self, prefix):
+        """Return (entries, entries with a truthy value) at or below prefix"""
+        parts = split_path(prefix)
+        total = truthy = 0
+        parent = self._find(parts[:-1])
+        if parent is not None and parts[-1] in parent.values:
+            total, truthy = 1, 1 if parent.values[parts[-1]] else 0
+        node = self._find(parts)
+        if node is not None:
+            total += node.count
+            truthy += node.true_count
+        return total, truthy
+
+    def entries(self, prefix=None):
+        """Yield (directory, name, value) for every entry below prefix, or everywhere"""
+        parts = split_path(prefix) if prefix is not None else []
+        node = self._find(parts)
+        if node is None:
+            return
+        stack = [(node, parts)]
+        while stack:
+            node, parts = stack.pop()
+            if node.values:
+                directory = join_path(parts)
+                for name, value in node.values.items():
+                    yield directory, name, value
+            for name, child in node.children.items():
+                stack.append((child, parts + [name]))
+
+    def items(self, prefix=None):
+        """Yield (path, value) for every entry below prefix, or everywhere"""
+        for directory, name, value in self.entries(prefix):
+            yield os.path.join(directory, name), value
+
+    def remove_subtree(self, prefix):
+        """Drop every entry below prefix, returning how many were removed"""
+        parts = split_path(prefix)
+        parent = self._find(parts[:-1])
+        node = parent.children.get(parts[-1]) if parent is not None else None
+        if node is None:
+            return 0
+        del parent.children[parts[-1]]
+        self._adjust(parent, -node.count, -node.true_count)
+        self._prune(parent)
+        return node.count
+
+    def move(self, prefix, target):
+        """Re-root the entry at prefix and every entry below it at target.
+
+        The subtree is detached and attached as a whole, so this is O(depth)
+        unless target already holds entries, which are then merged with the
+        moved ones winning. Returns how many entries moved.
+        """
+        old_parts, new_parts = split_path(prefix), split_path(target)
+        if old_parts == new_parts:
+            return 0
+        if new_parts[:len(old_parts)] == old_parts:
+            raise ValueError(f"Cannot move {prefix} into itself")
+        parent = self._find(old_parts[:-1])
+        if parent is None:
+            return 0
+        name, new_name = old_parts[-1], new_parts[-1]
+        moved = 0
+
+        if name in parent.values:
+            value = parent.values.pop(name)
+            self._adjust(parent, -1, -1 if value else 0)
+            self._set(self._node(new_parts[:-1]), new_name, value)
+            moved += 1
+
+        node = parent.children.pop(name, None)
+        if node is not None:
+            self._adjust(parent, -node.count, -node.true_count)
+            moved += node.count
+            target_parent = self._node(new_parts[:-1])
+            existing = target_parent.children.get(new_name)
+            if existing is None:
+                node.name = sys.intern(new_name)
+                self._attach(target_parent, node)
+            else:
+                self._merge(node, existing)
+        self._prune(parent)
+        return moved
+
+    def _attach(self, parent, node):
+        node.parent = parent
+        parent.children[node.name] = node
+        self._adjust(parent, node.count, node.true_count)
+
+    def _merge(self, source, target):
+        """Fold the detached source node into target"""
+        stack = [(source, target)]
+        while stack:
+            source, target = stack.pop()
+            for name, value in source.values.items():
+                self._set(target, name, value)
+            for name, child in source.children.items():
+                existing = target.children.get(name)
+                if existing is None:
+                    self._attach(target, child)
+                else:
+                    stack.append((child, existing))
+
+    def _find(self, parts):
+        node = self.root
+        for part in parts:
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def _node(self, parts):
+        node = self.root
+        for part in parts:
+            child = node.children.get(part)
+            if child is None:
+                part = sys.intern(part)
+                child = node.children[part] = PathNode(part, node)
+            node = child
+        return node
+
+    def _set(self, node, name, value):
+        values = node.values
+        if name in values:
+            old = values[name]
+            values[name] = value
+            if bool(old) != bool(value):
+                self._adjust(node, 0, 1 if value else -1)
+        else:
+            values[name] = value
+            self._adjust(node, 1, 1 if value else 0)
+
+    def _adjust(self, node, count_delta, true_delta):
+        while node is not None:
+            node.count += count_delta
+            node.true_count += true_delta
+            node = node.parent
+
+    def _prune(self, node):
+        """Remove empty directory nodes from node upwards"""
+        while node.parent is not None and not node.count and not node.children:
+            del node.parent.children[node.name]
+            node = node.parent
@@ -0,0 +1,80 @@
+import os
+import json
+import atexit
+import tempfile
+import threading
+
+DEFAULT_FLUSH_DELAY = 0.5  # seconds mutations are coalesced before being written
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Write JSON to a temp file next to path and swap it in with os.replace.
+
+    Readers and crashes only ever see the old or the new file, never a
+    truncated one.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DeferredWriter:
+    """Write-behind queue that coalesces repeated writes to the same target.
+
+    schedule() records the latest write callable per key; all pending writes
+    run together once the delay has passed, on flush(), or at interpreter
+    exit, in the order they were last scheduled. A delay of 0 writes
+    immediately.
+    """
+
+    def __init__(self, delay=DEFAULT_FLUSH_DELAY):
+        self.delay = delay
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def schedule(self, key, write):
+        immediate = self.delay <= 0
+        with self._lock:
+            # A re-scheduled key moves behind writes scheduled since, which it may amend
+            self._pending.pop(key, None)
+            self._pending[key] = write
+            if not immediate and self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if immediate:
+            self.flush()
+
+    def has_pending(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def flush(self):
+        """Run every pending write now"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            for key, write in pending.items():
+                try:
+                    write()
+                except Exception as e:
+                    print(f"Error writing {key}: {e}")
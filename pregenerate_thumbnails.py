@@ -0,0 +1,105 @@
+"""Render thumbnails for a whole course root ahead of time.
+
+    python pregenerate_thumbnails.py ~/Courses/Algorithms --workers 4
+
+Thumbnails land in the same on-disk cache the app reads, so opening the
+course afterwards shows them without rendering anything. Qt is not needed.
+Video frames are taken where the app takes them; to move them, set
+COURSE_ORGANIZER_VIDEO_OFFSET (seconds) for both.
+"""
+import argparse
+import mimetypes
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from thumbnail_cache import get_thumbnail_cache
+from thumbnail_renderers import (render_thumbnail, set_video_seek, thumbnail_kind, thumbnail_variant,
+                                 THUMBNAIL_SIZES, VIDEO_OFFSET_ENV_VAR, VIDEO_SEEK_SECONDS)
+
+ALL_KINDS = ('image', 'video', 'pdf')
+
+
+def iter_thumbnail_targets(root, kinds=ALL_KINDS):
+    """Yield (path, kind) for every file under root that gets a thumbnail"""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            kind = thumbnail_kind(mimetypes.guess_type(name)[0])
+            if kind in kinds:
+                yield os.path.join(directory, name), kind
+
+
+def _render_job(job):
+    """Worker side: render one (path, kind), returning (path, kind, data, error)"""
+    file_path, kind = job
+    try:
+        return file_path, kind, render_thumbnail(file_path, kind, THUMBNAIL_SIZES[kind]), None
+    except Exception as e:
+        return file_path, kind, None, str(e)
+
+
+def pregenerate(root, kinds=ALL_KINDS, workers=None, force=False, video_seek=VIDEO_SEEK_SECONDS, report=None):
+    """Render and cache missing thumbnails under root, returning counts by outcome.
+
+    video_seek is passed to set_video_seek() here and in every worker, and is
+    part of the cache key of video thumbnails. report, if given, is called
+    with (done, total, counts) as results come in.
+    """
+    set_video_seek(video_seek)
+    cache = get_thumbnail_cache()
+    counts = {'rendered': 0, 'cached': 0, 'failed': 0}
+    jobs = []
+    for file_path, kind in iter_thumbnail_targets(root, kinds):
+        if not force and cache.get(file_path, THUMBNAIL_SIZES[kind], thumbnail_variant(kind)) is not None:
+            counts['cached'] += 1
+        else:
+            jobs.append((file_path, kind))
+    if not jobs:
+        return counts
+
+    workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=set_video_seek, initargs=(video_seek,)) as executor:
+        for done, (file_path, kind, data, error) in enumerate(
+                executor.map(_render_job, jobs, chunksize=4), 1):
+            if data:
+                cache.put(file_path, THUMBNAIL_SIZES[kind], data, thumbnail_variant(kind))
+                counts['rendered'] += 1
+            else:
+                counts['failed'] += 1
+            if report:
+                report(done, len(jobs), counts)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', help='course directory to scan recursively')
+    parser.add_argument('--kinds', default=','.join(ALL_KINDS),
+                        help='comma separated subset of image,video,pdf')
+    parser.add_argument('--workers', type=int, help='render processes (default: CPUs - 1, at most 4)')
+    parser.add_argument('--force', action='store_true',
+                        help=f're-render cached thumbnails, e.g. after changing {VIDEO_OFFSET_ENV_VAR}')
+    args = parser.parse_args(argv)
+
+    kinds = tuple(kind.strip() for kind in args.kinds.split(',') if kind.strip())
+    unknown = set(kinds) - set(ALL_KINDS)
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(sorted(unknown))}")
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+
+    def report(done, total, counts):
+        if done == total or done % 25 == 0:
+            print(f"{done}/{total} rendered={counts['rendered']} failed={counts['failed']}", flush=True)
+
+    counts = pregenerate(args.root, kinds, args.workers, args.force, report=report)
+    print(f"Done: {counts['rendered']} rendered, {counts['cached']} already cached, {counts['failed']} failed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,365 @@
+import collections
+import os
+import threading
+
+
+def directory_bytes(directory):
+    """Sum of the sizes of the non-directory entries in directory"""
+    size = 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if not entry.is_dir():
+                        size += entry.stat().st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return size
+
+
+class Listing:
+    """One directory's entries as the progress tree needs them.
+
+    Taken without holding the tree's lock, then folded into the node.
+    """
+    __slots__ = ('mtime', 'files', 'subdirs', 'file_count', 'folder_count')
+
+    def __init__(self, mtime=None, files=None, subdirs=None, file_count=0, folder_count=0):
+        self.mtime = mtime
+        self.files = files if files is not None else set()      # non-excluded file names
+        self.subdirs = subdirs if subdirs is not None else set()  # names to descend into
+        self.file_count = file_count
+        self.folder_count = folder_count
+
+
+def list_directory(directory, is_excluded):
+    """List directory for the progress tree; a missing directory lists as empty"""
+    listing = Listing()
+    try:
+        listing.mtime = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        listing.mtime = None
+        return listing
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                listing.folder_count += 1
+                # Like os.walk, symlinked directories are neither files nor descended into
+                if not entry.is_symlink():
+                    listing.subdirs.add(entry.name)
+            else:
+                listing.file_count += 1
+                if not is_excluded(entry.path):
+                    listing.files.add(entry.name)
+        except OSError:
+            continue
+    return listing
+
+
+class DirectoryNode:
+    """Cached scan of one directory plus watched/total counts for its subtree"""
+    __slots__ = ('path', 'parent', 'mtime', 'files', 'subdirs', 'total', 'watched',
+                 'file_count', 'folder_count', 'bytes')
+
+    def __init__(self, path, parent=None):
+        self.path = path
+        self.parent = parent
+        self.mtime = None
+        self.files = set()      # non-excluded file names directly in this directory
+        self.subdirs = {}       # name -> DirectoryNode
+        self.total = 0          # non-excluded files in the whole subtree
+        self.watched = 0        # watched files in the whole subtree
+        self.file_count = 0     # direct entries that are not directories, excluded ones too
+        self.folder_count = 0   # direct entries that are directories, symlinked ones too
+        self.bytes = None       # size of the direct non-directory entries, None until asked for
+
+    @property
+    def progress(self):
+        return (self.watched / self.total * 100) if self.total > 0 else 0
+
+
+class ProgressTree:
+    """Memoized per-directory progress aggregates.
+
+    Every scanned directory keeps its own file names and the rolled-up total and
+    watched counts of its subtree. Toggling a file only walks the ancestor chain,
+    and a directory is only listed again when its mtime changes.
+
+    Listing and stat'ing happen without the lock: new subtrees are built
+    detached and only linked in, and changed listings only folded in, while it
+    is held. A scan on a worker thread therefore never stalls a toggle or a
+    lookup on the GUI thread for longer than that bookkeeping.
+    """
+
+    def __init__(self, is_excluded, is_watched):
+        self.is_excluded = is_excluded
+        self.is_watched = is_watched
+        self._nodes = {}
+        self._lock = threading.RLock()
+        self._toggles = 0  # watched changes so far
+        self._missed = collections.deque(maxlen=1024)  # (toggle number, directory) not cached when toggled
+        self._epoch = 0    # bumped by clear(), builds started before it are not linked
+
+    def get(self, directory, revalidate=True):
+        """Return the node for directory, scanning or revalidating as needed"""
+        directory = os.path.normpath(directory)
+        with self._lock:
+            node = self._nodes.get(directory)
+        if node is None:
+            return self._attach(directory)
+        if revalidate:
+            self._revalidate(node)
+        return node
+
+    def progress(self, directory, revalidate=True):
+        if not os.path.isdir(directory):
+            return 0
+        return self.get(directory, revalidate).progress
+
+    def set_watched(self, file_path, was_watched, watched):
+        """Adjust the ancestor chain of file_path after a watched toggle"""
+        if bool(was_watched) == bool(watched):
+            return
+        directory, name = os.path.split(os.path.normpath(file_path))
+        with self._lock:
+            self._toggles += 1
+            node = self._nodes.get(directory)
+            if node is None or name not in node.files:
+                # Possibly in a subtree being built right now, which must count it again
+                self._missed.append((self._toggles, directory))
+                return
+            self._propagate(node, 0, 1 if watched else -1)
+
+    def iter_subtree(self, node):
+        """Yield node and every cached node below it, parents before children"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(current.subdirs.values())
+
+    def subtree_nodes(self, node):
+        """Return node and every cached node below it as a list copied under the lock"""
+        with self._lock:
+            return list(self.iter_subtree(node))
+
+    def subtree_files(self, node):
+        """Return (path, file names) of node and every cached node below it,
+        copied under the lock so other threads can keep rescanning"""
+        with self._lock:
+            return [(current.path, list(current.files)) for current in self.iter_subtree(node)]
+
+    def subtree_bytes(self, node):
+        """Total size of the files in node's cached subtree.
+
+        Sizes are stat'ed on first request and kept until the directory is
+        listed again, so scans themselves never stat files.
+        """
+        with self._lock:
+            nodes = list(self.iter_subtree(node))
+            missing = [current for current in nodes if current.bytes is None]
+        sizes = [(current, directory_bytes(current.path)) for current in missing]
+        with self._lock:
+            for current, size in sizes:
+                current.bytes = size
+            return sum(current.bytes or 0 for current in nodes)
+
+    def cached(self, directory):
+        """Return the node for directory if it is cached, without scanning"""
+        with self._lock:
+            return self._nodes.get(os.path.normpath(directory))
+
+    def set_subtree_watched(self, node, watched):
+        """Mark every file below node watched or unwatched and roll the change up once"""
+        with self._lock:
+            old_watched = node.watched
+            for current in self.iter_subtree(node):
+                current.watched = current.total if watched else 0
+            if node.parent is not None:
+                self._propagate(node.parent, 0, node.watched - old_watched)
+
+    def update(self, directory, listing):
+        """Fold a listing of directory taken elsewhere into the tree; returns its node.
+
+        A directory that is not cached yet is built from the listing, taking
+        over the subdirectories that are already cached as they are.
+        """
+        directory = os.path.normpath(directory)
+        node = self.cached(directory)
+        if node is None:
+            return self._build_standalone(directory, listing, revalidate_cached=False)
+        self._update(node, listing)
+        return node
+
+    def refresh(self, directory):
+        """Relist one cached directory after a change event and patch its ancestors.
+
+        Unlike a revalidation, descendants that did not change are not stat'ed.
+        Returns False when the directory is not cached.
+        """
+        node = self.cached(directory)
+        if node is None:
+            node = self.cached(os.path.dirname(os.path.normpath(directory)))
+            if node is None:
+                return False
+            # A new or removed child shows up in its parent's listing
+        self._update(node, list_directory(node.path, self.is_excluded))
+        return True
+
+    def invalidate(self, directory):
+        """Force the next lookup of directory to list it again"""
+        with self._lock:
+            node = self._nodes.get(os.path.normpath(directory))
+            if node is not None:
+                node.mtime = None
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._nodes.clear()
+
+    def _attach(self, directory):
+        """Scan a directory that is not cached yet and hook it into its parent"""
+        parent = self.cached(os.path.dirname(directory))
+        if parent is not None:
+            # The parent is cached but does not know this child: its listing is stale
+            self._update(parent, list_directory(parent.path, self.is_excluded))
+            node = self.cached(directory)
+            if node is not None:
+                return node
+        return self._build_standalone(directory)
+
+    def _build_standalone(self, directory, listing=None, revalidate_cached=True):
+        """Build directory's subtree without the lock and register it as a root"""
+        with self._lock:
+            toggles, epoch = self._toggles, self._epoch
+        fresh = []
+        node = self._build(directory, fresh, listing, revalidate_cached)
+        with self._lock:
+            existing = self._nodes.get(directory)
+            if existing is not None:
+                return existing  # another thread got there first
+            if epoch == self._epoch:
+                self._link(fresh, toggles)
+        return node
+
+    def _subtree(self, directory, fresh, revalidate_cached=True):
+        """Node for a subdirectory about to be linked under its parent, without the lock:
+        a directory already cached on its own is adopted, anything else is built"""
+        node = self.cached(directory)
+        if node is None:
+            return self._build(directory, fresh)
+        if revalidate_cached:
+            self._revalidate(node)
+        return node
+
+    def _build(self, directory, fresh, listing=None, revalidate_cached=True):
+        """List directory's subtree into detached nodes, appended to fresh parents first.
+
+        The new nodes only hold their own counts; _link() adds up the subtrees
+        once they are hooked in, so adopted nodes count as they are by then.
+        """
+        node = DirectoryNode(directory)
+        fresh.append(node)
+        listing = listing or list_directory(directory, self.is_excluded)
+        self._assign(node, listing)
+        node.total = len(node.files)
+        node.watched = self._count_watched(node)
+        for name in listing.subdirs:
+            node.subdirs[name] = self._subtree(os.path.join(directory, name), fresh, revalidate_cached)
+        return node
+
+    def _link(self, fresh, toggles):
+        """Register nodes built without the lock and total up their subtrees (lock held).
+
+        toggles is the toggle count when the build started; a directory toggled
+        since while it was not cached yet is counted again.
+        """
+        missed = {directory for number, directory in self._missed if number > toggles}
+        if len(self._missed) == self._missed.maxlen and self._missed[0][0] > toggles:
+            missed = None  # the log may no longer reach back that far
+        for node in fresh:
+            self._nodes[node.path] = node
+            for child in node.subdirs.values():
+                child.parent = node
+        # Children come after their parents, so reversed order sums bottom-up
+        for node in reversed(fresh):
+            if missed is None or node.path in missed:
+                node.watched = self._count_watched(node)
+            node.total += sum(child.total for child in node.subdirs.values())
+            node.watched += sum(child.watched for child in node.subdirs.values())
+
+    def _update(self, node, listing):
+        """Fold a fresh listing of node's directory into the tree.
+
+        Subdirectories that appeared are built before taking the lock; under
+        it, vanished ones are dropped, the new ones linked in and the ancestors
+        patched with the difference.
+        """
+        with self._lock:
+            known = set(node.subdirs)
+            toggles = self._toggles
+        built = {}
+        for name in listing.subdirs - known:
+            fresh = []
+            built[name] = self._subtree(os.path.join(node.path, name), fresh), fresh
+        with self._lock:
+            if self._nodes.get(node.path) is not node:
+                return  # dropped or cleared meanwhile
+            old_total, old_watched = node.total, node.watched
+            for name in set(node.subdirs) - listing.subdirs:
+                self._drop(node.subdirs.pop(name))
+            for name in listing.subdirs - set(node.subdirs):
+                if name in built:
+                    child, fresh = built[name]
+                else:
+                    # Linked and dropped again by another thread since we looked
+                    fresh = []
+                    child = self._subtree(os.path.join(node.path, name), fresh)
+                child.parent = node
+                node.subdirs[name] = child
+                self._link(fresh, toggles)
+            self._assign(node, listing)
+            node.total = len(node.files) + sum(child.total for child in node.subdirs.values())
+            node.watched = self._count_watched(node) + sum(child.watched for child in node.subdirs.values())
+            if node.parent is not None:
+                self._propagate(node.parent, node.total - old_total, node.watched - old_watched)
+
+    def _revalidate(self, node):
+        """Stat every cached directory under node and relist only the changed ones"""
+        with self._lock:
+            known = [(current, current.mtime) for current in self.iter_subtree(node)]
+        for current, mtime in known:
+            try:
+                now = os.stat(current.path).st_mtime_ns
+            except OSError:
+                now = None
+            if now is None or now != mtime:
+                self._update(current, list_directory(current.path, self.is_excluded))
+
+    def _assign(self, node, listing):
+        node.mtime = listing.mtime
+        node.files = listing.files
+        node.file_count = listing.file_count
+        node.folder_count = listing.folder_count
+        node.bytes = None
+
+    def _count_watched(self, node):
+        return sum(1 for name in node.files if self.is_watched(os.path.join(node.path, name)))
+
+    def _propagate(self, node, total_delta, watched_delta):
+        while node is not None:
+            node.total += total_delta
+            node.watched += watched_delta
+            node = node.parent
+
+    def _drop(self, node):
+        """Forget node and everything cached below it"""
+        if self._nodes.get(node.path) is node:
+            del self._nodes[node.path]
+        for child in node.subdirs.values():
+            self._drop(child)
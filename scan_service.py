@@ -0,0 +1,142 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import threading
+
+
+class ScanSignals(QObject):
+    """Signals emitted by a ScanJob, delivered on the GUI thread"""
+    rowsReady = pyqtSignal(int, list)   # generation, batch of EntryRecords
+    finished = pyqtSignal(int)          # generation
+    failed = pyqtSignal(int, str)       # generation, error message
+    done = pyqtSignal(int)              # generation, sent last whether or not cancelled
+
+
+class ScanJob(QRunnable):
+    """Drain a row generator on a worker thread, emitting rows in small batches"""
+
+    def __init__(self, generation, producer, signals, batch_size=16):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.producer = producer
+        self.signals = signals
+        self.batch_size = batch_size
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        try:
+            self._drain()
+        finally:
+            self.signals.done.emit(self.generation)
+
+    def _drain(self):
+        batch = []
+        try:
+            for row in self.producer():
+                if self.cancelled:
+                    return
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self.signals.rowsReady.emit(self.generation, batch)
+                    batch = []
+            if batch and not self.cancelled:
+                self.signals.rowsReady.emit(self.generation, batch)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(self.generation, str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self.generation)
+
+
+class ScanService(QObject):
+    """Run CourseManager listing and progress scans off the GUI thread.
+
+    Only one scan is active at a time: starting a new one, or calling cancel(),
+    stops the previous job and drops any of its results still in flight.
+    """
+    rowsReady = pyqtSignal(list)
+    refreshed = pyqtSignal(list)  # every record of a refresh_directory() pass at once
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.signals = ScanSignals(self)
+        self.signals.rowsReady.connect(self._on_rows_ready)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.done.connect(self._on_done)
+        self._generation = 0
+        self._job = None
+        self._refreshing = False
+        self._jobs = {}  # generation -> job, kept alive until the worker lets go of it
+
+    def scan_directory(self, directory):
+        """Stream EntryRecords for the subdirectories and files of directory"""
+        self._start(lambda: self.manager.iter_directory_contents(directory))
+
+    def refresh_directory(self, directory):
+        """List directory again and deliver all of its records through refreshed,
+        for patching rows that are already shown"""
+        self._start(lambda: [list(self.manager.iter_directory_contents(directory))], refreshing=True)
+
+    def scan_roots(self, directories):
+        """Stream directory EntryRecords for the registered roots"""
+        self._start(lambda: self.manager.iter_directory_progress(directories))
+
+    def cancel(self):
+        """Stop the running scan; rows it already queued are ignored"""
+        self._generation += 1
+        if self._job is not None:
+            self._job.cancel()
+            if self.pool.tryTake(self._job):
+                self._jobs.pop(self._job.generation, None)
+            self._job = None
+
+    def is_running(self):
+        return self._job is not None
+
+    def is_refreshing(self):
+        """True while a refresh_directory() pass is running"""
+        return self._job is not None and self._refreshing
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _start(self, producer, refreshing=False):
+        self.cancel()
+        self._refreshing = refreshing
+        self._job = ScanJob(self._generation, producer, self.signals)
+        self._jobs[self._generation] = self._job
+        self.pool.start(self._job)
+
+    def _on_rows_ready(self, generation, rows):
+        if generation != self._generation:
+            return
+        if self._refreshing:
+            self.refreshed.emit(rows[0])
+        else:
+            self.rowsReady.emit(rows)
+
+    def _on_finished(self, generation):
+        if generation == self._generation:
+            self._job = None
+            self.finished.emit()
+
+    def _on_failed(self, generation, message):
+        if generation == self._generation:
+            self._job = None
+            self.failed.emit(message)
+
+    def _on_done(self, generation):
+        self._jobs.pop(generation, None)
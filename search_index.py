@@ -0,0 +1,470 @@
+import os
+import re
+import heapq
+import itertools
+import bisect
+import sqlite3
+import threading
+
+# Words, and digit runs on their own so "Lecture12" matches "lecture 12"
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+|\d+')
+DIGITS_PATTERN = re.compile(r'(\d+)')
+FUZZY_MIN_LENGTH = 3  # shorter words only match by prefix
+DEFAULT_LIMIT = 200
+
+
+def tokenize(text):
+    """Lowercase word and number tokens of text; numbers lose leading zeros"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token.isdigit():
+            token = token.lstrip('0') or '0'
+        tokens.append(token)
+    return tokens
+
+
+def name_sort_key(name):
+    """Case-insensitive natural sort key of one path component.
+
+    Text and numbers alternate from a (possibly empty) text part, so keys
+    always compare. About ten times cheaper than a natsort key, which
+    matters when every entry of a large library gets one.
+    """
+    parts = DIGITS_PATTERN.split(name.lower())
+    for index in range(1, len(parts), 2):
+        parts[index] = int(parts[index])
+    return tuple(parts)
+
+
+def within_one_edit(a, b):
+    """True if a and b differ by at most one insertion, deletion, substitution or swap"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    i = 0
+    while i < la and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:] or (
+            i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+        )
+    return a[i:] == b[i + 1:]
+
+
+class SearchIndex:
+    """Persistent filename index over the course roots.
+
+    Every file and folder below the roots is one entry, stored in SQLite as
+    (parent, name) rows like the state store's directory table and held in
+    memory as an inverted index from name tokens to entries. Queries match
+    every typed word as a prefix of a word in the entry's name or in one of
+    its folders (numbers by value, so "lecture 2" finds "Lecture 02"), with
+    a one-edit fuzzy fallback for words that match nothing, and results come
+    back in natural order.
+
+    refresh() re-lists only directories whose mtime changed since the last
+    pass, so keeping the index current costs a stat per directory.
+    """
+
+    def __init__(self, db_path, is_excluded=None):
+        self.db_path = str(db_path)
+        self.is_excluded = is_excluded or (lambda path: False)
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._conn = None
+        self._loaded = False
+        # Entry id -> data; ids come from the database and are never reused
+        self._path = {}
+        self._kind = {}       # 'file' or 'directory'
+        self._parent = {}     # id of the containing directory, None for roots
+        self._children = {}   # directory id -> {name: id}
+        self._mtime = {}      # directory id -> st_mtime_ns when last listed
+        self._tokens = {}
+        self._sort_key = {}   # natural sort key of the path, one name_sort_key() per level
+        self._by_path = {}
+        self._postings = {}   # token -> set of entry ids
+        self._vocabulary = None  # sorted tokens, rebuilt after the postings change
+        self._order = None       # ids in natural order, kept sorted once built
+        self._position = None    # id -> index in _order, rebuilt after changes
+        self._unordered = set()  # removed ids still to be dropped from _order
+        self._next_id = 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._path)
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    parent INTEGER,
+                    name TEXT NOT NULL,
+                    is_dir INTEGER NOT NULL,
+                    mtime INTEGER
+                )''')
+        return self._conn
+
+    def load(self):
+        """Read the persisted index into memory, once"""
+        with self._lock:
+            if self._loaded:
+                return
+            rows = self._connect().execute(
+                'SELECT id, parent, name, is_dir, mtime FROM entries ORDER BY id'
+            ).fetchall()
+            # Parents are written before their children, so ids are in order
+            for entry_id, parent, name, is_dir, mtime in rows:
+                path = name if parent is None else os.path.join(self._path[parent], name)
+                self._add_entry(entry_id, parent, path, name, 'directory' if is_dir else 'file')
+                if is_dir:
+                    self._mtime[entry_id] = mtime
+                self._next_id = entry_id + 1
+            self._prepare()
+            self._loaded = True
+
+    @property
+    def is_loaded(self):
+        """True once load() has finished; until then search() finds nothing"""
+        return self._loaded
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def refresh(self, roots):
+        """Bring the index in line with the disk below roots, returning False if a
+        refresh is already running on another thread"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self.load()
+            changes = _Changes()
+            roots = [os.path.normpath(root) for root in roots]
+            with self._lock:
+                stale = [entry_id for entry_id, parent in self._parent.items()
+                         if parent is None and self._path[entry_id] not in roots]
+                for entry_id in stale:
+                    self._remove_entry(entry_id, changes)
+            for root in roots:
+                with self._lock:
+                    root_id = self._by_path.get(root)
+                    if root_id is None:
+                        root_id = self._new_entry(None, root, root, 'directory', changes)
+                self._walk(root_id, changes, recursive=True)
+            self._save(changes)
+            with self._lock:
+                self._prepare()
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_directory(self, directory):
+        """Re-list one indexed directory after it changed on disk; new folders
+        below it are indexed in full"""
+        with self._lock:
+            entry_id = self._by_path.get(os.path.normpath(directory))
+        if entry_id is None or self._kind.get(entry_id) != 'directory':
+            return
+        changes = _Changes()
+        self._walk(entry_id, changes, recursive=False)
+        self._save(changes)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Return [(path, kind, label)] of the best matches for query.
+
+        Entries whose own name matches every word come first, then those
+        matching some words only through a folder name, each in natural
+        order. label is the path relative to the folder holding the course
+        root, e.g. "Algorithms/Week 2/Lecture 3.mp4".
+
+        Nothing is found before the index is loaded: loading is left to
+        load() or refresh() on a worker thread, so a query never waits for it.
+        """
+        words = tokenize(query)
+        if not words or not self._loaded:
+            return []
+        with self._lock:
+            # The word being typed matches numbers by prefix too
+            typing = query[-1:].isalnum()
+            matches = []
+            for position, word in enumerate(words, 1):
+                hits = self._matching_entries(word, partial=typing and position == len(words))
+                if not hits:
+                    return []
+                matches.append((hits, self._covered_directories(hits)))
+            order, position = self._natural_order()
+
+            # Direct matches have every word in their own name: a plain set
+            # intersection, then only the first ones in natural order
+            direct = set.intersection(*sorted((hits for hits, _ in matches), key=len))
+            if len(direct) < len(order) // 8:
+                best = heapq.nsmallest(limit, direct, key=position.__getitem__)
+            else:
+                best = list(itertools.islice((e for e in order if e in direct), limit))
+            if len(best) < limit:
+                best += self._folder_matches(matches, direct, limit - len(best), order, position)
+            return [(self._path[entry_id], self._kind[entry_id], self._label(entry_id))
+                    for entry_id in best]
+
+    def _folder_matches(self, matches, direct, needed, order, position):
+        """First entries in natural order matching some words only through a folder"""
+        # Candidates of the most selective word: a small set is sorted, a large
+        # one is taken from the ordered list, stopping once enough matched
+        def candidate_count(match):
+            hits, covered = match
+            return len(hits) + sum(len(self._children[d]) for d in covered)
+        counts = [candidate_count(match) for match in matches]
+        hits, covered = matches[counts.index(min(counts))]
+        if min(counts) < len(order) // 8:
+            candidates = set(hits)
+            for directory_id in covered:
+                candidates.update(self._children[directory_id].values())
+            candidates = sorted(candidates, key=position.__getitem__)
+        else:
+            candidates = order
+
+        found = []
+        parent = self._parent
+        for entry_id in candidates:
+            if entry_id in direct:
+                continue
+            for hits, covered in matches:
+                if entry_id not in hits and parent[entry_id] not in covered:
+                    break
+            else:
+                found.append(entry_id)
+                if len(found) >= needed:
+                    break
+        return found
+
+    def _matching_entries(self, word, partial):
+        """Return the ids whose own name has a token matching word"""
+        vocabulary = self._sorted_vocabulary()
+        if word.isdigit() and not partial:
+            return self._postings.get(word, set())
+        postings = []
+        start = bisect.bisect_left(vocabulary, word)
+        for token in vocabulary[start:]:
+            if not token.startswith(word):
+                break
+            postings.append(self._postings[token])
+        # A single token's postings are returned as is; callers only read them
+        hits = postings[0] if len(postings) == 1 else set().union(*postings)
+        if hits or word.isdigit() or len(word) < FUZZY_MIN_LENGTH:
+            return hits
+        # Nothing starts with the word: allow one typo against token prefixes
+        hits = set()
+        size = len(word)
+        for token in vocabulary:
+            if token[0].isdigit() or len(token) < size - 1:
+                continue
+            if (within_one_edit(word, token[:size]) or within_one_edit(word, token[:size + 1])
+                    or within_one_edit(word, token[:size - 1])):
+                hits.update(self._postings[token])
+        return hits
+
+    def _covered_directories(self, entry_ids):
+        """Directories among entry_ids and every directory below them"""
+        # Directories are far fewer than entries, so test them against the hits
+        covered = {entry_id for entry_id in self._children if entry_id in entry_ids}
+        stack = list(covered)
+        while stack:
+            for child_id in self._children[stack.pop()].values():
+                if child_id in self._children and child_id not in covered:
+                    covered.add(child_id)
+                    stack.append(child_id)
+        return covered
+
+    def _natural_order(self):
+        """Return (every entry id in natural path order, id -> position)"""
+        if self._order is None:
+            self._order = sorted(self._path, key=self._sort_key.__getitem__)
+        self._drop_unordered()
+        if self._position is None:
+            self._position = {entry_id: index for index, entry_id in enumerate(self._order)}
+        return self._order, self._position
+
+    def _label(self, entry_id):
+        root = entry_id
+        while self._parent[root] is not None:
+            root = self._parent[root]
+        path = self._path[entry_id]
+        return path[len(os.path.dirname(self._path[root])):].lstrip(os.sep)
+
+    def _prepare(self):
+        """Rebuild the lookup structures now, on the refreshing thread, rather
+        than in the first query"""
+        self._sorted_vocabulary()
+        self._natural_order()
+
+    def _drop_unordered(self):
+        if self._unordered:
+            self._order = [entry_id for entry_id in self._order if entry_id not in self._unordered]
+            self._unordered.clear()
+            self._position = None
+
+    def _sorted_vocabulary(self):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _walk(self, start_id, changes, recursive):
+        """Re-list directories from start_id down whose mtime changed"""
+        stack = [start_id]
+        while stack:
+            directory_id = stack.pop()
+            with self._lock:
+                if directory_id not in self._path:
+                    continue
+                path = self._path[directory_id]
+                known_mtime = self._mtime.get(directory_id)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            listed = mtime != known_mtime
+            if listed:
+                try:
+                    listing = self._list(path)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._apply_listing(directory_id, listing, mtime, changes)
+            if recursive or listed or directory_id == start_id:
+                with self._lock:
+                    children = self._children.get(directory_id, {})
+                    stack.extend(
+                        child_id for child_id in children.values()
+                        if self._kind[child_id] == 'directory'
+                        and (recursive or self._mtime.get(child_id) is None)
+                    )
+
+    def _list(self, path):
+        listing = {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        listing[entry.name] = 'directory'
+                    elif not self.is_excluded(entry.path):
+                        listing[entry.name] = 'file'
+                except OSError:
+                    continue
+        return listing
+
+    def _apply_listing(self, directory_id, listing, mtime, changes):
+        children = self._children[directory_id]
+        for name, child_id in list(children.items()):
+            if listing.get(name) != self._kind[child_id]:
+                self._remove_entry(child_id, changes)
+        for name, kind in listing.items():
+            if name not in children:
+                self._new_entry(directory_id, os.path.join(self._path[directory_id], name),
+                                name, kind, changes)
+        self._mtime[directory_id] = mtime
+        changes.mtimes[directory_id] = mtime
+
+    def _new_entry(self, parent, path, name, kind, changes):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._add_entry(entry_id, parent, path, name, kind)
+        changes.added.append((entry_id, parent, name, kind == 'directory'))
+        return entry_id
+
+    def _add_entry(self, entry_id, parent, path, name, kind):
+        self._path[entry_id] = path
+        self._kind[entry_id] = kind
+        self._parent[entry_id] = parent
+        self._by_path[path] = entry_id
+        name_key = name_sort_key(os.path.basename(path))
+        key = self._sort_key[entry_id] = (name_key,) if parent is None else self._sort_key[parent] + (name_key,)
+        if self._order is not None:
+            self._drop_unordered()
+            low, high = 0, len(self._order)
+            while low < high:
+                middle = (low + high) // 2
+                if self._sort_key[self._order[middle]] < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            self._order.insert(low, entry_id)
+            self._position = None
+        if kind == 'directory':
+            self._children[entry_id] = {}
+        if parent is not None:
+            self._children[parent][name] = entry_id
+        # Roots are indexed under their folder name, not the whole path
+        tokens = self._tokens[entry_id] = tuple(set(tokenize(os.path.basename(path))))
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                self._vocabulary = None
+            postings.add(entry_id)
+
+    def _remove_entry(self, entry_id, changes):
+        """Drop an entry and everything below it"""
+        parent = self._parent[entry_id]
+        if parent is not None:
+            self._children[parent].pop(os.path.basename(self._path[entry_id]), None)
+        stack = [entry_id]
+        while stack:
+            current = stack.pop()
+            stack.extend(self._children.pop(current, {}).values())
+            for token in self._tokens.pop(current):
+                postings = self._postings[token]
+                postings.discard(current)
+                if not postings:
+                    del self._postings[token]
+                    self._vocabulary = None
+            del self._by_path[self._path.pop(current)]
+            del self._kind[current], self._parent[current]
+            self._mtime.pop(current, None)
+            del self._sort_key[current]
+            changes.removed.append(current)
+            if self._order is not None:
+                self._unordered.add(current)
+
+    def _save(self, changes):
+        if not changes:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN')
+            try:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO entries (id, parent, name, is_dir) VALUES (?, ?, ?, ?)',
+                    changes.added
+                )
+                conn.executemany(
+                    'UPDATE entries SET mtime = ? WHERE id = ?',
+                    ((mtime, i) for i, mtime in changes.mtimes.items())
+                )
+                # Last, so entries added and removed within one pass are gone too
+                conn.executemany('DELETE FROM entries WHERE id = ?', ((i,) for i in changes.removed))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+
+class _Changes:
+    """Rows to write after a refresh pass"""
+
+    def __init__(self):
+        self.added = []     # (id, parent, name, is_dir)
+        self.removed = []   # ids
+        self.mtimes = {}    # directory id -> mtime
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.mtimes)
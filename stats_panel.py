@@ -0,0 +1,84 @@
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+import instrumentation
+
+
+class StatsPanel(QDialog):
+    """Live view of the instrumentation timers, with cProfile start/stop"""
+
+    COLUMNS = ("Name", "Calls", "Total ms", "Mean ms", "Max ms")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance Stats")
+        self.resize(720, 480)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+
+        buttons = QHBoxLayout()
+        self.profile_button = QPushButton()
+        self.profile_button.clicked.connect(self.toggle_profiling)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+        log_button = QPushButton("Write to Log")
+        log_button.clicked.connect(instrumentation.log_summary)
+        buttons.addWidget(self.profile_button)
+        buttons.addStretch()
+        buttons.addWidget(reset_button)
+        buttons.addWidget(log_button)
+        layout.addLayout(buttons)
+
+        # Refresh while shown
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        timers, counters = instrumentation.snapshot()
+        self.table.setRowCount(len(timers))
+        for row, (name, calls, total, peak) in enumerate(timers):
+            values = (name, str(calls), f"{total * 1000:.1f}",
+                      f"{total * 1000 / calls:.2f}", f"{peak * 1000:.1f}")
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.counters_label.setText(
+            "  ".join(f"{name}: {value}" for name, value in sorted(counters.items()))
+        )
+        self.profile_button.setText(
+            "Stop cProfile && Save" if instrumentation.is_profiling() else "Start cProfile"
+        )
+
+    def toggle_profiling(self):
+        if instrumentation.is_profiling():
+            path = instrumentation.stop_profiling()
+            QMessageBox.information(self, "cProfile", f"Profile written to:\n{path}")
+        else:
+            instrumentation.start_profiling()
+        self.refresh()
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
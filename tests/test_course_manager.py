@@ -0,0 +1,34 @@
+import os
+
+from course_manager import CourseManager
+
+COURSE = os.path.join(os.sep, 'courses', 'algo')
+
+
+def path(name):
+    return os.path.join(COURSE, name)
+
+
+def open_manager(config_dir):
+    # A long delay keeps every write pending until close() flushes them together
+    return CourseManager(flush_delay=60, config_dir=str(config_dir), legacy_config_dir=None)
+
+
+def test_toggle_after_import_replace_survives_the_flush(tmp_path):
+    manager = open_manager(tmp_path)
+    manager.update_file_watched_state(path('a.mp4'), True)
+    manager.import_state({
+        'directories': [COURSE],
+        'watched': {COURSE: {'a.mp4': False, 'b.mp4': True}},
+    }, replace=True)
+    manager.update_file_watched_state(path('c.mp4'), True)
+    manager.close()
+
+    manager = open_manager(tmp_path)
+    try:
+        assert manager.directories == [COURSE]
+        assert not manager.is_file_watched(path('a.mp4'))
+        assert manager.is_file_watched(path('b.mp4'))
+        assert manager.is_file_watched(path('c.mp4'))
+    finally:
+        manager.close()
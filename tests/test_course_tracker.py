@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+from course_manager import CourseManager
+from CourseTracker import CourseTrackerApp
+from media_index import format_duration
+
+MINUTES = 10 * 60  # probed duration of every media file
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(app, tmp_path):
+    course = tmp_path / 'course'
+    course.mkdir()
+    for name in ('1.mp3', '2.mp3', '3.mp3'):
+        (course / name).write_bytes(b'x')
+    manager = CourseManager(config_dir=str(tmp_path / 'config'), legacy_config_dir=None)
+    manager.media_index.probe = lambda file_path: MINUTES
+    manager.add_directory(str(course))
+    window = CourseTrackerApp(manager)
+    yield window
+    window.close()
+
+
+def wait_for(app, condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def test_time_label_follows_checkbox_toggles(app, window):
+    course = window.manager.directories[0]
+    window.open_entry(course)
+    wait_for(app, lambda: window.time_label.text() == f"{format_duration(3 * MINUTES)} left of "
+                                                      f"{format_duration(3 * MINUTES)}")
+    assert not window.is_painted_view()
+
+    first = os.path.join(course, '1.mp3')
+    window.file_widgets[first].checkbox.setChecked(True)
+    assert window.manager.is_file_watched(first)
+    assert window.time_label.text() == f"{format_duration(2 * MINUTES)} left of {format_duration(3 * MINUTES)}"
+    assert window.manager.time_progress(course)['remaining'] == 2 * MINUTES
+
+    window.file_widgets[first].checkbox.setChecked(False)
+    assert not window.manager.is_file_watched(first)
+    assert window.time_label.text() == f"{format_duration(3 * MINUTES)} left of {format_duration(3 * MINUTES)}"
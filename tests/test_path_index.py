@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from path_index import PathIndex, join_path
+
+COURSE = os.path.join(os.sep, 'courses', 'algo')
+
+
+def path(*parts):
+    return os.path.join(COURSE, *parts)
+
+
+def assert_counts_consistent(index):
+    """Every node's subtree counts must match what its entries add up to"""
+    def check(node):
+        count = len(node.values)
+        true_count = sum(1 for value in node.values.values() if value)
+        for child in node.children.values():
+            assert child.parent is node
+            child_count, child_true = check(child)
+            count += child_count
+            true_count += child_true
+        assert (node.count, node.true_count) == (count, true_count), node.name
+        return count, true_count
+
+    check(index.root)
+
+
+def test_set_counts_and_overwrites():
+    index = PathIndex()
+    index.set(path('w1', 'a.mp4'), True)
+    index.set(path('w1', 'b.mp4'), False)
+    index.set(path('w2', 'c.mp4'), True)
+    assert len(index) == 3
+    assert index.count(COURSE) == (3, 2)
+    assert index.count(path('w1')) == (2, 1)
+
+    index.set(path('w1', 'a.mp4'), False)  # flip only changes the truthy count
+    index.set(path('w1', 'b.mp4'), False)  # same value again changes nothing
+    assert index.count(COURSE) == (3, 1)
+    assert index.count(path('w1', 'b.mp4')) == (1, 0)
+    assert_counts_consistent(index)
+
+
+def test_set_many_counts_new_and_changed_entries():
+    index = PathIndex()
+    index.set(path('w1', 'a.mp4'), False)
+    index.set_many(path('w1'), {'a.mp4': True, 'b.mp4': True, 'c.mp4': False})
+    assert index.count(path('w1')) == (3, 2)
+    assert index.count(COURSE) == (3, 2)
+    index.set_many(path('w1'), {'a.mp4': False, 'b.mp4': True})
+    assert index.count(COURSE) == (3, 1)
+    assert index.values_in(path('w1')) == {'a.mp4': False, 'b.mp4': True, 'c.mp4': False}
+    assert_counts_consistent(index)
+
+
+def test_move_to_new_location_reroots_subtree():
+    index = PathIndex()
+    index.set(path('w1', 'a.mp4'), True)
+    index.set(path('w1', 'deep', 'b.mp4'), False)
+    index.set(COURSE, True)  # e.g. the root's own progress entry
+    target = os.path.join(os.sep, 'archive', 'algo')
+
+    assert index.move(COURSE, target) == 3
+    assert index.count(COURSE) == (0, 0)
+    assert index.count(target) == (3, 2)
+    assert index.get(os.path.join(target, 'w1', 'deep', 'b.mp4')) is False
+    assert 'courses' not in index.root.children[''].children  # emptied parents are pruned
+    assert_counts_consistent(index)
+
+
+def test_move_merges_into_existing_subtree():
+    index = PathIndex()
+    target = os.path.join(os.sep, 'archive', 'algo')
+    index.set(path('w1', 'a.mp4'), True)
+    index.set(path('w1', 'clash.mp4'), True)
+    index.set(path('w2', 'c.mp4'), False)
+    index.set(os.path.join(target, 'w1', 'clash.mp4'), False)
+    index.set(os.path.join(target, 'w1', 'kept.mp4'), True)
+    index.set(os.path.join(target, 'w3', 'd.mp4'), True)
+
+    assert index.move(COURSE, target) == 3
+    # Moved entries win over the ones already at the target
+    assert dict(index.items(target)) == {
+        os.path.join(target, 'w1', 'a.mp4'): True,
+        os.path.join(target, 'w1', 'clash.mp4'): True,
+        os.path.join(target, 'w1', 'kept.mp4'): True,
+        os.path.join(target, 'w2', 'c.mp4'): False,
+        os.path.join(target, 'w3', 'd.mp4'): True,
+    }
+    assert index.count(target) == (5, 4)
+    assert index.count(os.path.join(target, 'w1')) == (3, 3)
+    assert len(index) == 5
+    assert list(index.items(COURSE)) == []
+    assert_counts_consistent(index)
+
+
+def test_move_into_itself_is_refused():
+    index = PathIndex()
+    index.set(path('w1', 'a.mp4'), True)
+    with pytest.raises(ValueError):
+        index.move(COURSE, path('w1'))
+    assert index.count(COURSE) == (1, 1)
+
+
+def test_join_path_of_root():
+    assert join_path(['']) == os.sep
@@ -0,0 +1,137 @@
+import os
+import shutil
+
+import pytest
+
+from progress_tree import ProgressTree
+
+
+def is_excluded(path):
+    return path.endswith('.tmp')
+
+
+class Course:
+    """A directory tree on disk, a watched set and the progress tree over both"""
+
+    def __init__(self, root, on_excluded_check=None):
+        self.root = str(root)
+        self.watched = set()
+        self.on_excluded_check = on_excluded_check
+        self.tree = ProgressTree(self.is_excluded, lambda path: path in self.watched)
+
+    def is_excluded(self, path):
+        if self.on_excluded_check is not None:
+            self.on_excluded_check(path)
+        return is_excluded(path)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def add_files(self, directory, *names):
+        os.makedirs(self.path(directory), exist_ok=True)
+        for name in names:
+            with open(self.path(directory, name), 'w') as f:
+                f.write('x')
+
+    def toggle(self, file_path, watched):
+        was_watched = file_path in self.watched
+        if watched:
+            self.watched.add(file_path)
+        else:
+            self.watched.discard(file_path)
+        self.tree.set_watched(file_path, was_watched, watched)
+
+    def expected(self, directory):
+        """(total, watched) of directory counted straight from disk"""
+        total = watched = 0
+        for current, dirs, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(current, name)
+                if is_excluded(path):
+                    continue
+                total += 1
+                watched += path in self.watched
+        return total, watched
+
+    def assert_matches(self):
+        for current, dirs, files in os.walk(self.root):
+            node = self.tree.get(current, revalidate=False)
+            total, watched = self.expected(current)
+            assert (node.total, node.watched) == (total, watched), current
+            assert node.progress == pytest.approx((watched / total * 100) if total else 0)
+
+
+@pytest.fixture
+def course(tmp_path):
+    course = Course(tmp_path / 'course')
+    course.add_files('', 'intro.mp4', 'notes.tmp')
+    course.add_files('week1', 'a.mp4', 'b.mp4', 'c.pdf')
+    course.add_files(os.path.join('week1', 'extra'), 'd.mp4')
+    course.add_files('week2', 'e.mp4', 'f.mp4')
+    course.tree.get(course.root)
+    return course
+
+
+def test_counts_match_disk_after_toggles(course):
+    course.assert_matches()
+    course.toggle(course.path('week1', 'a.mp4'), True)
+    course.toggle(course.path('week1', 'extra', 'd.mp4'), True)
+    course.toggle(course.path('intro.mp4'), True)
+    course.assert_matches()
+    course.toggle(course.path('week1', 'a.mp4'), False)
+    # Repeating a state is not a change
+    course.toggle(course.path('intro.mp4'), True)
+    course.assert_matches()
+    assert course.tree.get(course.root).watched == 2
+
+
+def test_counts_match_disk_after_folders_come_and_go(course):
+    course.toggle(course.path('week2', 'e.mp4'), True)
+    course.toggle(course.path('week1', 'extra', 'd.mp4'), True)
+    course.add_files('week3', 'g.mp4', 'h.tmp')
+    course.add_files(os.path.join('week1', 'bonus'), 'i.mp4')
+    course.watched.add(course.path('week3', 'g.mp4'))  # watched before the tree ever saw it
+    shutil.rmtree(course.path('week1', 'extra'))
+    course.watched.discard(course.path('week1', 'extra', 'd.mp4'))
+    for directory in (course.root, course.path('week1')):
+        course.tree.invalidate(directory)
+    course.tree.get(course.root)
+    course.assert_matches()
+    assert course.tree.cached(course.path('week1', 'extra')) is None
+    assert course.tree.get(course.root).total == 8
+
+
+def test_counts_match_disk_after_subtree_marking(course):
+    course.toggle(course.path('week2', 'e.mp4'), True)
+    week1 = course.tree.get(course.path('week1'))
+    for current, dirs, files in os.walk(course.path('week1')):
+        course.watched.update(os.path.join(current, name) for name in files)
+    course.tree.set_subtree_watched(week1, True)
+    course.assert_matches()
+    assert week1.progress == 100
+
+    for current, dirs, files in os.walk(course.path('week1')):
+        course.watched.difference_update(os.path.join(current, name) for name in files)
+    course.tree.set_subtree_watched(week1, False)
+    course.assert_matches()
+    assert course.tree.get(course.root).watched == 1
+
+
+def test_toggle_during_a_build_is_counted(tmp_path):
+    toggled = []
+
+    def toggle_once(path):
+        # The root is listed and counted by now, but its subtree not yet linked
+        if not toggled and os.path.basename(os.path.dirname(path)) == 'week1':
+            toggled.append(path)
+            course.toggle(course.path('intro.mp4'), True)
+            course.toggle(course.path('week2', 'e.mp4'), True)
+
+    course = Course(tmp_path / 'course', toggle_once)
+    course.add_files('', 'intro.mp4')
+    course.add_files('week1', 'a.mp4', 'b.mp4')
+    course.add_files('week2', 'e.mp4')
+    course.tree.get(course.root)
+    assert toggled
+    course.assert_matches()
+    assert course.tree.get(course.root).watched == 2
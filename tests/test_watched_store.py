@@ -0,0 +1,95 @@
+import os
+import sqlite3
+
+from watched_store import SCHEMA_VERSION, WatchedStore
+
+COURSE = os.path.join(os.sep, 'courses', 'algo')
+
+
+def path(*parts):
+    return os.path.join(COURSE, *parts)
+
+
+def write_v1_database(db_path, watched, progress):
+    """Create a database the way schema version 1 stored it: full directory paths per row"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE watched (
+            directory TEXT NOT NULL,
+            name TEXT NOT NULL,
+            watched INTEGER NOT NULL,
+            PRIMARY KEY (directory, name)
+        ) WITHOUT ROWID;
+        CREATE TABLE progress (
+            path TEXT PRIMARY KEY,
+            value REAL NOT NULL
+        ) WITHOUT ROWID;
+    ''')
+    conn.executemany('INSERT INTO watched VALUES (?, ?, ?)', watched)
+    conn.executemany('INSERT INTO progress VALUES (?, ?)', progress)
+    conn.execute('PRAGMA user_version=1')
+    conn.commit()
+    conn.close()
+
+
+def test_migrates_v1_database_in_place(tmp_path):
+    db_path = str(tmp_path / 'state.db')
+    write_v1_database(
+        db_path,
+        watched=[(path('w1'), 'a.mp4', 1), (path('w1'), 'b.mp4', 0), (path('w2', 'deep'), 'c.mp4', 1)],
+        progress=[(COURSE, 66.7), (path('w1'), 50.0)],
+    )
+
+    store = WatchedStore(db_path)
+    try:
+        assert dict(store.load_watched().items()) == {
+            path('w1', 'a.mp4'): True,
+            path('w1', 'b.mp4'): False,
+            path('w2', 'deep', 'c.mp4'): True,
+        }
+        assert dict(store.load_progress().items()) == {COURSE: 66.7, path('w1'): 50.0}
+        assert store.load_summaries() == {}
+    finally:
+        store.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    assert not tables & {'watched_v1', 'progress_v1'}
+    assert {'dirs', 'watched', 'progress', 'fingerprints', 'summaries'} <= tables
+
+
+def test_relink_into_existing_subtree_merges_rows(tmp_path):
+    db_path = str(tmp_path / 'state.db')
+    target = os.path.join(os.sep, 'archive', 'algo')
+    store = WatchedStore(db_path)
+    store.set_many_watched([
+        (path('w1'), 'a.mp4', True),
+        (path('w1'), 'clash.mp4', True),
+        (path('w2'), 'c.mp4', False),
+        (os.path.join(target, 'w1'), 'clash.mp4', False),
+        (os.path.join(target, 'w1'), 'kept.mp4', True),
+    ])
+    store.set_many_progress([(COURSE, 40.0), (target, 10.0)])
+    store.set_many_fingerprints([(path('w1'), 'a.mp4', 123)])
+
+    store.relink(COURSE, target)
+    store.close()
+
+    # A fresh connection sees only what reached the database
+    store = WatchedStore(db_path)
+    try:
+        assert dict(store.load_watched().items()) == {
+            os.path.join(target, 'w1', 'a.mp4'): True,
+            os.path.join(target, 'w1', 'clash.mp4'): True,
+            os.path.join(target, 'w1', 'kept.mp4'): True,
+            os.path.join(target, 'w2', 'c.mp4'): False,
+        }
+        assert dict(store.load_progress().items()) == {target: 40.0}
+        assert store.load_fingerprints(target) == {(os.path.join(target, 'w1'), 'a.mp4'): 123}
+        assert store.load_fingerprints(COURSE) == {}
+    finally:
+        store.close()
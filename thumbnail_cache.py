@@ -0,0 +1,133 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path.home() / '.course_organizer' / 'thumbs'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ThumbnailCache:
+    """Size-bounded LRU cache of rendered thumbnails on disk.
+
+    Entries are small encoded images (PNG) named after a hash of the source
+    path, its size and mtime, the thumbnail size and the render settings
+    (see thumbnail_variant()), so an edited or replaced file simply misses.
+    Hits refresh the entry's mtime, which orders eviction.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # name -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self._load_index()
+
+    def key_for(self, file_path, target_size, variant=''):
+        """Cache key for file_path at target_size, or None if the file is gone"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(file_path)}\0{st.st_size}\0{st.st_mtime_ns}\0{target_size}"
+        if variant:
+            # Default renders keep the keys they always had
+            raw += f"\0{variant}"
+        return hashlib.sha1(raw.encode('utf-8', 'surrogateescape')).hexdigest() + '.png'
+
+    def get(self, file_path, target_size, variant=''):
+        """Return the cached image bytes, or None on a miss"""
+        name = self.key_for(file_path, target_size, variant)
+        if name is None:
+            return None
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        entry_path = self.cache_dir / name
+        try:
+            data = entry_path.read_bytes()
+            os.utime(entry_path)
+            return data
+        except OSError:
+            self._forget(name)
+            return None
+
+    def put(self, file_path, target_size, data, variant=''):
+        """Store encoded image bytes for file_path at target_size"""
+        name = self.key_for(file_path, target_size, variant)
+        if name is None or not data:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / f".{name}.{threading.get_ident()}.tmp"
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.cache_dir / name)
+        except OSError as e:
+            print(f"Error writing thumbnail cache: {e}")
+            return
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            names = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for name in names:
+            try:
+                (self.cache_dir / name).unlink()
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def _load_index(self):
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.png') and e.is_file()]
+        except OSError:
+            return
+        stats = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(stats):
+            self._entries[name] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits (lock held)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                (self.cache_dir / name).unlink()
+            except OSError:
+                pass
+
+    def _forget(self, name):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+
+
+_shared_cache = None
+
+
+def get_thumbnail_cache():
+    """Process-wide thumbnail cache under ~/.course_organizer/thumbs"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ThumbnailCache()
+    return _shared_cache
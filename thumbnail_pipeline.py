@@ -0,0 +1,155 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import heapq
+import itertools
+import os
+import time
+import instrumentation
+from thumbnail_cache import get_thumbnail_cache
+from thumbnail_renderers import render_thumbnail, thumbnail_variant, THUMBNAIL_SIZES
+
+
+class ThumbnailPipeline(QObject):
+    """Render thumbnails in a bounded process pool and deliver them as pixmaps.
+
+    Requests are served from the on-disk cache when possible. Misses are queued
+    by priority and handed to worker processes a few at a time, so requests for
+    rows that scroll out of view can still be cancelled before they start.
+    """
+    thumbnailReady = pyqtSignal(str, QPixmap)  # file path, rendered thumbnail
+    thumbnailFailed = pyqtSignal(str)          # file path
+    _rendered = pyqtSignal(str, object)        # file path, PNG bytes or None
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.cache = get_thumbnail_cache()
+        self._executor = None
+        self._queue = []          # (priority, sequence, file path)
+        self._pending = {}        # file path -> (kind, target size, sequence)
+        self._running = {}        # file path -> future
+        self._failed = {}         # file path -> (size, mtime_ns) it could not be rendered at
+        self._sequence = itertools.count()
+        self._rendered.connect(self._on_rendered)
+
+    def cached_pixmap(self, file_path, kind):
+        """Return the cached thumbnail for file_path, or None without rendering"""
+        data = self.cache.get(file_path, THUMBNAIL_SIZES[kind], thumbnail_variant(kind))
+        instrumentation.increment('thumbnail.cache_miss' if data is None else 'thumbnail.cache_hit')
+        if data is None:
+            return None
+        pixmap = QPixmap()
+        return pixmap if pixmap.loadFromData(data, 'PNG') else None
+
+    def request(self, file_path, kind, priority=1):
+        """Queue file_path for rendering; lower priority values are served first"""
+        if file_path in self._running or self._has_failed(file_path):
+            return
+        # Re-queueing an already pending path leaves its old heap entry stale
+        sequence = next(self._sequence)
+        self._pending[file_path] = (kind, THUMBNAIL_SIZES[kind], sequence)
+        heapq.heappush(self._queue, (priority, sequence, file_path))
+        self._pump()
+
+    def request_visible(self, requests):
+        """Render (file path, kind) pairs first and drop every other queued request"""
+        wanted = {file_path for file_path, _ in requests}
+        for file_path in list(self._pending):
+            if file_path not in wanted:
+                del self._pending[file_path]
+        for file_path, future in list(self._running.items()):
+            if file_path not in wanted and future.cancel():
+                del self._running[file_path]
+        for file_path, kind in requests:
+            self.request(file_path, kind, priority=0)
+
+    def cancel_all(self):
+        self._pending.clear()
+        self._queue.clear()
+        for file_path, future in list(self._running.items()):
+            if future.cancel():
+                del self._running[file_path]
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _pump(self):
+        """Submit queued requests while fewer than two per worker are in flight"""
+        while self._queue and len(self._running) < self.max_workers * 2:
+            _, sequence, file_path = heapq.heappop(self._queue)
+            pending = self._pending.get(file_path)
+            if pending is None or pending[2] != sequence:
+                continue  # cancelled or re-queued with another priority
+            del self._pending[file_path]
+            kind, target_size, _ = pending
+            try:
+                future = self._get_executor().submit(render_thumbnail, file_path, kind, target_size)
+            except BrokenProcessPool:
+                # A worker died (e.g. a decoder crashed); start a fresh pool next time
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._mark_failed(file_path)
+                continue
+            self._running[file_path] = future
+            future.add_done_callback(
+                lambda f, path=file_path, kind=kind, size=target_size, started=time.perf_counter():
+                    self._on_future_done(path, kind, size, started, f)
+            )
+
+    def _has_failed(self, file_path):
+        """True if file_path failed to render and has not changed since"""
+        if file_path not in self._failed:
+            return False
+        if self._failed[file_path] == self._signature(file_path):
+            return True
+        del self._failed[file_path]  # replaced or re-encoded, worth another try
+        return False
+
+    def _mark_failed(self, file_path):
+        self._failed[file_path] = self._signature(file_path)
+
+    @staticmethod
+    def _signature(file_path):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Never fork a process that has Qt loaded
+            context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def _on_future_done(self, file_path, kind, target_size, started, future):
+        """Runs on the executor's thread: cache the result and hand it to the GUI thread"""
+        if future.cancelled():
+            return
+        # Submit-to-result time, i.e. decoding in the worker plus pickling
+        instrumentation.record(f"thumbnail.render.{kind}", time.perf_counter() - started)
+        try:
+            data = future.result()
+        except Exception as e:
+            print(f"Thumbnail error for {file_path}: {e}")
+            data = None
+        if data:
+            self.cache.put(file_path, target_size, data, thumbnail_variant(kind))
+        self._rendered.emit(file_path, data)
+
+    def _on_rendered(self, file_path, data):
+        self._running.pop(file_path, None)
+        pixmap = QPixmap()
+        if data and pixmap.loadFromData(data, 'PNG'):
+            self.thumbnailReady.emit(file_path, pixmap)
+        else:
+            self._mark_failed(file_path)
+            self.thumbnailFailed.emit(file_path)
+        self._pump()
@@ -0,0 +1,303 @@
+"""Thumbnail rendering without a GUI.
+
+Renderers return encoded PNG bytes so they can run in worker processes of the
+thumbnail pipeline as well as inline in FileItemWidget. Each kind is served by
+registered ThumbnailProviders; their decoding libraries (Pillow, OpenCV,
+QtPdf, pdf2image) are only imported when the first file of that kind is
+rendered. None of them needs a QApplication.
+"""
+import abc
+import io
+import importlib.util
+import os
+
+# Canvas size of the finished thumbnail for each kind
+THUMBNAIL_SIZES = {
+    'image': 32,
+    'video': 48,
+    'pdf': 48,
+}
+
+# Where video thumbnails are taken from: VIDEO_SEEK_SECONDS in when set,
+# otherwise VIDEO_SEEK_FRACTION of the duration, at most VIDEO_SEEK_MAX_SECONDS.
+# The first frames of a lecture are often black or a title card.
+VIDEO_OFFSET_ENV_VAR = 'COURSE_ORGANIZER_VIDEO_OFFSET'  # seconds, read by the app and its workers
+DEFAULT_VIDEO_SEEK_FRACTION = 0.1
+VIDEO_SEEK_FRACTION = DEFAULT_VIDEO_SEEK_FRACTION
+VIDEO_SEEK_MAX_SECONDS = 60.0
+BLACK_FRAME_LEVEL = 16  # mean 8-bit brightness below which a frame counts as black
+
+
+def _video_offset_from_env():
+    value = os.environ.get(VIDEO_OFFSET_ENV_VAR, '').strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Ignoring {VIDEO_OFFSET_ENV_VAR}={value!r}: not a number of seconds")
+        return None
+
+
+VIDEO_SEEK_SECONDS = _video_offset_from_env()
+
+
+def thumbnail_kind(mime_type):
+    """Return 'image', 'video' or 'pdf' for mime types that get a real thumbnail"""
+    if not mime_type:
+        return None
+    if mime_type.startswith('image/'):
+        return 'image'
+    if mime_type.startswith('video/'):
+        return 'video'
+    if mime_type == 'application/pdf':
+        return 'pdf'
+    return None
+
+
+class ThumbnailProvider(abc.ABC):
+    """Renders thumbnails of one kind with a particular backend.
+
+    Subclasses list the top-level modules the backend needs in `modules` and
+    import them inside render(), so merely registering a provider is free.
+    """
+    kind = None
+    modules = ()
+
+    def __init__(self):
+        self._available = None
+
+    def available(self):
+        """True if the backend's modules are installed, checked without importing them"""
+        if self._available is None:
+            self._available = all(importlib.util.find_spec(name) is not None for name in self.modules)
+        return self._available
+
+    @abc.abstractmethod
+    def render(self, file_path, target_size):
+        """Return PNG bytes, or None if the backend could not decode the file"""
+
+
+class PillowImageProvider(ThumbnailProvider):
+    kind = 'image'
+    modules = ('PIL',)
+
+    def render(self, file_path, target_size):
+        return render_image_thumbnail(file_path, target_size)
+
+
+class OpenCVVideoProvider(ThumbnailProvider):
+    kind = 'video'
+    modules = ('cv2', 'PIL')
+
+    def render(self, file_path, target_size):
+        return render_video_thumbnail(file_path, target_size)
+
+
+class QtPdfProvider(ThumbnailProvider):
+    """Renders page 1 in-process with QtPdf (PDFium), no subprocess or temp files"""
+    kind = 'pdf'
+    modules = ('PyQt6.QtPdf', 'PIL')
+
+    def render(self, file_path, target_size):
+        return render_pdf_thumbnail_qtpdf(file_path, target_size)
+
+
+class Pdf2ImageProvider(ThumbnailProvider):
+    """Renders page 1 with poppler's pdftoppm, one subprocess per file"""
+    kind = 'pdf'
+    modules = ('pdf2image', 'PIL')
+
+    def render(self, file_path, target_size):
+        return render_pdf_thumbnail(file_path, target_size)
+
+
+_providers = {}  # kind -> providers in order of preference
+
+
+def register_provider(provider, preferred=False):
+    """Add a provider for its kind, ahead of the existing ones when preferred"""
+    providers = _providers.setdefault(provider.kind, [])
+    if preferred:
+        providers.insert(0, provider)
+    else:
+        providers.append(provider)
+
+
+def providers_for(kind):
+    return [provider for provider in _providers.get(kind, ()) if provider.available()]
+
+
+def render_thumbnail(file_path, kind, target_size=None):
+    """Render file_path as PNG bytes, or None if nothing could be decoded.
+
+    Providers are tried in order; an error or an empty result falls through to
+    the next one, and an error is raised only if no provider rendered anything.
+    """
+    target_size = target_size or THUMBNAIL_SIZES[kind]
+    error = None
+    for provider in providers_for(kind):
+        try:
+            data = provider.render(file_path, target_size)
+        except Exception as e:
+            error = e
+            continue
+        if data:
+            return data
+    if error is not None:
+        raise error
+    return None
+
+
+def centered_png(image, canvas_size, fit_size=None):
+    """Fit image into fit_size, center it on a transparent canvas and encode as PNG"""
+    from PIL import Image
+    
+    fit_size = fit_size or canvas_size
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    ratio = min(fit_size / float(image.size[0]), fit_size / float(image.size[1]))
+    new_size = tuple(max(1, int(dim * ratio)) for dim in image.size)
+    image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    final_image = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
+    final_image.paste(image, ((canvas_size - new_size[0]) // 2, (canvas_size - new_size[1]) // 2))
+
+    bytes_io = io.BytesIO()
+    final_image.save(bytes_io, format='PNG')
+    return bytes_io.getvalue()
+
+
+def render_image_thumbnail(file_path, target_size=32):
+    """Create thumbnail for image files"""
+    from PIL import Image
+    
+    with Image.open(file_path) as image:
+        image.draft('RGB', (target_size * 2, target_size * 2))
+        return centered_png(image, target_size)
+
+
+def set_video_seek(seconds=None, fraction=None):
+    """Configure where video thumbnails are taken; seconds=None means use the fraction"""
+    global VIDEO_SEEK_SECONDS, VIDEO_SEEK_FRACTION
+    VIDEO_SEEK_SECONDS = seconds
+    if fraction is not None:
+        VIDEO_SEEK_FRACTION = fraction
+
+
+def thumbnail_variant(kind):
+    """Cache key part for the settings kind is rendered with; '' for the defaults"""
+    if kind != 'video' or (VIDEO_SEEK_SECONDS is None and VIDEO_SEEK_FRACTION == DEFAULT_VIDEO_SEEK_FRACTION):
+        return ''
+    return f"seek={VIDEO_SEEK_SECONDS}:{VIDEO_SEEK_FRACTION}"
+
+
+def video_seek_positions(duration):
+    """Seconds to try a thumbnail frame at, in order, for a video of duration seconds"""
+    if VIDEO_SEEK_SECONDS is not None:
+        start = VIDEO_SEEK_SECONDS
+    else:
+        start = min(duration * VIDEO_SEEK_FRACTION, VIDEO_SEEK_MAX_SECONDS)
+    if duration > 0:
+        start = min(start, duration / 2)
+    # Further in when the first pick is a black frame
+    return [start] + [duration * fraction for fraction in (0.25, 0.5) if duration * fraction > start]
+
+
+def render_video_thumbnail(file_path, target_size=48):
+    """Create thumbnail from a frame a little way into the video.
+
+    Seeks instead of decoding from the start, skips black frames, and shrinks
+    the frame right after decoding so colour conversion and resampling work on
+    a small image. OpenCV always decodes at the stream's full resolution.
+    """
+    import cv2
+    from PIL import Image
+    
+    def shrink(frame):
+        height, width = frame.shape[:2]
+        scale = target_size * 2 / max(height, width)
+        if scale >= 1:
+            return frame
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        duration = frames / fps if fps > 0 and frames > 0 else 0
+        
+        frame = None
+        for position in video_seek_positions(duration):
+            if position > 0:
+                cap.set(cv2.CAP_PROP_POS_MSEC, position * 1000)
+            ret, candidate = cap.read()
+            if not ret:
+                continue
+            frame = shrink(candidate)
+            if frame.mean() >= BLACK_FRAME_LEVEL:
+                break
+        if frame is None:
+            # Seeking failed (e.g. no index); fall back to the first frame
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, candidate = cap.read()
+            if not ret:
+                return None
+            frame = shrink(candidate)
+    finally:
+        cap.release()
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return centered_png(Image.fromarray(frame_rgb), target_size)
+
+
+def render_pdf_thumbnail_qtpdf(file_path, target_size=48):
+    """Create thumbnail for PDF files from their first page, rendered by QtPdf"""
+    from PyQt6.QtCore import QSize
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtPdf import QPdfDocument
+    from PIL import Image
+    
+    document = QPdfDocument(None)
+    try:
+        if document.load(file_path) != QPdfDocument.Error.None_ or document.pageCount() < 1:
+            raise ValueError(f"QtPdf could not open {file_path}")
+        # Same 96px box pdf2image renders into, keeping the page's aspect ratio
+        page = document.pagePointSize(0)
+        ratio = min(96 / page.width(), 96 / page.height()) if page.width() and page.height() else 1
+        size = QSize(max(1, round(page.width() * ratio)), max(1, round(page.height() * ratio)))
+        rendered = document.render(0, size)
+    finally:
+        document.close()
+    if rendered.isNull():
+        return None
+    rendered = rendered.convertToFormat(QImage.Format.Format_RGBA8888)
+    data = rendered.constBits().asstring(rendered.sizeInBytes())
+    image = Image.frombuffer(
+        'RGBA', (rendered.width(), rendered.height()), data, 'raw', 'RGBA', rendered.bytesPerLine(), 1
+    )
+    # The page is fitted into 32px and padded onto the canvas
+    return centered_png(image, target_size, fit_size=32)
+
+
+def render_pdf_thumbnail(file_path, target_size=48):
+    """Create thumbnail for PDF files from their first page, rendered by poppler"""
+    from pdf2image import convert_from_path
+    
+    pages = convert_from_path(
+        file_path,
+        first_page=1,
+        last_page=1,
+        size=(96, 96)  # Larger size for better quality
+    )
+    if not pages:
+        return None
+    # The page is fitted into 32px and padded onto the canvas
+    return centered_png(pages[0], target_size, fit_size=32)
+
+
+# QtPdf renders in-process and is preferred; poppler stays as the fallback
+for _provider in (PillowImageProvider(), OpenCVVideoProvider(), QtPdfProvider(), Pdf2ImageProvider()):
+    register_provider(_provider)
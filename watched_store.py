@@ -0,0 +1,363 @@
+import os
+import json
+import sqlite3
+import threading
+from path_index import PathIndex, split_path, join_path
+
+SCHEMA_VERSION = 4
+SUMMARY_FIELDS = ('total', 'watched', 'file_count', 'folder_count', 'bytes', 'scanned')
+
+
+class WatchedStore:
+    """SQLite storage for watched flags and per-path progress values.
+
+    The database runs in WAL mode, so a single toggle is one small append to
+    the log instead of rewriting every entry, and a crash mid-write leaves the
+    previous state intact. Directories live once in a `dirs` table of path
+    components and entries refer to them by id, so long course prefixes are
+    not repeated in every row and everything below a course root is stored
+    relative to the root's row: moving a course rewrites that one row.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._lock = threading.RLock()
+        self._dir_ids = {}  # directory path -> dirs.id, filled as directories are resolved
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock:
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            with self._transaction():
+                if version == 1:
+                    # v1 keyed rows on full directory paths; keep them aside to migrate
+                    self._conn.execute('ALTER TABLE watched RENAME TO watched_v1')
+                    self._conn.execute('ALTER TABLE progress RENAME TO progress_v1')
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS dirs (
+                        id INTEGER PRIMARY KEY,
+                        parent INTEGER REFERENCES dirs (id),
+                        name TEXT NOT NULL
+                    )''')
+                self._conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS dirs_parent_name ON dirs (parent, name)')
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS watched (
+                        dir INTEGER NOT NULL,
+                        name TEXT NOT NULL,
+                        watched INTEGER NOT NULL,
+                        PRIMARY KEY (dir, name)
+                    ) WITHOUT ROWID''')
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS progress (
+                        dir INTEGER NOT NULL,
+                        name TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        PRIMARY KEY (dir, name)
+                    ) WITHOUT ROWID''')
+                # Size of watched files when marked, to check a relinked root holds the same files
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS fingerprints (
+                        dir INTEGER NOT NULL,
+                        name TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        PRIMARY KEY (dir, name)
+                    ) WITHOUT ROWID''')
+                # Last known counts of each course root, see CourseManager.update_summary()
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS summaries (
+                        path TEXT PRIMARY KEY,
+                        total INTEGER NOT NULL,
+                        watched INTEGER NOT NULL,
+                        file_count INTEGER NOT NULL,
+                        folder_count INTEGER NOT NULL,
+                        bytes INTEGER NOT NULL,
+                        scanned REAL NOT NULL
+                    ) WITHOUT ROWID''')
+                if version == 1:
+                    self._insert_watched(self._conn.execute(
+                        'SELECT directory, name, watched FROM watched_v1').fetchall())
+                    self._insert_progress(self._conn.execute(
+                        'SELECT path, value FROM progress_v1').fetchall())
+                    self._conn.execute('DROP TABLE watched_v1')
+                    self._conn.execute('DROP TABLE progress_v1')
+                self._conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            if version == 1:
+                self._conn.execute('VACUUM')
+
+    @property
+    def is_empty(self):
+        with self._lock:
+            watched = self._conn.execute('SELECT 1 FROM watched LIMIT 1').fetchone()
+            progress = self._conn.execute('SELECT 1 FROM progress LIMIT 1').fetchone()
+        return watched is None and progress is None
+
+    def load_watched(self):
+        """Return watched flags as a PathIndex of file path -> bool"""
+        with self._lock:
+            directories = self._load_dirs()
+            rows = self._conn.execute('SELECT dir, name, watched FROM watched ORDER BY dir').fetchall()
+        return self._build_index(directories, rows, bool)
+
+    def load_progress(self):
+        """Return progress values as a PathIndex of path -> float"""
+        with self._lock:
+            directories = self._load_dirs()
+            rows = self._conn.execute('SELECT dir, name, value FROM progress ORDER BY dir').fetchall()
+        return self._build_index(directories, rows, float)
+
+    def set_watched(self, directory, name, watched):
+        self.set_many_watched([(directory, name, watched)])
+
+    def set_many_watched(self, rows):
+        """Write (directory, name, watched) rows in a single transaction"""
+        with self._lock, self._transaction():
+            self._insert_watched(rows)
+
+    def set_progress(self, path, value):
+        self.set_many_progress([(path, value)])
+
+    def set_many_progress(self, rows):
+        """Write (path, value) rows in a single transaction"""
+        with self._lock, self._transaction():
+            self._insert_progress(rows)
+
+    def set_many_fingerprints(self, rows):
+        """Write (directory, name, size) fingerprint rows in a single transaction"""
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO fingerprints (dir, name, size) VALUES (?, ?, ?)',
+                ((self._dir_id(directory), name, size) for directory, name, size in rows)
+            )
+
+    def load_fingerprints(self, prefix):
+        """Return {(directory, name): size} for fingerprinted files below prefix"""
+        with self._lock:
+            root_id = self._find_dir_id(prefix)
+            if root_id is None:
+                return {}
+            directories = self._load_dirs()
+            rows = self._conn.execute('''
+                WITH RECURSIVE subtree (id) AS (
+                    SELECT ? UNION ALL
+                    SELECT dirs.id FROM dirs JOIN subtree ON dirs.parent = subtree.id
+                )
+                SELECT dir, name, size FROM fingerprints JOIN subtree ON dir = subtree.id''',
+                (root_id,)).fetchall()
+        return {(directories[dir_id], name): size for dir_id, name, size in rows}
+
+    def load_summaries(self):
+        """Return {root path: summary dict with SUMMARY_FIELDS}"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT path, {', '.join(SUMMARY_FIELDS)} FROM summaries").fetchall()
+        return {row[0]: dict(zip(SUMMARY_FIELDS, row[1:])) for row in rows}
+
+    def replace_summaries(self, summaries):
+        """Replace every stored summary with {root path: summary dict}"""
+        with self._lock, self._transaction():
+            self._conn.execute('DELETE FROM summaries')
+            self._conn.executemany(
+                f"INSERT INTO summaries (path, {', '.join(SUMMARY_FIELDS)}) "
+                f"VALUES (?{', ?' * len(SUMMARY_FIELDS)})",
+                ((path,) + tuple(summary[field] for field in SUMMARY_FIELDS)
+                 for path, summary in summaries.items())
+            )
+
+    def relink(self, old_path, new_path):
+        """Move every row at or below old_path to new_path in one transaction.
+
+        Rows below old_path refer to its `dirs` row, so the move re-parents
+        that single row; only when new_path already has rows of its own are
+        the two subtrees merged, the moved rows replacing clashing ones.
+        """
+        old_parent, old_name = os.path.split(os.path.normpath(old_path))
+        new_parent, new_name = os.path.split(os.path.normpath(new_path))
+        with self._lock, self._transaction():
+            old_parent_id = self._find_dir_id(old_parent)
+            if old_parent_id is None:
+                return
+            new_parent_id = self._dir_id(new_parent)
+            # The entry for old_path itself, e.g. a course root's progress value
+            for table in ('watched', 'progress', 'fingerprints'):
+                self._conn.execute(
+                    f'UPDATE OR REPLACE {table} SET dir = ?, name = ? WHERE dir = ? AND name = ?',
+                    (new_parent_id, new_name, old_parent_id, old_name)
+                )
+            old_id = self._child_dir_id(old_parent_id, old_name)
+            if old_id is not None:
+                existing = self._child_dir_id(new_parent_id, new_name)
+                if existing is None:
+                    self._conn.execute('UPDATE dirs SET parent = ?, name = ? WHERE id = ?',
+                                       (new_parent_id, new_name, old_id))
+                else:
+                    self._merge_dir(old_id, existing)
+            # Cached paths below either location are stale now
+            self._dir_ids.clear()
+
+    def _merge_dir(self, source, target):
+        for table in ('watched', 'progress', 'fingerprints'):
+            self._conn.execute(f'UPDATE OR REPLACE {table} SET dir = ? WHERE dir = ?', (target, source))
+        children = self._conn.execute('SELECT id, name FROM dirs WHERE parent = ?', (source,)).fetchall()
+        for child_id, name in children:
+            existing = self._child_dir_id(target, name)
+            if existing is None:
+                self._conn.execute('UPDATE dirs SET parent = ? WHERE id = ?', (target, child_id))
+            else:
+                self._merge_dir(child_id, existing)
+        self._conn.execute('DELETE FROM dirs WHERE id = ?', (source,))
+
+    def replace_watched(self, rows):
+        """Replace every watched flag with (directory, name, watched) rows"""
+        with self._lock, self._transaction():
+            self._conn.execute('DELETE FROM watched')
+            self._insert_watched(rows)
+
+    def replace_progress(self, rows):
+        """Replace every progress value with (path, value) rows"""
+        with self._lock, self._transaction():
+            self._conn.execute('DELETE FROM progress')
+            self._insert_progress(rows)
+
+    def _insert_watched(self, rows):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO watched (dir, name, watched) VALUES (?, ?, ?)',
+            ((self._dir_id(directory), name, int(bool(watched))) for directory, name, watched in rows)
+        )
+
+    def _insert_progress(self, rows):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO progress (dir, name, value) VALUES (?, ?, ?)',
+            ((self._dir_id(directory), name, float(value))
+             for directory, name, value in ((*os.path.split(os.path.normpath(path)), value)
+                                            for path, value in rows))
+        )
+
+    def _dir_id(self, directory):
+        """Return the dirs.id of directory, inserting it and its missing ancestors"""
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is not None:
+            return dir_id
+        parent = None
+        parts = split_path(directory)
+        for depth, name in enumerate(parts, 1):
+            prefix = join_path(parts[:depth])
+            dir_id = self._dir_ids.get(prefix)
+            if dir_id is None:
+                dir_id = self._child_dir_id(parent, name)
+                if dir_id is None:
+                    dir_id = self._conn.execute(
+                        'INSERT INTO dirs (parent, name) VALUES (?, ?)', (parent, name)
+                    ).lastrowid
+                self._dir_ids[prefix] = dir_id
+            parent = dir_id
+        self._dir_ids[directory] = dir_id
+        return dir_id
+
+    def _find_dir_id(self, directory):
+        """Return the dirs.id of directory without inserting anything, or None"""
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is not None:
+            return dir_id
+        for name in split_path(directory):
+            dir_id = self._child_dir_id(dir_id, name)
+            if dir_id is None:
+                return None
+        return dir_id
+
+    def _child_dir_id(self, parent, name):
+        row = self._conn.execute(
+            'SELECT id FROM dirs WHERE parent IS ? AND name = ?', (parent, name)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _load_dirs(self):
+        """Return {dirs.id: directory path}, refreshing the id cache"""
+        rows = {dir_id: (parent, name) for dir_id, parent, name in
+                self._conn.execute('SELECT id, parent, name FROM dirs')}
+        # A relinked directory keeps its id under a possibly newer parent, so
+        # ids are not in parent-first order; resolve each chain once instead
+        parts_by_id = {None: []}
+        directories = {}
+        for dir_id in rows:
+            chain = []
+            while dir_id not in parts_by_id:
+                chain.append(dir_id)
+                dir_id = rows[dir_id][0]
+            parts = parts_by_id[dir_id]
+            for child_id in reversed(chain):
+                parts = parts + [rows[child_id][1]]
+                parts_by_id[child_id] = parts
+                directories[child_id] = path = join_path(parts)
+                self._dir_ids[path] = child_id
+        return directories
+
+    def _build_index(self, directories, rows, convert):
+        index = PathIndex()
+        current_dir, values = None, {}
+        for dir_id, name, value in rows:
+            if dir_id != current_dir:
+                if values:
+                    index.set_many(directories[current_dir], values)
+                current_dir, values = dir_id, {}
+            values[name] = convert(value)
+        if values:
+            index.set_many(directories[current_dir], values)
+        return index
+
+    def import_json(self, watched_path=None, progress_path=None):
+        """Import the legacy watched.json / progress.json files, returning True if anything was read"""
+        imported = False
+        if watched_path and os.path.exists(watched_path):
+            try:
+                with open(watched_path, 'r') as f:
+                    watched_files = json.load(f)
+                self.replace_watched(
+                    (directory, name, watched)
+                    for directory, files in watched_files.items()
+                    for name, watched in files.items()
+                )
+                imported = True
+            except Exception as e:
+                print(f"Error importing watched files: {e}")
+        if progress_path and os.path.exists(progress_path):
+            try:
+                with open(progress_path, 'r') as f:
+                    self.replace_progress(json.load(f).items())
+                imported = True
+            except Exception as e:
+                print(f"Error importing progress: {e}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self):
+        # Directory ids handed out inside a rolled back transaction are gone again
+        return _Transaction(self._conn, on_rollback=self._dir_ids.clear)
+
+
+class _Transaction:
+    """BEGIN/COMMIT around a block, rolling back on error"""
+
+    def __init__(self, conn, on_rollback=None):
+        self.conn = conn
+        self.on_rollback = on_rollback
+
+    def __enter__(self):
+        self.conn.execute('BEGIN')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+            if self.on_rollback is not None:
+                self.on_rollback()
+        return False